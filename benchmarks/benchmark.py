@@ -5,6 +5,7 @@ import json
 import math
 import platform
 import statistics
+import subprocess
 import sys
 from pathlib import Path
 from time import perf_counter_ns
@@ -14,6 +15,11 @@ import numpy as np
 
 from pyjiting import clear_cache, jit, runtime_stats
 
+IMPORT_PROBE = (
+    'import sys; from time import perf_counter_ns; started = perf_counter_ns(); import pyjiting; '
+    "print(perf_counter_ns() - started, 'llvmlite.binding' in sys.modules)"
+)
+
 
 @jit
 def modular_sum(limit):
@@ -65,6 +71,24 @@ def measure(function, repeat, expected=None):
     }
 
 
+def measure_import(repeat):
+    """Time ``import pyjiting`` in fresh interpreters; the result records whether LLVM was loaded."""
+    samples, loaded = [], set()
+    for _ in range(repeat):
+        elapsed, llvm_loaded = subprocess.check_output([sys.executable, '-c', IMPORT_PROBE], text=True).split()
+        samples.append(int(elapsed))
+        loaded.add(llvm_loaded)
+    if loaded != {'False'}:
+        raise AssertionError('import pyjiting loaded llvmlite.binding before the first compile')
+    return {
+        'result': False,
+        'median_ns': int(statistics.median(samples)),
+        'min_ns': min(samples),
+        'stdev_ns': int(statistics.stdev(samples)) if len(samples) > 1 else 0,
+        'samples_ns': samples,
+    }
+
+
 def run(repeat):
     limit = 100_000
     clear_cache(modular_sum)
@@ -94,6 +118,8 @@ def run(repeat):
     warm_saving = python['median_ns'] - warm['median_ns']
     break_even = math.ceil(cold_overhead / warm_saving) if warm_saving > 0 else None
 
+    import_cold = measure_import(repeat)
+
     return {
         'environment': {
             'python': sys.version.split()[0],
@@ -106,6 +132,7 @@ def run(repeat):
         'break_even_calls': {'scalar_vs_cpython': break_even},
         'runtime_callbacks': {'string_upper': callback_delta},
         'cases': {
+            'import_cold': import_cold,
             'scalar_cold': cold,
             'scalar_warm': warm,
             'scalar_cpython': python,
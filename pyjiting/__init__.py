@@ -2,3 +2,4 @@ __version__ = "0.3.0"
 
 from .main import (JITContext, clear_cache, get_llvm_ir, inspect_specializations, jit,
                    jit_from_source, reg, runtime_stats)
+from .string_runtime import string_hash
@@ -1,9 +1,67 @@
 import ast
+from contextlib import contextmanager
 import copy
+import threading
+
+
+_annotation_state = threading.local()
+
+
+class Annotation:
+    """Route one inference result into the active specialization side table.
+
+    Without an active table the value lives on the node itself, which keeps direct
+    ``TypeInferencer``/``LLVMCodeGen`` use annotating trees in place.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, node, owner=None):
+        if node is None:
+            return self
+        tables = getattr(_annotation_state, 'tables', None)
+        if tables:
+            slots = tables[-1].get(node)
+            if slots is not None and self.name in slots:
+                return slots[self.name]
+        try:
+            return node.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, node, value):
+        tables = getattr(_annotation_state, 'tables', None)
+        if tables:
+            tables[-1].setdefault(node, {})[self.name] = value
+        else:
+            node.__dict__[self.name] = value
+
+
+@contextmanager
+def annotation_table():
+    """Collect inference results for one specialization without copying the tree."""
+    tables = getattr(_annotation_state, 'tables', None)
+    if tables is None:
+        tables = _annotation_state.tables = []
+    table = {}
+    tables.append(table)
+    try:
+        yield table
+    finally:
+        tables.pop()
 
 
 class Node(ast.AST):
     _fields = ()
+    type = Annotation()
+    operand_type = Annotation()
+    tuple_index = Annotation()
+    source_types = Annotation()
+    ref_types = Annotation()
+    jit_signature = Annotation()
+    jit_symbol = Annotation()
+    registered_id = Annotation()
 
     def __init__(self, source=None):
         if source is not None:
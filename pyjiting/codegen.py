@@ -2,22 +2,26 @@
 
 import ast as py_ast
 import ctypes
+from contextlib import contextmanager
 from typing import Any
 
 from llvmlite import ir
+import numpy as np
 
 from . import ast as core
 from .errors import CodegenError
-from .intrinsics import (MATH_INTRINSICS, STRING_INTRINSICS, STRING_PREDICATES,
+from .intrinsics import (MATH_INTEGER_RESULTS, MATH_INTRINSICS, STRING_INTRINSICS, STRING_PREDICATES,
                          STRING_TRANSFORMS)
 from .ll_types import mangler
-from .registry import get as get_registered, keep_callback, record_callback
+from .registry import (BATCH_SIZE, CACHE_HEADER_WORDS, CACHE_KEY_BYTES, cache_key_offsets, get as get_registered,
+                       is_batched, keep_callback, native_target, record_callback, result_cache)
 from .types import (TupleType, bool_t, double64_t, float32_t, int32_t, int64_t,
-                    is_array, is_float, is_integer, is_string, is_tuple, shape_t,
-                    str_t, void_t)
-from .string_runtime import (StringPointer, allocation_address, callback_address,
-                             literal_address, make_string, set_pending_exception,
-                             to_python)
+                    is_array, is_float, is_integer, is_list, is_string, is_tuple,
+                    shape_t, str_t, void_t)
+from .string_runtime import (HASH_SECRETS, StringPointer, allocation_address,
+                             callback_address, encode_string, make_string,
+                             set_pending_exception, to_python)
+from .unicode_tables import MAX_CODEPOINT, PREDICATE_FLAGS, SHIFT, SPECIAL, unicode_tables
 
 
 ir_i1 = ir.IntType(1)
@@ -35,10 +39,24 @@ ERROR_ARRAY_DIMENSION_MISMATCH = 3
 ERROR_INDEX_OUT_OF_BOUNDS = 4
 ERROR_MATH_DOMAIN = 8
 ERROR_MATH_RANGE = 9
+# Math functions LLVM has intrinsics for; the rest call libm (``tanf`` etc. for float32).
+LLVM_MATH = frozenset({'sin', 'cos', 'sqrt', 'exp', 'exp2', 'log', 'log2', 'log10', 'pow',
+                       'floor', 'ceil', 'trunc', 'fabs', 'copysign', 'fma'})
+# Functions that cannot fail, so they emit no guards and keep loops branch-free.
+MATH_TOTAL = frozenset({'atan', 'atan2', 'tanh', 'asinh', 'cbrt', 'erf', 'erfc',
+                        'fabs', 'copysign', 'floor', 'ceil', 'trunc'})
+# An infinite result from finite arguments is a pole (domain error), not an overflow.
+MATH_POLES = frozenset({'log', 'log2', 'log10', 'log1p', 'atanh'})
 ERROR_ARRAY_READONLY = 10
+ERROR_EMPTY_SEPARATOR = 12
 
 ARRAY_WRITEABLE = 1 << 0
 
+FASTMATH_FLAGS = frozenset({'fast', 'nnan', 'ninf', 'nsz', 'arcp', 'contract', 'afn', 'reassoc'})
+# ``fastmath=True`` relaxes ordering and precision but keeps NaN/Inf semantics, so
+# domain/range guards and ``math.isnan``-style checks still observe real values.
+DEFAULT_FASTMATH = frozenset({'reassoc', 'contract', 'nsz', 'arcp', 'afn'})
+
 
 def array_type(element):
     name = f'pyjiting.ndarray.{element}'
@@ -52,10 +70,34 @@ def array_type(element):
 def string_type():
     struct = ir.global_context.get_identified_type('pyjiting.string')
     if not struct.elements:
-        struct.set_body(ir.PointerType(ir_i32), ir_i64)
+        struct.set_body(ir.PointerType(ir_i8), ir_i64, ir_i64, ir.PointerType(ir_i8))
+    return ir.PointerType(struct)
+
+
+def string_list_type():
+    struct = ir.global_context.get_identified_type('pyjiting.strlist')
+    if not struct.elements:
+        struct.set_body(string_type(), ir_i64)
     return ir.PointerType(struct)
 
 
+STRING_KINDS = (1, 2, 4)
+# A growable string buffer starts with {capacity, fill} in bytes; descriptors whose
+# ``owner`` points at it may append in place when they end exactly at ``fill``.
+STRING_BUFFER_HEADER = 16
+STRING_MIN_CAPACITY = 64
+STRING_SEARCH_MODES = {'find': 0, 'count': 1, 'startswith': 2, 'endswith': 3}
+# Native parsing handles plain ASCII fields of at most this many code points; anything
+# else (underscores, inf/nan, Unicode digits, errors) is delegated to Python's int()/float().
+FLOAT_FIELD_LIMIT = 63
+# Natively built strings are returned in stack descriptors; other calls return arena ones.
+BORROWED_STRING_CALLS = frozenset({'str', 'str.join', 'str.upper', 'str.lower'})
+# Code points Python's str.split() and str.splitlines() break on, as inclusive ranges.
+UNICODE_SPACE = ((9, 13), (28, 32), (0x85, 0x85), (0xA0, 0xA0), (0x1680, 0x1680), (0x2000, 0x200A),
+                 (0x2028, 0x2029), (0x202F, 0x202F), (0x205F, 0x205F), (0x3000, 0x3000))
+UNICODE_LINE_BREAKS = ((10, 13), (28, 30), (0x85, 0x85), (0x2028, 0x2029))
+
+
 TYPE_MAP = {
     int32_t: ir_i32, int64_t: ir_i64, bool_t: ir_i64, float32_t: ir_f32,
     double64_t: ir_f64, void_t: ir_void,
@@ -63,19 +105,47 @@ TYPE_MAP = {
 }
 
 
+def storage_type(element):
+    """Return the LLVM type of one ndarray element slot; unicode slots hold UTF-32 units."""
+    return ir_i32 if is_string(element) else to_lltype(element)
+
+
 def to_lltype(ty):
-    if is_array(ty): return array_type(to_lltype(ty.b))
+    if is_array(ty): return array_type(storage_type(ty.b))
     if is_tuple(ty): return ir.PointerType(ir.LiteralStructType([to_lltype(element) for element in ty.elements]))
+    if is_list(ty) and is_string(ty.b): return string_list_type()
     try: return TYPE_MAP[ty]
     except KeyError as error: raise CodegenError(f'no LLVM type for {ty}') from error
 
 
+def value_lltype(ty):
+    """Return the LLVM type of a value passed between jitted functions; tuples travel by value."""
+    return to_lltype(ty).pointee if is_tuple(ty) else to_lltype(ty)
+
+
+def by_value_symbol(symbol, arg_types, return_type):
+    """Name the JIT-to-JIT entry point; it differs from the Python-facing one only when tuples are involved."""
+    return f'{symbol}.by_value' if any(map(is_tuple, [*arg_types, return_type])) else symbol
+
+
 def determined(ty): return ty is not None
 
 
+def literal_footprint(module):
+    """Return ``(count, bytes)`` of the string literal code units a module embeds."""
+    data = [value for value in module.global_values
+            if value.name.startswith('pyjiting.literal.') and value.name.endswith('.data')]
+    return len(data), sum(value.type.pointee.count for value in data)
+
+
 class LLVMCodeGen:
-    def __init__(self, module, return_type, args):
+    def __init__(self, module, return_type, args, symbol=None, fastmath=(), constants=None):
         self.module, self.return_type, self.args = module, return_type, args
+        self.symbol = symbol
+        self.fastmath = tuple(sorted(fastmath))
+        # Parameter index -> value folded into this body by ``jit(specialize_values=...)``.
+        self.constants = constants or {}
+        self.recursive_callee = None
         self.function = self.builder = None
         self.locals, self.arrays, self.shapes = {}, {}, {}
         self.break_blocks, self.continue_blocks = [], []
@@ -83,6 +153,10 @@ class LLVMCodeGen:
         self.error_ptr = None
         self.org_func_name = None
         self.counter = 0
+        self.string_slots = {}
+        self.string_literals = {}
+        self.stack_tuples = set()
+        self.batches = {}
 
     def new_block(self, prefix):
         self.counter += 1
@@ -94,9 +168,17 @@ class LLVMCodeGen:
     def alloca(self, ty, name):
         raise CodegenError(f'local {name} was not allocated during function setup')
 
+    def entry_alloca(self, ty, name):
+        """Reserve a stack slot in the entry block so loops do not grow the stack."""
+        block = self.builder.block
+        self.builder.position_at_start(self.function.entry_basic_block)
+        slot = self.builder.alloca(ty, name=name)
+        self.builder.position_at_end(block)
+        return slot
+
     def start_function(self, name):
-        arg_types = [to_lltype(ty) for ty in self.args] + [ir.PointerType(ir_i32)]
-        self.function = ir.Function(self.module, ir.FunctionType(to_lltype(self.return_type), arg_types), name)
+        arg_types = [value_lltype(ty) for ty in self.args] + [ir.PointerType(ir_i32)]
+        self.function = ir.Function(self.module, ir.FunctionType(value_lltype(self.return_type), arg_types), name)
         entry = self.function.append_basic_block('entry')
         self.exit_block = self.function.append_basic_block('exit')
         self.builder = ir.IRBuilder(entry)
@@ -104,6 +186,8 @@ class LLVMCodeGen:
     def finish_function(self):
         if not self.terminated(): self.builder.branch(self.exit_block)
         self.set_block(self.exit_block)
+        # Batched callbacks still pending when the function returns or fails are delivered here.
+        self._flush_batches()
         if self.return_type == void_t: self.builder.ret_void()
         else: self.builder.ret(self.builder.load(self.return_slot))
 
@@ -140,9 +224,9 @@ class LLVMCodeGen:
         if ty == bool_t or is_integer(ty): result = self.builder.icmp_signed('!=', value, ir.Constant(value.type, 0))
         elif is_float(ty): result = self.builder.fcmp_unordered('!=', value, ir.Constant(value.type, 0.0))
         elif is_string(ty):
-            length = self.builder.load(self.builder.gep(value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1)]))
-            result = self.builder.icmp_signed('!=', length, ir.Constant(ir_i64, 0))
+            result = self.builder.icmp_signed('!=', self._string_field(value, 1), ir.Constant(ir_i64, 0))
         elif is_tuple(ty): result = ir.Constant(ir_i1, int(bool(ty.elements)))
+        elif is_list(ty): result = self.builder.icmp_signed('!=', self._string_field(value, 1), ir.Constant(ir_i64, 0))
         else: raise CodegenError(f'cannot use {ty} as a condition')
         return self.builder.zext(result, ir_i64) if normalize else result
 
@@ -179,7 +263,8 @@ class LLVMCodeGen:
 
     def visit_Fun(self, node):
         self.org_func_name = node.fname
-        self.start_function(mangler(node.symbol, self.args))
+        symbol = mangler(self.symbol or node.symbol, self.args)
+        self.start_function(by_value_symbol(symbol, self.args, self.return_type))
         local_types = {}
         for item in self.walk_nodes(node):
             if isinstance(item, core.Assign): local_types[item.ref] = item.type
@@ -187,14 +272,28 @@ class LLVMCodeGen:
                 for name, ty in zip(item.refs, item.ref_types): local_types[name] = ty
             elif isinstance(item, core.Loop): local_types[item.var.id] = int64_t
             elif isinstance(item, core.ForEach): local_types[item.var.id] = item.var.type
+        self.stack_tuples = self._stack_tuples(node)
+        nests_tuples = any(isinstance(item, core.LitTuple) and any(is_tuple(element.type) for element in item.elements)
+                           for item in self.walk_nodes(node))
         if self.return_type != void_t:
-            self.return_slot = self.builder.alloca(to_lltype(self.return_type), name='retval')
+            self.return_slot = self.builder.alloca(value_lltype(self.return_type), name='retval')
         for name, ty in local_types.items():
             self.locals[name] = self.builder.alloca(to_lltype(ty), name=name)
+            if is_string(ty):
+                self.string_slots[name] = self.builder.alloca(string_type().pointee, name=f'{name}.view')
         self.error_ptr = self.function.args[-1]
         self.error_ptr.name = 'error'
-        for core_arg, ll_arg, ty in zip(node.args, self.function.args, self.args):
+        if self.constants and any(isinstance(item, core.CallFunc) and item.fn.id == node.fname
+                                  for item in self.walk_nodes(node.body)):
+            self.recursive_callee = self._generic_body(node, symbol)
+        for index, (core_arg, ll_arg, ty) in enumerate(zip(node.args, self.function.args, self.args)):
             ll_arg.name = core_arg.id
+            if index in self.constants:
+                # The folded value replaces the argument, so LLVM propagates it through the body.
+                ptr = self.builder.alloca(to_lltype(ty), name=core_arg.id)
+                self.builder.store(ir.Constant(to_lltype(ty), self.constants[index]), ptr)
+                self.locals[core_arg.id] = ptr
+                continue
             if is_array(ty):
                 self.locals[core_arg.id] = ll_arg
                 zero = ir.Constant(ir_i32, 0)
@@ -208,12 +307,104 @@ class LLVMCodeGen:
                     'element': ty.b,
                 }
             else:
+                if is_tuple(ty):
+                    # A tuple parameter nested into a new tuple outlives this frame, so it moves to the arena.
+                    value = ll_arg
+                    ll_arg = self._allocate_structure(to_lltype(ty)) if nests_tuples \
+                        else self.builder.alloca(value.type, name=f'{core_arg.id}.value')
+                    self.builder.store(value, ll_arg)
                 ptr = self.builder.alloca(to_lltype(ty), name=core_arg.id); self.builder.store(ll_arg, ptr); self.locals[core_arg.id] = ptr
         if self.return_type != void_t:
-            self.builder.store(ir.Constant(to_lltype(self.return_type), None), self.return_slot)
+            self.builder.store(ir.Constant(value_lltype(self.return_type), None), self.return_slot)
         self.visit(node.body)
         self.finish_function()
-        return self.function
+        if self.function.name == symbol: return self.function
+        return self._pointer_entry(symbol, self.function)
+
+    def _generic_body(self, node, symbol):
+        """Emit an unfolded internal copy of the body for recursive calls, whose arguments may differ."""
+        generic = LLVMCodeGen(self.module, self.return_type, self.args, f'{symbol}.generic', self.fastmath)
+        generic.string_literals = self.string_literals
+        generic.visit(node)
+        generic.function.linkage = 'internal'
+        return generic.function
+
+    def _pointer_entry(self, name, internal):
+        """Wrap the by-value body for the Python dispatcher, which exchanges tuples as arena pointers."""
+        saved = self.function, self.builder, self.error_ptr, self.exit_block
+        arg_types = [to_lltype(ty) for ty in self.args] + [ir.PointerType(ir_i32)]
+        self.function = ir.Function(self.module, ir.FunctionType(to_lltype(self.return_type), arg_types), name)
+        self.builder = ir.IRBuilder(self.function.append_basic_block('entry'))
+        self.exit_block = self.function.append_basic_block('exit')
+        self.error_ptr = self.function.args[-1]
+        try:
+            result_slot = None
+            if self.return_type != void_t:
+                result_slot = self.builder.alloca(to_lltype(self.return_type), name='retval')
+                self.builder.store(ir.Constant(to_lltype(self.return_type), None), result_slot)
+            args = [self.builder.load(arg) if is_tuple(ty) else arg for arg, ty in zip(self.function.args, self.args)]
+            result = self.builder.call(internal, [*args, self.error_ptr])
+            if is_tuple(self.return_type):
+                self.propagate_error()
+                pointer = self._allocate_structure(to_lltype(self.return_type))
+                self.builder.store(result, pointer); result = pointer
+            if result_slot is not None: self.builder.store(result, result_slot)
+            self.builder.branch(self.exit_block)
+            self.set_block(self.exit_block)
+            if result_slot is None: self.builder.ret_void()
+            else: self.builder.ret(self.builder.load(result_slot))
+            return self.function
+        finally:
+            self.function, self.builder, self.error_ptr, self.exit_block = saved
+
+    def _stack_tuples(self, node):
+        """Find flat tuple literals whose value never escapes the frame or outlives its next evaluation.
+
+        Such literals are consumed in place (unpacking, constant indexing, ``len``, conditions,
+        ``join``) or bound to locals that are only consumed that way and only ever assigned
+        literals, so an entry-block ``alloca`` per site is safe and LLVM can scalar-replace it.
+        """
+        def jit_call(item):
+            return isinstance(item, core.CallFunc) and (hasattr(item, 'jit_signature') or item.fn.id == node.fname)
+
+        def consumes(parent, child):
+            if isinstance(parent, (core.UnpackAssign, core.Index)): return child is parent.value
+            if isinstance(parent, (core.If, core.While)): return child is parent.test
+            if isinstance(parent, core.CallFunc):
+                # JIT callees receive tuples by value and copy any string they keep.
+                return (parent.fn.id == 'len' or jit_call(parent) or
+                        (parent.fn.id == 'str.join' and child is parent.args[1]))
+            return False
+
+        def flat(ty): return is_tuple(ty) and not any(is_tuple(element) for element in ty.elements)
+        def produces(item): return (isinstance(item, core.LitTuple) or jit_call(item)) and flat(item.type)
+        edges = [(parent, child) for parent in self.walk_nodes(node.body)
+                 for _, value in py_ast.iter_fields(parent)
+                 for child in (value if isinstance(value, list) else [value]) if isinstance(child, py_ast.AST)]
+        unbound = {parent.ref for parent in self.walk_nodes(node.body)
+                   if isinstance(parent, core.Assign) and is_tuple(parent.type)
+                   and not produces(parent.value)}
+        unbound |= {name for parent in self.walk_nodes(node.body) if isinstance(parent, core.UnpackAssign)
+                    for name, ty in zip(parent.refs, parent.ref_types) if is_tuple(ty)}
+        unbound |= {child.id for parent, child in edges
+                    if isinstance(child, core.Var) and is_tuple(child.type) and not consumes(parent, child)}
+        return {child for parent, child in edges if produces(child) and (
+            consumes(parent, child) or (isinstance(parent, core.Assign) and parent.ref not in unbound))}
+
+    def _stack_string(self):
+        return self.entry_alloca(string_type().pointee, 'string_view')
+
+    def _retain_string(self, node, value):
+        """Copy a possibly stack-borrowed descriptor into the arena before it outlives the frame."""
+        if isinstance(node, core.LitStr) or (isinstance(node, core.CallFunc) and node.fn.id not in BORROWED_STRING_CALLS):
+            return value
+        return self._copy_string(value, self._allocate_structure(string_type()))
+
+    def _copy_string(self, value, descriptor):
+        fields = [self._string_field(value, index) for index in range(4)]
+        for index, field in enumerate(fields):
+            self.builder.store(field, self.builder.gep(descriptor, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)]))
+        return descriptor
 
     def walk_nodes(self, node):
         if isinstance(node, list):
@@ -231,44 +422,1095 @@ class LLVMCodeGen:
     def visit_LitFloat(self, node): return ir.Constant(to_lltype(node.type), node.n)
     def visit_LitBool(self, node): return ir.Constant(ir_i64, int(node.n))
     def visit_LitStr(self, node):
-        return self.builder.inttoptr(ir.Constant(ir_i64, literal_address(node.value)), string_type())
+        """Emit a literal as internal constant globals, so its storage lives and dies with the module."""
+        descriptor = self.string_literals.get(node.value)
+        if descriptor is None:
+            kind, encoded = encode_string(node.value)
+            name = f'pyjiting.literal.{len(self.string_literals)}'
+            data = ir.GlobalVariable(self.module, ir.ArrayType(ir_i8, len(encoded)), f'{name}.data')
+            data.initializer = ir.Constant(data.type.pointee, bytearray(encoded))
+            descriptor = ir.GlobalVariable(self.module, string_type().pointee, name)
+            descriptor.initializer = ir.Constant(string_type().pointee, [
+                data.gep([ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 0)]), ir.Constant(ir_i64, len(node.value)),
+                ir.Constant(ir_i64, kind), ir.Constant(ir.PointerType(ir_i8), None)])
+            for value in (data, descriptor):
+                value.global_constant = True; value.linkage = 'internal'
+            data.unnamed_addr = True; data.align = kind
+            self.string_literals[node.value] = descriptor
+        return descriptor
     def visit_LitTuple(self, node):
         pointer_type = to_lltype(node.type)
+        if node in self.stack_tuples:
+            # Evaluate every element before storing, since a rebinding like ``t = (t[1], t[0])``
+            # reads the very descriptors this site is about to overwrite.
+            values = [self.visit(element) for element in node.elements]
+            strings = {index: [self._string_field(value, field) for field in range(4)]
+                       for index, (value, element) in enumerate(zip(values, node.elements)) if is_string(element.type)}
+            pointer = self.entry_alloca(pointer_type.pointee, 'tuple')
+            for index, value in enumerate(values):
+                if index in strings:
+                    value = self._stack_string()
+                    for field, loaded in enumerate(strings[index]):
+                        self.builder.store(loaded, self.builder.gep(value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, field)]))
+                self.builder.store(value, self.builder.gep(pointer, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)]))
+            return pointer
         pointer = self._allocate_structure(pointer_type)
         for index, element in enumerate(node.elements):
             address = self.builder.gep(pointer, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)])
-            self.builder.store(self.visit(element), address)
+            value = self.visit(element)
+            if is_string(element.type): value = self._retain_string(element, value)
+            self.builder.store(value, address)
         return pointer
 
     def _allocate_structure(self, pointer_type):
         null = ir.Constant(pointer_type, None)
         size = self.builder.ptrtoint(
             self.builder.gep(null, [ir.Constant(ir_i64, 1)]), ir_i64)
+        return self.builder.bitcast(self._allocate_bytes(size), pointer_type)
+
+    def _allocate_bytes(self, size):
         allocator_type = ir.PointerType(ir.FunctionType(
             ir.PointerType(ir_i8), [ir_i64, ir.PointerType(ir_i32)]))
         allocator = self.builder.inttoptr(
             ir.Constant(ir_i64, allocation_address()), allocator_type)
         allocated = self.builder.call(allocator, [size, self.error_ptr])
         self.propagate_error()
-        return self.builder.bitcast(allocated, pointer_type)
+        return allocated
+
+    @contextmanager
+    def _helper_function(self, name, arg_types):
+        """Build an internal ``void`` helper whose last argument is the error pointer."""
+        saved = self.function, self.builder, self.error_ptr, self.exit_block
+        self.function = ir.Function(self.module, ir.FunctionType(ir_void, arg_types), name)
+        self.function.linkage = 'internal'
+        self.builder = ir.IRBuilder(self.function.append_basic_block('entry'))
+        self.exit_block = self.function.append_basic_block('exit')
+        self.error_ptr = self.function.args[-1]
+        try:
+            yield self.function
+            if not self.terminated(): self.builder.branch(self.exit_block)
+            self.set_block(self.exit_block); self.builder.ret_void()
+        finally:
+            self.function, self.builder, self.error_ptr, self.exit_block = saved
+
+    def _string_field(self, value, index):
+        return self.builder.load(self.builder.gep(value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)]))
+
+    def _string_fields(self, value):
+        """Load a string descriptor as ``(data, length, kind)``."""
+        return tuple(self._string_field(value, index) for index in range(3))
+
+    def _codepoint(self, data, kind, index, width=None):
+        """Load code point ``index`` from ``data``; ``width`` fixes the kind when it is known."""
+        if width is not None:
+            units = self.builder.bitcast(data, ir.PointerType(ir.IntType(8 * width)))
+            unit = self.builder.load(self.builder.gep(units, [index]), align=width)
+            return unit if width == 4 else self.builder.zext(unit, ir_i32)
+        done = self.new_block('codepoint_done')
+        blocks = {width: self.new_block(f'codepoint_ucs{width}') for width in STRING_KINDS}
+        switch = self.builder.switch(kind, blocks[4])
+        for width in STRING_KINDS[:-1]: switch.add_case(ir.Constant(ir_i64, width), blocks[width])
+        loaded = []
+        for width, block in blocks.items():
+            self.set_block(block)
+            loaded.append((self._codepoint(data, kind, index, width), self.builder.block))
+            self.builder.branch(done)
+        self.set_block(done)
+        phi = self.builder.phi(ir_i32)
+        for value, block in loaded: phi.add_incoming(value, block)
+        return phi
+
+    def _store_codepoint(self, data, kind, index, value):
+        done = self.new_block('store_codepoint_done')
+        blocks = {width: self.new_block(f'store_codepoint_ucs{width}') for width in STRING_KINDS}
+        switch = self.builder.switch(kind, blocks[4])
+        for width in STRING_KINDS[:-1]: switch.add_case(ir.Constant(ir_i64, width), blocks[width])
+        for width, block in blocks.items():
+            self.set_block(block)
+            units = self.builder.bitcast(data, ir.PointerType(ir.IntType(8 * width)))
+            unit = value if width == 4 else self.builder.trunc(value, ir.IntType(8 * width))
+            self.builder.store(unit, self.builder.gep(units, [index]), align=width)
+            self.builder.branch(done)
+        self.set_block(done)
+
+    def _copy_code_units(self, target, target_kind, source, source_kind, count):
+        """Copy ``count`` code points, widening when ``target_kind`` exceeds ``source_kind``."""
+        same, widen, test, body, done = (self.new_block('copy_units_same'), self.new_block('copy_units_widen'),
+                                         self.new_block('copy_units_test'), self.new_block('copy_units_body'),
+                                         self.new_block('copy_units_done'))
+        self.builder.cbranch(self.builder.icmp_signed('==', target_kind, source_kind), same, widen)
+        self.set_block(same)
+        memcpy = self.module.declare_intrinsic('llvm.memcpy', [ir.PointerType(ir_i8), ir.PointerType(ir_i8), ir_i64])
+        self.builder.call(memcpy, [target, source, self.builder.mul(count, source_kind), ir.Constant(ir_i1, 0)])
+        self.builder.branch(done)
+        self.set_block(widen)
+        index_ptr = self.entry_alloca(ir_i64, 'copy_units_index')
+        self.builder.store(ir.Constant(ir_i64, 0), index_ptr); self.builder.branch(test)
+        self.set_block(test)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', index, count), body, done)
+        self.set_block(body)
+        self._store_codepoint(target, target_kind, index, self._codepoint(source, source_kind, index))
+        self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr); self.builder.branch(test)
+        self.set_block(done)
+
+    def _string_concat(self, left, right, descriptor=None):
+        helper = self.module.globals.get('pyjiting.string.concat') or self._build_string_concat()
+        descriptor = descriptor or self._stack_string()
+        self.builder.call(helper, [left, right, descriptor, self.error_ptr])
+        self.propagate_error()
+        return descriptor
+
+    def _build_string_concat(self):
+        """Emit ``out = left + right``; appends in place when ``left`` ends at its buffer's fill mark."""
+        with self._helper_function('pyjiting.string.concat', [string_type()] * 3 + [ir.PointerType(ir_i32)]) as function:
+            left, right, out, _ = function.args
+            left_data, left_length, left_kind = self._string_fields(left)
+            right_data, right_length, right_kind = self._string_fields(right)
+            owner = self._string_field(left, 3)
+            kind = self.builder.select(self.builder.icmp_signed('<', left_kind, right_kind), right_kind, left_kind)
+            length = self.builder.add(left_length, right_length)
+            used, needed = self.builder.mul(left_length, left_kind), self.builder.mul(length, kind)
+            has_owner = self.builder.icmp_unsigned('!=', owner, ir.Constant(owner.type, None))
+            check, append, grow = self.new_block('concat_check'), self.new_block('concat_append'), self.new_block('concat_grow')
+            self.builder.cbranch(has_owner, check, grow)
+            self.set_block(check)
+            header = self.builder.bitcast(owner, ir.PointerType(ir_i64))
+            capacity_ptr, fill_ptr = header, self.builder.gep(header, [ir.Constant(ir_i64, 1)])
+            at_end = self.builder.and_(
+                self.builder.icmp_unsigned('==', left_data, self.builder.gep(owner, [ir.Constant(ir_i64, STRING_BUFFER_HEADER)])),
+                self.builder.icmp_signed('==', used, self.builder.load(fill_ptr)))
+            fits = self.builder.and_(self.builder.icmp_signed('==', left_kind, kind),
+                                     self.builder.icmp_signed('<=', needed, self.builder.load(capacity_ptr)))
+            self.builder.cbranch(self.builder.and_(at_end, fits), append, grow)
+            self.set_block(append)
+            self._copy_code_units(self.builder.gep(left_data, [used]), kind, right_data, right_kind, right_length)
+            self.builder.store(needed, fill_ptr)
+            self._string_view(left_data, length, kind, out, owner)
+            self.builder.branch(self.exit_block)
+            self.set_block(grow)
+            doubled = self.builder.mul(needed, ir.Constant(ir_i64, 2))
+            doubled = self.builder.select(self.builder.icmp_signed('<', doubled, ir.Constant(ir_i64, STRING_MIN_CAPACITY)),
+                                          ir.Constant(ir_i64, STRING_MIN_CAPACITY), doubled)
+            # Only strings that were already built by concatenation over-allocate.
+            capacity = self.builder.select(has_owner, doubled, needed)
+            buffer = self._allocate_bytes(self.builder.add(capacity, ir.Constant(ir_i64, STRING_BUFFER_HEADER)))
+            header = self.builder.bitcast(buffer, ir.PointerType(ir_i64))
+            self.builder.store(capacity, header)
+            self.builder.store(needed, self.builder.gep(header, [ir.Constant(ir_i64, 1)]))
+            data = self.builder.gep(buffer, [ir.Constant(ir_i64, STRING_BUFFER_HEADER)])
+            self._copy_code_units(data, kind, left_data, left_kind, left_length)
+            self._copy_code_units(self.builder.gep(data, [self.builder.mul(left_length, kind)]), kind,
+                                  right_data, right_kind, right_length)
+            self._string_view(data, length, kind, out, buffer)
+        return function
+
+    def _string_join(self, node):
+        separator = self.visit(node.args[0]); items = node.args[1]
+        result = self._copy_string(self.visit_LitStr(core.LitStr('')), self._stack_string())
+        if is_tuple(items.type):
+            value = self.visit(items)
+            for index in range(len(items.type.elements)):
+                if index: self._string_concat(result, separator, result)
+                item = self.builder.load(self.builder.gep(value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)]))
+                self._string_concat(result, item, result)
+            return result
+        item_slot = self._stack_string()
+        if is_array(items.type):
+            if not isinstance(items, core.Var) or items.id not in self.arrays:
+                raise CodegenError('join only supports parameter arrays', items)
+            metadata = self.arrays[items.id]
+            self.guard(self.builder.icmp_signed('==', metadata['ndim'], ir.Constant(ir_i64, 1)),
+                       ERROR_ARRAY_DIMENSION_MISMATCH)
+            length, stride = self.builder.load(metadata['shape']), self.builder.load(metadata['strides'])
+        elif is_list(items.type):
+            pieces = self.visit(items)
+            data, length = self._string_field(pieces, 0), self._string_field(pieces, 1)
+        else:
+            data, length, kind = self._string_fields(self.visit(items))
+        index_ptr = self.entry_alloca(ir_i64, f'join_index_{self.counter}')
+        test, separate, body, done = (self.new_block('join_test'), self.new_block('join_separator'),
+                                      self.new_block('join_body'), self.new_block('join_done'))
+        self.builder.store(ir.Constant(ir_i64, 0), index_ptr); self.builder.branch(test)
+        self.set_block(test)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', index, length), separate, done)
+        self.set_block(separate)
+        with self.builder.if_then(self.builder.icmp_signed('>', index, ir.Constant(ir_i64, 0))):
+            self._string_concat(result, separator, result)
+        self.builder.branch(body); self.set_block(body)
+        if is_array(items.type):
+            address = self._array_element_address(metadata, self.builder.mul(index, stride))
+            item = self._array_element(metadata, address, item_slot)
+        elif is_list(items.type):
+            item = self.builder.gep(data, [index])
+        else:
+            item = self._string_view(self.builder.gep(data, [self.builder.mul(index, kind)]), ir.Constant(ir_i64, 1), kind, item_slot)
+        self._string_concat(result, item, result)
+        self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr); self.builder.branch(test)
+        self.set_block(done)
+        return result
+
+    def _string_pieces(self, method, args):
+        """Split natively into an arena list of views that borrow the source string's code units."""
+        if len(args) == 2:
+            self.guard(self.builder.icmp_signed('!=', self._string_field(args[1], 1), ir.Constant(ir_i64, 0)),
+                       ERROR_EMPTY_SEPARATOR)
+        scan, name = {('split', 1): (self._scan_words, 'split_whitespace'), ('split', 2): (self._scan_separated, 'split'),
+                      ('splitlines', 1): (self._scan_lines, 'splitlines')}[method, len(args)]
+        name = f'pyjiting.string.{name}'
+        helper = self.module.globals.get(name) or self._build_piece_list(name, len(args) - 1, scan)
+        pieces = self.entry_alloca(string_list_type(), f'{method}_result')
+        self.builder.call(helper, [*args, pieces, self.error_ptr])
+        self.propagate_error()
+        return self.builder.load(pieces)
+
+    def _build_piece_list(self, name, separators, scan):
+        """Emit a two-pass helper: count the pieces ``scan`` yields, then fill one arena block holding
+        the list header followed by its views."""
+        arg_types = [string_type()] * (1 + separators) + [ir.PointerType(string_list_type()), ir.PointerType(ir_i32)]
+        with self._helper_function(name, arg_types) as function:
+            value, *extra, out, _ = function.args
+            data, length, kind = self._string_fields(value)
+            count_ptr = self.entry_alloca(ir_i64, 'pieces')
+            self.builder.store(ir.Constant(ir_i64, 0), count_ptr)
+
+            def count(start, end):
+                self.builder.store(self.builder.add(self.builder.load(count_ptr), ir.Constant(ir_i64, 1)), count_ptr)
+            scan(value, data, length, kind, extra, count)
+            total = self.builder.load(count_ptr)
+            # Sizing ``{header, views[total]}`` as an offset from null keeps this target independent.
+            block_type = ir.LiteralStructType([string_list_type().pointee, ir.ArrayType(string_type().pointee, 0)])
+            null = ir.Constant(ir.PointerType(block_type), None)
+            end = self.builder.gep(null, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1), total])
+            block = self.builder.bitcast(self._allocate_bytes(self.builder.ptrtoint(end, ir_i64)), null.type)
+            header = self.builder.gep(block, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 0)])
+            items = self.builder.gep(block, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1), ir.Constant(ir_i32, 0)])
+            self.builder.store(ir.Constant(ir_i64, 0), count_ptr)
+
+            def fill(start, end):
+                index = self.builder.load(count_ptr)
+                self._string_view(self.builder.gep(data, [self.builder.mul(start, kind)]), self.builder.sub(end, start),
+                                  kind, self.builder.gep(items, [index]))
+                self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), count_ptr)
+            scan(value, data, length, kind, extra, fill)
+            for index, field in enumerate((items, total)):
+                self.builder.store(field, self.builder.gep(header, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)]))
+            self.builder.store(header, out)
+        return function
+
+    def _scan_separated(self, value, data, length, kind, extra, emit):
+        separator = extra[0]; size = self._string_field(separator, 1)
+        position_ptr = self.entry_alloca(ir_i64, 'split_position')
+        test, piece, last, done = (self.new_block('split_test'), self.new_block('split_piece'),
+                                   self.new_block('split_last'), self.new_block('split_done'))
+        self.builder.store(ir.Constant(ir_i64, 0), position_ptr); self.builder.branch(test)
+        self.set_block(test)
+        position = self.builder.load(position_ptr)
+        found = self._string_search('find', value, separator, position)
+        self.builder.cbranch(self.builder.icmp_signed('<', found, ir.Constant(ir_i64, 0)), last, piece)
+        self.set_block(piece)
+        emit(position, found)
+        self.builder.store(self.builder.add(found, size), position_ptr); self.builder.branch(test)
+        self.set_block(last)
+        emit(position, length); self.builder.branch(done)
+        self.set_block(done)
+
+    def _scan_words(self, value, data, length, kind, extra, emit):
+        """Yield maximal runs of non-whitespace, as ``str.split()`` without a separator does."""
+        position_ptr, start_ptr = self.entry_alloca(ir_i64, 'words_position'), self.entry_alloca(ir_i64, 'words_start')
+        skip, skip_body, word, word_test, word_body, word_done, done = (
+            self.new_block('words_skip'), self.new_block('words_skip_body'), self.new_block('words_word'),
+            self.new_block('words_word_test'), self.new_block('words_word_body'), self.new_block('words_word_done'),
+            self.new_block('words_done'))
+        one = ir.Constant(ir_i64, 1)
+        self.builder.store(ir.Constant(ir_i64, 0), position_ptr); self.builder.branch(skip)
+        self.set_block(skip)
+        position = self.builder.load(position_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', position, length), skip_body, done)
+        self.set_block(skip_body)
+        space = self._in_ranges(self._codepoint(data, kind, position), UNICODE_SPACE)
+        with self.builder.if_then(space):
+            self.builder.store(self.builder.add(position, one), position_ptr); self.builder.branch(skip)
+        self.builder.store(position, start_ptr); self.builder.branch(word)
+        self.set_block(word)
+        self.builder.store(self.builder.add(self.builder.load(position_ptr), one), position_ptr); self.builder.branch(word_test)
+        self.set_block(word_test)
+        position = self.builder.load(position_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', position, length), word_body, word_done)
+        self.set_block(word_body)
+        space = self._in_ranges(self._codepoint(data, kind, position), UNICODE_SPACE)
+        self.builder.cbranch(space, word_done, word)
+        self.set_block(word_done)
+        emit(self.builder.load(start_ptr), self.builder.load(position_ptr)); self.builder.branch(skip)
+        self.set_block(done)
+
+    def _scan_lines(self, value, data, length, kind, extra, emit):
+        """Yield lines without their terminators; ``\\r\\n`` counts as one break and no empty tail is added."""
+        position_ptr, start_ptr = self.entry_alloca(ir_i64, 'lines_position'), self.entry_alloca(ir_i64, 'lines_start')
+        test, body, brk, advance, tail, done = (self.new_block('lines_test'), self.new_block('lines_body'),
+                                                self.new_block('lines_break'), self.new_block('lines_advance'),
+                                                self.new_block('lines_tail'), self.new_block('lines_done'))
+        zero, one = ir.Constant(ir_i64, 0), ir.Constant(ir_i64, 1)
+        self.builder.store(zero, position_ptr); self.builder.store(zero, start_ptr); self.builder.branch(test)
+        self.set_block(test)
+        position = self.builder.load(position_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', position, length), body, tail)
+        self.set_block(body)
+        codepoint = self._codepoint(data, kind, position)
+        self.builder.cbranch(self._in_ranges(codepoint, UNICODE_LINE_BREAKS), brk, advance)
+        self.set_block(advance)
+        self.builder.store(self.builder.add(position, one), position_ptr); self.builder.branch(test)
+        self.set_block(brk)
+        emit(self.builder.load(start_ptr), position)
+        following = self.builder.add(position, one)
+        carriage = self.builder.icmp_unsigned('==', codepoint, ir.Constant(ir_i32, ord('\r')))
+        self.builder.store(following, position_ptr)
+        with self.builder.if_then(self.builder.and_(carriage, self.builder.icmp_signed('<', following, length))):
+            newline = self._codepoint(data, kind, following)
+            crlf = self.builder.icmp_unsigned('==', newline, ir.Constant(ir_i32, ord('\n')))
+            self.builder.store(self.builder.select(crlf, self.builder.add(following, one), following), position_ptr)
+        self.builder.store(self.builder.load(position_ptr), start_ptr); self.builder.branch(test)
+        self.set_block(tail)
+        start = self.builder.load(start_ptr)
+        with self.builder.if_then(self.builder.icmp_signed('<', start, length)):
+            emit(start, length)
+        self.builder.branch(done)
+        self.set_block(done)
+
+    def _in_ranges(self, codepoint, ranges):
+        result = ir.Constant(ir_i1, 0)
+        for low, high in ranges:
+            if low == high: hit = self.builder.icmp_unsigned('==', codepoint, ir.Constant(ir_i32, low))
+            else:
+                offset = self.builder.sub(codepoint, ir.Constant(ir_i32, low))
+                hit = self.builder.icmp_unsigned('<=', offset, ir.Constant(ir_i32, high - low))
+            result = self.builder.or_(result, hit)
+        return result
+
+    def _string_partition(self, value, separator):
+        data, length, kind = self._string_fields(value)
+        size = self._string_field(separator, 1)
+        self.guard(self.builder.icmp_signed('!=', size, ir.Constant(ir_i64, 0)), ERROR_EMPTY_SEPARATOR)
+        found = self._string_search('find', value, separator)
+        matched = self.builder.icmp_signed('>=', found, ir.Constant(ir_i64, 0))
+        head_end = self.builder.select(matched, found, length)
+        tail_start = self.builder.select(matched, self.builder.add(found, size), length)
+        middle = self.builder.select(matched, separator, self.visit_LitStr(core.LitStr('')))
+        parts = (self._string_view(data, head_end, kind),
+                 self._copy_string(middle, self._allocate_structure(string_type())),
+                 self._string_view(self.builder.gep(data, [self.builder.mul(tail_start, kind)]),
+                                   self.builder.sub(length, tail_start), kind))
+        result = self._allocate_structure(to_lltype(TupleType((str_t,) * 3)))
+        for index, part in enumerate(parts):
+            self.builder.store(part, self.builder.gep(result, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)]))
+        return result
+
+    def _unicode_table(self, name):
+        """Return one generated Unicode table as an internal constant global of this module."""
+        table = self.module.globals.get(f'pyjiting.unicode.{name}')
+        if table is None:
+            data = getattr(unicode_tables(), name)
+            if isinstance(data, bytes): constant = ir.Constant(ir.ArrayType(ir_i8, len(data)), bytearray(data))
+            else: constant = ir.Constant(ir.ArrayType(ir_i32, len(data)), data)
+            table = ir.GlobalVariable(self.module, constant.type, f'pyjiting.unicode.{name}')
+            table.initializer = constant; table.global_constant = True
+            table.linkage = 'internal'; table.unnamed_addr = True
+        return table
+
+    def _table_entry(self, name, index):
+        entry = self.builder.load(self.builder.gep(self._unicode_table(name), [ir.Constant(ir_i64, 0), index]))
+        return self.builder.zext(entry, ir_i64) if entry.type == ir_i8 else entry
+
+    def _unicode_record(self, codepoint, width=None):
+        """Look up a code point's property record; latin-1 units need only one table."""
+        if width == 1: return self._table_entry('latin1', self.builder.zext(codepoint, ir_i64))
+        valid = self.builder.icmp_unsigned('<', codepoint, ir.Constant(ir_i32, MAX_CODEPOINT))
+        codepoint = self.builder.zext(self.builder.select(valid, codepoint, ir.Constant(ir_i32, 0)), ir_i64)
+        block = self._table_entry('stage1', self.builder.lshr(codepoint, ir.Constant(ir_i64, SHIFT)))
+        offset = self.builder.and_(codepoint, ir.Constant(ir_i64, (1 << SHIFT) - 1))
+        return self._table_entry('stage2', self.builder.or_(self.builder.shl(block, ir.Constant(ir_i64, SHIFT)), offset))
+
+    def _build_classify(self):
+        """Emit ``result = len(value) > 0 and every code point has all ``mask`` flags``."""
+        arg_types = [string_type(), ir_i64, ir.PointerType(ir_i64), ir.PointerType(ir_i32)]
+        with self._helper_function('pyjiting.string.classify', arg_types) as function:
+            value, mask, result, _ = function.args
+            data, length, kind = self._string_fields(value)
+            flags_ptr = self.entry_alloca(ir_i64, 'classify_flags')
+            self.builder.store(ir.Constant(ir_i64, -1), flags_ptr)
+
+            # No early exit: the and-reduction keeps the per-width loops vectorizable.
+            def scan(width):
+                def body(index):
+                    record = self._unicode_record(self._codepoint(data, kind, index, width), width)
+                    flags = self._table_entry('flags', record)
+                    self.builder.store(self.builder.and_(self.builder.load(flags_ptr), flags), flags_ptr)
+                self._for_range(ir.Constant(ir_i64, 0), length, body, 'classify')
+            self._by_width([kind], scan)
+            matched = self.builder.icmp_unsigned('==', self.builder.and_(self.builder.load(flags_ptr), mask), mask)
+            nonempty = self.builder.icmp_signed('>', length, ir.Constant(ir_i64, 0))
+            self.builder.store(self.builder.zext(self.builder.and_(matched, nonempty), ir_i64), result)
+        return function
+
+    def _case_mapping(self, name, value):
+        return self._call_helper(f'pyjiting.string.{name}', lambda: self._build_case_mapping(name),
+                                 string_type().pointee, [value])
+
+    def _build_case_mapping(self, name):
+        """Emit ``str.upper``/``str.lower``: an arithmetic loop for ASCII text, table-driven
+        simple mappings otherwise, and Python's own method for special or contextual mappings."""
+        arg_types = [string_type(), string_type(), ir.PointerType(ir_i32)]
+        with self._helper_function(f'pyjiting.string.{name}', arg_types) as function:
+            value, out, _ = function.args
+            data, length, kind = self._string_fields(value)
+            zero = ir.Constant(ir_i64, 0)
+            ascii_check, ascii_map, general, special, mapped = (
+                self.new_block('case_ascii_check'), self.new_block('case_ascii'), self.new_block('case_general'),
+                self.new_block('case_special'), self.new_block('case_mapped'))
+            self.builder.cbranch(self.builder.icmp_signed('==', kind, ir.Constant(ir_i64, 1)), ascii_check, general)
+
+            self.set_block(ascii_check)
+            bits_ptr = self.entry_alloca(ir_i8, 'case_bits')
+            self.builder.store(ir.Constant(ir_i8, 0), bits_ptr)
+            self._for_range(zero, length, lambda index: self.builder.store(
+                self.builder.or_(self.builder.load(bits_ptr), self.builder.load(self.builder.gep(data, [index]))), bits_ptr),
+                'case_ascii_scan')
+            is_ascii = self.builder.icmp_unsigned('<', self.builder.load(bits_ptr), ir.Constant(ir_i8, 0x80))
+            self.builder.cbranch(is_ascii, ascii_map, general)
+
+            self.set_block(ascii_map)
+            buffer = self._allocate_bytes(length)
+            first = ir.Constant(ir_i8, ord('a' if name == 'upper' else 'A'))
+
+            def ascii_body(index):
+                unit = self.builder.load(self.builder.gep(data, [index]))
+                cased = self.builder.icmp_unsigned('<', self.builder.sub(unit, first), ir.Constant(ir_i8, 26))
+                shift = self.builder.select(cased, ir.Constant(ir_i8, 32), ir.Constant(ir_i8, 0))
+                unit = self.builder.sub(unit, shift) if name == 'upper' else self.builder.add(unit, shift)
+                self.builder.store(unit, self.builder.gep(buffer, [index]))
+            self._for_range(zero, length, ascii_body, 'case_ascii_map')
+            self._string_view(buffer, length, ir.Constant(ir_i64, 1), out)
+            self.builder.branch(self.exit_block)
+
+            self.set_block(general)
+            widest_ptr, special_ptr = self.entry_alloca(ir_i32, 'case_widest'), self.entry_alloca(ir_i64, 'case_special')
+            self.builder.store(ir.Constant(ir_i32, 0), widest_ptr); self.builder.store(zero, special_ptr)
+
+            def measure(width):
+                def body(index):
+                    codepoint = self._codepoint(data, kind, index, width)
+                    record = self._unicode_record(codepoint, width)
+                    flags = self._table_entry('flags', record)
+                    self.builder.store(self.builder.or_(self.builder.load(special_ptr), flags), special_ptr)
+                    target = self.builder.add(codepoint, self._table_entry(name, record))
+                    widest = self.builder.load(widest_ptr)
+                    self.builder.store(self.builder.select(self.builder.icmp_unsigned('>', target, widest), target, widest), widest_ptr)
+                self._for_range(zero, length, body, 'case_measure')
+            self._by_width([kind], measure)
+            is_special = self.builder.and_(self.builder.load(special_ptr), ir.Constant(ir_i64, SPECIAL))
+            self.builder.cbranch(self.builder.icmp_unsigned('!=', is_special, zero), special, mapped)
+
+            self.set_block(special)
+            result = self._checked_runtime_call(name, string_type(), [string_type()], [value])
+            self._copy_string(result, out)
+            self.builder.branch(self.exit_block)
+
+            self.set_block(mapped)
+            widest = self.builder.load(widest_ptr)
+            needed = self.builder.select(
+                self.builder.icmp_unsigned('<', widest, ir.Constant(ir_i32, 0x100)), ir.Constant(ir_i64, 1),
+                self.builder.select(self.builder.icmp_unsigned('<', widest, ir.Constant(ir_i32, 0x10000)),
+                                    ir.Constant(ir_i64, 2), ir.Constant(ir_i64, 4)))
+            target_kind = self.builder.select(self.builder.icmp_signed('<', kind, needed), needed, kind)
+            buffer = self._allocate_bytes(self.builder.mul(length, target_kind))
+
+            def store(width):
+                def body(index):
+                    codepoint = self._codepoint(data, kind, index, width)
+                    target = self.builder.add(codepoint, self._table_entry(name, self._unicode_record(codepoint, width)))
+                    if width is None: self._store_codepoint(buffer, target_kind, index, target)
+                    else:
+                        units = self.builder.bitcast(buffer, ir.PointerType(ir.IntType(8 * width)))
+                        unit = target if width == 4 else self.builder.trunc(target, ir.IntType(8 * width))
+                        self.builder.store(unit, self.builder.gep(units, [index]), align=width)
+                self._for_range(zero, length, body, 'case_store')
+            self._by_width([kind, target_kind], store)
+            self._string_view(buffer, length, target_kind, out)
+        return function
+
+    def _string_search(self, mode, haystack, needle, start=None, end=None):
+        """Run the native find/count/startswith/endswith helper with Python's slice clamping."""
+        helper = self.module.globals.get('pyjiting.string.search') or self._build_string_search()
+        result = self.entry_alloca(ir_i64, f'{mode}_result')
+        start = ir.Constant(ir_i64, 0) if start is None else start
+        end = ir.Constant(ir_i64, 2 ** 63 - 1) if end is None else end
+        mode = ir.Constant(ir_i64, STRING_SEARCH_MODES[mode])
+        self.builder.call(helper, [haystack, needle, start, end, mode, result, self.error_ptr])
+        return self.builder.load(result)
+
+    def _build_string_search(self):
+        arg_types = [string_type(), string_type(), ir_i64, ir_i64, ir_i64, ir.PointerType(ir_i64), ir.PointerType(ir_i32)]
+        with self._helper_function('pyjiting.string.search', arg_types) as function:
+            haystack, needle, start, end, mode, result, _ = function.args
+            data, length, kind = self._string_fields(haystack)
+            pattern, size, pattern_kind = self._string_fields(needle)
+            zero = ir.Constant(ir_i64, 0)
+
+            def clamp_negative(value):
+                shifted = self.builder.add(value, length)
+                shifted = self.builder.select(self.builder.icmp_signed('<', shifted, zero), zero, shifted)
+                return self.builder.select(self.builder.icmp_signed('<', value, zero), shifted, value)
+            end = self.builder.select(self.builder.icmp_signed('>', end, length), length, clamp_negative(end))
+            start = clamp_negative(start)
+            span = self.builder.sub(end, start)
+            is_find = self.builder.icmp_signed('==', mode, ir.Constant(ir_i64, STRING_SEARCH_MODES['find']))
+            self.builder.store(self.builder.select(is_find, ir.Constant(ir_i64, -1), zero), result)
+            dispatch, search, prefix, suffix, empty, scan = (
+                self.new_block('search_dispatch'), self.new_block('search_body'), self.new_block('search_prefix'),
+                self.new_block('search_suffix'), self.new_block('search_empty'), self.new_block('search_scan'))
+            self.builder.cbranch(self.builder.icmp_signed('<', span, size), self.exit_block, dispatch)
+            self.set_block(dispatch)
+            suffix_start = self.builder.sub(end, size)
+            switch = self.builder.switch(mode, search)
+            switch.add_case(ir.Constant(ir_i64, STRING_SEARCH_MODES['startswith']), prefix)
+            switch.add_case(ir.Constant(ir_i64, STRING_SEARCH_MODES['endswith']), suffix)
+            for block, offset in ((prefix, start), (suffix, suffix_start)):
+                self.set_block(block)
+                matched = self._matches_at(data, kind, offset, pattern, pattern_kind, size)
+                self.builder.store(self.builder.zext(matched, ir_i64), result)
+                self.builder.branch(self.exit_block)
+            self.set_block(search)
+            self.builder.cbranch(self.builder.icmp_signed('==', size, zero), empty, scan)
+            self.set_block(empty)
+            self.builder.store(self.builder.select(is_find, start, self.builder.add(span, ir.Constant(ir_i64, 1))), result)
+            self.builder.branch(self.exit_block)
+            self.set_block(scan)
+            self._by_width([kind, pattern_kind], lambda width: self._emit_search(
+                width, data, kind, pattern, pattern_kind, size, start, end, is_find, result))
+        return function
+
+    def _matches_at(self, data, kind, offset, pattern, pattern_kind, count, width=None):
+        """Return whether ``count`` code points of ``pattern`` occur at ``offset`` in ``data``."""
+        index_ptr = self.entry_alloca(ir_i64, 'match_index')
+        matched_ptr = self.entry_alloca(ir_i1, 'match_result')
+        test, body, advance, done = (self.new_block('match_test'), self.new_block('match_body'),
+                                     self.new_block('match_advance'), self.new_block('match_done'))
+        self.builder.store(ir.Constant(ir_i64, 0), index_ptr)
+        self.builder.store(ir.Constant(ir_i1, 1), matched_ptr)
+        self.builder.branch(test); self.set_block(test)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', index, count), body, done)
+        self.set_block(body)
+        same = self.builder.icmp_unsigned(
+            '==', self._codepoint(data, kind, self.builder.add(offset, index), width),
+            self._codepoint(pattern, pattern_kind, index, width))
+        self.builder.store(same, matched_ptr)
+        self.builder.cbranch(same, advance, done)
+        self.set_block(advance)
+        self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr); self.builder.branch(test)
+        self.set_block(done)
+        return self.builder.load(matched_ptr)
+
+    def _emit_search(self, width, data, kind, pattern, pattern_kind, size, start, end, is_find, result):
+        """Single code points use a flat scan (branch-free for ``count``); longer needles use Horspool."""
+        one = ir.Constant(ir_i64, 1)
+        index_ptr = self.entry_alloca(ir_i64, 'search_index')
+        count_ptr = self.entry_alloca(ir_i64, 'search_count')
+        self.builder.store(start, index_ptr); self.builder.store(ir.Constant(ir_i64, 0), count_ptr)
+        single, horspool = self.new_block('search_single'), self.new_block('search_horspool')
+        self.builder.cbranch(self.builder.icmp_signed('==', size, one), single, horspool)
+
+        self.set_block(single)
+        target = self._codepoint(pattern, pattern_kind, ir.Constant(ir_i64, 0), width)
+        find_test, find_body, find_next = (self.new_block('scan_find_test'), self.new_block('scan_find_body'),
+                                           self.new_block('scan_find_next'))
+        count_test, count_body, count_done = (self.new_block('scan_count_test'), self.new_block('scan_count_body'),
+                                              self.new_block('scan_count_done'))
+        self.builder.cbranch(is_find, find_test, count_test)
+        self.set_block(find_test)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', index, end), find_body, self.exit_block)
+        self.set_block(find_body)
+        hit = self.builder.icmp_unsigned('==', self._codepoint(data, kind, index, width), target)
+        self.builder.store(index, result)
+        self.builder.cbranch(hit, self.exit_block, find_next)
+        self.set_block(find_next)
+        self.builder.store(ir.Constant(ir_i64, -1), result)
+        self.builder.store(self.builder.add(index, one), index_ptr); self.builder.branch(find_test)
+        self.set_block(count_test)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', index, end), count_body, count_done)
+        self.set_block(count_body)
+        hit = self.builder.icmp_unsigned('==', self._codepoint(data, kind, index, width), target)
+        self.builder.store(self.builder.add(self.builder.load(count_ptr), self.builder.zext(hit, ir_i64)), count_ptr)
+        self.builder.store(self.builder.add(index, one), index_ptr); self.builder.branch(count_test)
+        self.set_block(count_done)
+        self.builder.store(self.builder.load(count_ptr), result); self.builder.branch(self.exit_block)
+
+        # Horspool: shift by the distance from the window's last code point to its final
+        # occurrence in the needle, bucketed by the low byte and capped at 255.
+        self.set_block(horspool)
+        table = self.entry_alloca(ir.ArrayType(ir_i8, 256), 'horspool_shift')
+        table_bytes = self.builder.bitcast(table, ir.PointerType(ir_i8))
+        cap = ir.Constant(ir_i64, 255)
+        capped = self.builder.select(self.builder.icmp_signed('<', size, cap), size, cap)
+        memset = self.module.declare_intrinsic('llvm.memset', [ir.PointerType(ir_i8), ir_i64])
+        self.builder.call(memset, [table_bytes, self.builder.trunc(capped, ir_i8), ir.Constant(ir_i64, 256),
+                                   ir.Constant(ir_i1, 0)])
+        last_index = self.builder.sub(size, one)
+        fill_test, fill_body, search_test, search_body, verify, found, shift, search_done = (
+            self.new_block('horspool_fill_test'), self.new_block('horspool_fill_body'),
+            self.new_block('horspool_test'), self.new_block('horspool_body'), self.new_block('horspool_verify'),
+            self.new_block('horspool_found'), self.new_block('horspool_shift'), self.new_block('horspool_done'))
+        fill_ptr = self.entry_alloca(ir_i64, 'horspool_fill')
+        self.builder.store(ir.Constant(ir_i64, 0), fill_ptr); self.builder.branch(fill_test)
+        self.set_block(fill_test)
+        position = self.builder.load(fill_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', position, last_index), fill_body, search_test)
+        self.set_block(fill_body)
+        bucket = self.builder.and_(self._codepoint(pattern, pattern_kind, position, width), ir.Constant(ir_i32, 255))
+        distance = self.builder.sub(last_index, position)
+        distance = self.builder.select(self.builder.icmp_signed('<', distance, cap), distance, cap)
+        self.builder.store(self.builder.trunc(distance, ir_i8),
+                           self.builder.gep(table_bytes, [self.builder.zext(bucket, ir_i64)]))
+        self.builder.store(self.builder.add(position, one), fill_ptr); self.builder.branch(fill_test)
+        self.set_block(search_test)
+        last = self._codepoint(pattern, pattern_kind, last_index, width)
+        limit = self.builder.sub(end, size)
+        search_loop = self.new_block('horspool_loop')
+        self.builder.branch(search_loop); self.set_block(search_loop)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<=', index, limit), search_body, search_done)
+        self.set_block(search_body)
+        tail = self._codepoint(data, kind, self.builder.add(index, last_index), width)
+        self.builder.cbranch(self.builder.icmp_unsigned('==', tail, last), verify, shift)
+        self.set_block(verify)
+        matched = self._matches_at(data, kind, index, pattern, pattern_kind, last_index, width)
+        self.builder.cbranch(matched, found, shift)
+        self.set_block(found)
+        with self.builder.if_then(is_find):
+            self.builder.store(index, result); self.builder.branch(self.exit_block)
+        self.builder.store(self.builder.add(self.builder.load(count_ptr), one), count_ptr)
+        self.builder.store(self.builder.add(index, size), index_ptr); self.builder.branch(search_loop)
+        self.set_block(shift)
+        bucket = self.builder.zext(self.builder.and_(tail, ir.Constant(ir_i32, 255)), ir_i64)
+        step = self.builder.zext(self.builder.load(self.builder.gep(table_bytes, [bucket])), ir_i64)
+        self.builder.store(self.builder.add(index, step), index_ptr); self.builder.branch(search_loop)
+        self.set_block(search_done)
+        with self.builder.if_then(self.builder.not_(is_find)):
+            self.builder.store(self.builder.load(count_ptr), result)
+        self.builder.branch(self.exit_block)
+
+    def _convert(self, name, value, source):
+        if name == 'int':
+            if is_string(source): return self._string_to_int(value)
+            if is_float(source): return self._float_to_int(self.cast(value, source, double64_t))
+            return self.cast(value, source, int64_t)
+        if name == 'float':
+            return self._string_to_float(value) if is_string(source) else self.cast(value, source, double64_t)
+        if is_string(source): return value
+        if source == bool_t:
+            words = [self.visit_LitStr(core.LitStr(word)) for word in ('False', 'True')]
+            return self.builder.select(self.truthy(value, source), words[1], words[0])
+        if is_float(source): return self._float_to_string(self.cast(value, source, double64_t))
+        return self._int_to_string(self.cast(value, source, int64_t))
+
+    def _for_range(self, start, stop, body, name='range'):
+        """Emit ``for index in range(start, stop): body(index)``; ``body`` may branch away."""
+        index_ptr = self.entry_alloca(ir_i64, f'{name}_index')
+        test, block, done = self.new_block(f'{name}_test'), self.new_block(f'{name}_body'), self.new_block(f'{name}_done')
+        self.builder.store(start, index_ptr); self.builder.branch(test)
+        self.set_block(test)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', index, stop), block, done)
+        self.set_block(block); body(index)
+        if not self.terminated():
+            self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr); self.builder.branch(test)
+        self.set_block(done)
+
+    def _is_ascii_space(self, codepoint):
+        def between(low, high):
+            return self.builder.and_(self.builder.icmp_unsigned('>=', codepoint, ir.Constant(ir_i32, low)),
+                                     self.builder.icmp_unsigned('<=', codepoint, ir.Constant(ir_i32, high)))
+        return self.builder.or_(self.builder.icmp_unsigned('==', codepoint, ir.Constant(ir_i32, 32)),
+                                self.builder.or_(between(9, 13), between(28, 31)))
+
+    def _trim_ascii_space(self, data, kind, length):
+        """Return ``(lower, upper)`` bounds with ASCII whitespace stripped from both ends."""
+        lower_ptr, upper_ptr = self.entry_alloca(ir_i64, 'trim_lower'), self.entry_alloca(ir_i64, 'trim_upper')
+        self.builder.store(ir.Constant(ir_i64, 0), lower_ptr); self.builder.store(length, upper_ptr)
+        for pointer, step in ((lower_ptr, 1), (upper_ptr, -1)):
+            test, body, advance, done = (self.new_block('trim_test'), self.new_block('trim_body'),
+                                         self.new_block('trim_advance'), self.new_block('trim_done'))
+            self.builder.branch(test); self.set_block(test)
+            lower, upper = self.builder.load(lower_ptr), self.builder.load(upper_ptr)
+            self.builder.cbranch(self.builder.icmp_signed('<', lower, upper), body, done)
+            self.set_block(body)
+            position = lower if step == 1 else self.builder.sub(upper, ir.Constant(ir_i64, 1))
+            self.builder.cbranch(self._is_ascii_space(self._codepoint(data, kind, position)), advance, done)
+            self.set_block(advance)
+            self.builder.store(self.builder.add(self.builder.load(pointer), ir.Constant(ir_i64, step)), pointer)
+            self.builder.branch(test)
+            self.set_block(done)
+        return self.builder.load(lower_ptr), self.builder.load(upper_ptr)
+
+    def _call_helper(self, name, build, return_type, args):
+        helper = self.module.globals.get(name) or build()
+        result = self.entry_alloca(return_type, name.rsplit('.', 1)[-1] + '_result')
+        self.builder.call(helper, [*args, result, self.error_ptr])
+        self.propagate_error()
+        # String helpers fill a stack descriptor, which is itself the borrowed string value.
+        return result if return_type == string_type().pointee else self.builder.load(result)
+
+    def _string_to_int(self, value):
+        return self._call_helper('pyjiting.string.to_int', self._build_string_to_int, ir_i64, [value])
+
+    def _build_string_to_int(self):
+        """Parse ``[space][sign]digits[space]`` natively, accumulating negatively so INT64_MIN fits."""
+        with self._helper_function('pyjiting.string.to_int',
+                                   [string_type(), ir.PointerType(ir_i64), ir.PointerType(ir_i32)]) as function:
+            value, result, _ = function.args
+            data, length, kind = self._string_fields(value)
+            lower, upper = self._trim_ascii_space(data, kind, length)
+            signed, digits, finish, slow = (self.new_block('to_int_sign'), self.new_block('to_int_digits'),
+                                            self.new_block('to_int_finish'), self.new_block('to_int_slow'))
+            self.builder.cbranch(self.builder.icmp_signed('<', lower, upper), signed, slow)
+            self.set_block(signed)
+            first = self._codepoint(data, kind, lower)
+            negative = self.builder.icmp_unsigned('==', first, ir.Constant(ir_i32, ord('-')))
+            has_sign = self.builder.or_(negative, self.builder.icmp_unsigned('==', first, ir.Constant(ir_i32, ord('+'))))
+            begin = self.builder.add(lower, self.builder.zext(has_sign, ir_i64))
+            self.builder.cbranch(self.builder.icmp_signed('<', begin, upper), digits, slow)
+            self.set_block(digits)
+            total_ptr = self.entry_alloca(ir_i64, 'to_int_total')
+            self.builder.store(ir.Constant(ir_i64, 0), total_ptr)
+
+            def accumulate(index):
+                digit = self.builder.sub(self._codepoint(data, kind, index), ir.Constant(ir_i32, ord('0')))
+                valid = self.new_block('to_int_valid')
+                self.builder.cbranch(self.builder.icmp_unsigned('>', digit, ir.Constant(ir_i32, 9)), slow, valid)
+                self.set_block(valid)
+                scaled = self.builder.smul_with_overflow(self.builder.load(total_ptr), ir.Constant(ir_i64, 10))
+                total = self.builder.ssub_with_overflow(self.builder.extract_value(scaled, 0), self.builder.zext(digit, ir_i64))
+                overflow = self.builder.or_(self.builder.extract_value(scaled, 1), self.builder.extract_value(total, 1))
+                stored = self.new_block('to_int_stored')
+                self.builder.cbranch(overflow, slow, stored)
+                self.set_block(stored)
+                self.builder.store(self.builder.extract_value(total, 0), total_ptr)
+            self._for_range(begin, upper, accumulate, 'to_int')
+            total = self.builder.load(total_ptr)
+            overflow = self.builder.and_(self.builder.not_(negative),
+                                         self.builder.icmp_signed('==', total, ir.Constant(ir_i64, -2 ** 63)))
+            self.builder.cbranch(overflow, slow, finish)
+            self.set_block(finish)
+            self.builder.store(self.builder.select(negative, total, self.builder.neg(total)), result)
+            self.builder.branch(self.exit_block)
+            self.set_block(slow)
+            self.builder.store(self._runtime_call('int', ir_i64, [string_type(), ir.PointerType(ir_i32)],
+                                                  [value, self.error_ptr]), result)
+        return function
+
+    def _libc_function(self, name, return_type, arg_types, var_arg=False):
+        return self.module.globals.get(name) or ir.Function(
+            self.module, ir.FunctionType(return_type, arg_types, var_arg=var_arg), name)
+
+    def _string_to_float(self, value):
+        return self._call_helper('pyjiting.string.to_float', self._build_string_to_float, ir_f64, [value])
+
+    def _build_string_to_float(self):
+        """Hand short ``[0-9+-.eE]`` fields to ``strtod``, whose grammar matches Python's for them."""
+        with self._helper_function('pyjiting.string.to_float',
+                                   [string_type(), ir.PointerType(ir_f64), ir.PointerType(ir_i32)]) as function:
+            value, result, _ = function.args
+            data, length, kind = self._string_fields(value)
+            lower, upper = self._trim_ascii_space(data, kind, length)
+            size = self.builder.sub(upper, lower)
+            copy, slow = self.new_block('to_float_copy'), self.new_block('to_float_slow')
+            fits = self.builder.and_(self.builder.icmp_signed('>', size, ir.Constant(ir_i64, 0)),
+                                     self.builder.icmp_signed('<=', size, ir.Constant(ir_i64, FLOAT_FIELD_LIMIT)))
+            self.builder.cbranch(fits, copy, slow)
+            self.set_block(copy)
+            field = self.builder.bitcast(self.entry_alloca(ir.ArrayType(ir_i8, FLOAT_FIELD_LIMIT + 1), 'to_float_field'),
+                                         ir.PointerType(ir_i8))
+
+            def store(index):
+                codepoint = self._codepoint(data, kind, self.builder.add(lower, index))
+                digit = self.builder.icmp_unsigned('<=', self.builder.sub(codepoint, ir.Constant(ir_i32, ord('0'))),
+                                                   ir.Constant(ir_i32, 9))
+                for char in '+-.eE':
+                    digit = self.builder.or_(digit, self.builder.icmp_unsigned('==', codepoint, ir.Constant(ir_i32, ord(char))))
+                valid = self.new_block('to_float_valid')
+                self.builder.cbranch(digit, valid, slow)
+                self.set_block(valid)
+                self.builder.store(self.builder.trunc(codepoint, ir_i8), self.builder.gep(field, [index]))
+            self._for_range(ir.Constant(ir_i64, 0), size, store, 'to_float')
+            self.builder.store(ir.Constant(ir_i8, 0), self.builder.gep(field, [size]))
+            end_ptr = self.entry_alloca(ir.PointerType(ir_i8), 'to_float_end')
+            strtod = self._libc_function('strtod', ir_f64, [ir.PointerType(ir_i8), ir.PointerType(ir.PointerType(ir_i8))])
+            parsed = self.builder.call(strtod, [field, end_ptr])
+            done = self.new_block('to_float_done')
+            self.builder.cbranch(self.builder.icmp_unsigned('==', self.builder.load(end_ptr), self.builder.gep(field, [size])),
+                                 done, slow)
+            self.set_block(done)
+            self.builder.store(parsed, result); self.builder.branch(self.exit_block)
+            self.set_block(slow)
+            self.builder.store(self._runtime_call('float', ir_f64, [string_type(), ir.PointerType(ir_i32)],
+                                                  [value, self.error_ptr]), result)
+        return function
+
+    def _float_to_int(self, value):
+        """Truncate like ``int(x)``; NaN, infinities and out-of-range values raise through Python."""
+        result = self.entry_alloca(ir_i64, 'float_to_int')
+        in_range = self.builder.and_(self.builder.fcmp_ordered('>=', value, ir.Constant(ir_f64, -2.0 ** 63)),
+                                     self.builder.fcmp_ordered('<', value, ir.Constant(ir_f64, 2.0 ** 63)))
+        with self.builder.if_else(in_range) as (fast, slow):
+            with fast:
+                self.builder.store(self.builder.fptosi(value, ir_i64), result)
+            with slow:
+                self.builder.store(self._runtime_call('float_to_int', ir_i64, [ir_f64, ir.PointerType(ir_i32)],
+                                                      [value, self.error_ptr]), result)
+        self.propagate_error()
+        return self.builder.load(result)
+
+    def _finish_ascii(self, buffer, size, out):
+        """Copy ``size`` ASCII bytes from a stack buffer into an arena-owned latin-1 string."""
+        data = self._allocate_bytes(size)
+        memcpy = self.module.declare_intrinsic('llvm.memcpy', [ir.PointerType(ir_i8), ir.PointerType(ir_i8), ir_i64])
+        self.builder.call(memcpy, [data, buffer, size, ir.Constant(ir_i1, 0)])
+        self._string_view(data, size, ir.Constant(ir_i64, 1), out)
+
+    def _int_to_string(self, value):
+        return self._call_helper('pyjiting.string.from_int', self._build_int_to_string, string_type().pointee, [value])
+
+    def _build_int_to_string(self):
+        with self._helper_function('pyjiting.string.from_int',
+                                   [ir_i64, string_type(), ir.PointerType(ir_i32)]) as function:
+            value, out, _ = function.args
+            width = 24
+            buffer = self.builder.bitcast(self.entry_alloca(ir.ArrayType(ir_i8, width), 'from_int_digits'),
+                                          ir.PointerType(ir_i8))
+            position_ptr, rest_ptr = self.entry_alloca(ir_i64, 'from_int_position'), self.entry_alloca(ir_i64, 'from_int_rest')
+            self.builder.store(ir.Constant(ir_i64, width), position_ptr); self.builder.store(value, rest_ptr)
+
+            def put(byte):
+                position = self.builder.sub(self.builder.load(position_ptr), ir.Constant(ir_i64, 1))
+                self.builder.store(byte, self.builder.gep(buffer, [position])); self.builder.store(position, position_ptr)
+            body, done = self.new_block('from_int_digit'), self.new_block('from_int_sign')
+            self.builder.branch(body); self.set_block(body)
+            rest = self.builder.load(rest_ptr)
+            # srem keeps the sign of ``rest``, so negate per digit instead of negating INT64_MIN.
+            remainder = self.builder.srem(rest, ir.Constant(ir_i64, 10))
+            remainder = self.builder.select(self.builder.icmp_signed('<', remainder, ir.Constant(ir_i64, 0)),
+                                            self.builder.neg(remainder), remainder)
+            put(self.builder.add(self.builder.trunc(remainder, ir_i8), ir.Constant(ir_i8, ord('0'))))
+            rest = self.builder.sdiv(rest, ir.Constant(ir_i64, 10)); self.builder.store(rest, rest_ptr)
+            self.builder.cbranch(self.builder.icmp_signed('!=', rest, ir.Constant(ir_i64, 0)), body, done)
+            self.set_block(done)
+            with self.builder.if_then(self.builder.icmp_signed('<', value, ir.Constant(ir_i64, 0))):
+                put(ir.Constant(ir_i8, ord('-')))
+            position = self.builder.load(position_ptr)
+            self._finish_ascii(self.builder.gep(buffer, [position]), self.builder.sub(ir.Constant(ir_i64, width), position), out)
+        return function
+
+    def _float_to_string(self, value):
+        return self._call_helper('pyjiting.string.from_float', self._build_float_to_string, string_type().pointee, [value])
+
+    def _build_float_to_string(self):
+        """Format like ``repr(float)``: the shortest ``%.*e`` that round-trips, then Python's layout."""
+        with self._helper_function('pyjiting.string.from_float',
+                                   [ir_f64, string_type(), ir.PointerType(ir_i32)]) as function:
+            value, out, _ = function.args
+            zero, one = ir.Constant(ir_i64, 0), ir.Constant(ir_i64, 1)
+            text = self.builder.bitcast(self.entry_alloca(ir.ArrayType(ir_i8, 40), 'from_float_text'), ir.PointerType(ir_i8))
+            scratch = self.builder.bitcast(self.entry_alloca(ir.ArrayType(ir_i8, 40), 'from_float_scratch'), ir.PointerType(ir_i8))
+            digits = self.builder.bitcast(self.entry_alloca(ir.ArrayType(ir_i8, 24), 'from_float_digits'), ir.PointerType(ir_i8))
+            position_ptr = self.entry_alloca(ir_i64, 'from_float_position')
+            self.builder.store(zero, position_ptr)
+
+            def put(byte):
+                position = self.builder.load(position_ptr)
+                self.builder.store(byte, self.builder.gep(text, [position]))
+                self.builder.store(self.builder.add(position, one), position_ptr)
+
+            def put_text(chars):
+                for char in chars: put(ir.Constant(ir_i8, ord(char)))
+            negative = self.builder.icmp_signed('<', self.builder.bitcast(value, ir_i64), zero)
+            finite, special, finish = self.new_block('from_float_finite'), self.new_block('from_float_special'), self.new_block('from_float_finish')
+            fabs = self.module.declare_intrinsic('llvm.fabs', [ir_f64])
+            is_finite = self.builder.fcmp_ordered('<', self.builder.call(fabs, [value]), ir.Constant(ir_f64, float('inf')))
+            self.builder.cbranch(is_finite, finite, special)
+            self.set_block(special)
+            with self.builder.if_else(self.builder.fcmp_unordered('uno', value, value)) as (nan, infinite):
+                with nan: put_text('nan')
+                with infinite:
+                    with self.builder.if_then(negative): put(ir.Constant(ir_i8, ord('-')))
+                    put_text('inf')
+            self.builder.branch(finish)
+
+            self.set_block(finite)
+            pattern = self.module.globals.get('pyjiting.format.exponent')
+            if pattern is None:
+                encoded = bytearray(b'%.*e\0')
+                pattern = ir.GlobalVariable(self.module, ir.ArrayType(ir_i8, len(encoded)), 'pyjiting.format.exponent')
+                pattern.global_constant, pattern.linkage = True, 'internal'
+                pattern.initializer = ir.Constant(ir.ArrayType(ir_i8, len(encoded)), encoded)
+            snprintf = self._libc_function('snprintf', ir_i32, [ir.PointerType(ir_i8), ir_i64, ir.PointerType(ir_i8)], var_arg=True)
+            strtod = self._libc_function('strtod', ir_f64, [ir.PointerType(ir_i8), ir.PointerType(ir.PointerType(ir_i8))])
+            precision_ptr = self.entry_alloca(ir_i32, 'from_float_precision')
+            self.builder.store(ir.Constant(ir_i32, 0), precision_ptr)
+            attempt, parse = self.new_block('from_float_attempt'), self.new_block('from_float_parse')
+            self.builder.branch(attempt); self.set_block(attempt)
+            precision = self.builder.load(precision_ptr)
+            self.builder.call(snprintf, [scratch, ir.Constant(ir_i64, 40), self.builder.bitcast(pattern, ir.PointerType(ir_i8)),
+                                         precision, value])
+            back = self.builder.call(strtod, [scratch, ir.Constant(ir.PointerType(ir.PointerType(ir_i8)), None)])
+            self.builder.store(self.builder.add(precision, ir.Constant(ir_i32, 1)), precision_ptr)
+            exact = self.builder.or_(self.builder.fcmp_ordered('==', back, value),
+                                     self.builder.icmp_signed('>=', precision, ir.Constant(ir_i32, 16)))
+            self.builder.cbranch(exact, parse, attempt)
+
+            # scratch is ``[-]d[.ddd]e(+|-)xx``; collect the mantissa digits and the exponent.
+            self.set_block(parse)
+            count_ptr, cursor_ptr, exponent_ptr = (self.entry_alloca(ir_i64, 'from_float_count'),
+                                                   self.entry_alloca(ir_i64, 'from_float_cursor'),
+                                                   self.entry_alloca(ir_i64, 'from_float_exponent'))
+            self.builder.store(zero, count_ptr); self.builder.store(self.builder.zext(negative, ir_i64), cursor_ptr)
+            self.builder.store(zero, exponent_ptr)
+            mantissa, exponent_sign, exponent_digits, layout = (
+                self.new_block('from_float_mantissa'), self.new_block('from_float_exponent_sign'),
+                self.new_block('from_float_exponent_digits'), self.new_block('from_float_layout'))
+            self.builder.branch(mantissa); self.set_block(mantissa)
+            cursor = self.builder.load(cursor_ptr)
+            char = self.builder.load(self.builder.gep(scratch, [cursor]))
+            self.builder.store(self.builder.add(cursor, one), cursor_ptr)
+            is_exponent = self.builder.icmp_unsigned('==', char, ir.Constant(ir_i8, ord('e')))
+            is_digit = self.builder.icmp_unsigned('<=', self.builder.sub(char, ir.Constant(ir_i8, ord('0'))), ir.Constant(ir_i8, 9))
+            with self.builder.if_then(is_digit):
+                count = self.builder.load(count_ptr)
+                self.builder.store(char, self.builder.gep(digits, [count]))
+                self.builder.store(self.builder.add(count, one), count_ptr)
+            self.builder.cbranch(is_exponent, exponent_sign, mantissa)
+            self.set_block(exponent_sign)
+            cursor = self.builder.load(cursor_ptr)
+            exponent_negative = self.builder.icmp_unsigned('==', self.builder.load(self.builder.gep(scratch, [cursor])),
+                                                           ir.Constant(ir_i8, ord('-')))
+            self.builder.store(self.builder.add(cursor, one), cursor_ptr)
+            self.builder.branch(exponent_digits); self.set_block(exponent_digits)
+            cursor = self.builder.load(cursor_ptr)
+            char = self.builder.load(self.builder.gep(scratch, [cursor]))
+            read_digit = self.new_block('from_float_exponent_digit')
+            self.builder.cbranch(self.builder.icmp_unsigned('==', char, ir.Constant(ir_i8, 0)), layout, read_digit)
+            self.set_block(read_digit)
+            digit = self.builder.zext(self.builder.sub(char, ir.Constant(ir_i8, ord('0'))), ir_i64)
+            self.builder.store(self.builder.add(self.builder.mul(self.builder.load(exponent_ptr), ir.Constant(ir_i64, 10)), digit),
+                               exponent_ptr)
+            self.builder.store(self.builder.add(cursor, one), cursor_ptr); self.builder.branch(exponent_digits)
+
+            self.set_block(layout)
+            magnitude = self.builder.load(exponent_ptr)
+            exponent = self.builder.select(exponent_negative, self.builder.neg(magnitude), magnitude)
+            trim_test, trim = self.new_block('from_float_trim_test'), self.new_block('from_float_trim')
+            emit = self.new_block('from_float_emit')
+            self.builder.branch(trim_test); self.set_block(trim_test)
+            count = self.builder.load(count_ptr)
+            last = self.builder.load(self.builder.gep(digits, [self.builder.sub(count, one)]))
+            trailing = self.builder.and_(self.builder.icmp_signed('>', count, one),
+                                         self.builder.icmp_unsigned('==', last, ir.Constant(ir_i8, ord('0'))))
+            self.builder.cbranch(trailing, trim, emit)
+            self.set_block(trim)
+            self.builder.store(self.builder.sub(count, one), count_ptr); self.builder.branch(trim_test)
+            self.set_block(emit)
+            count = self.builder.load(count_ptr)
+            with self.builder.if_then(negative): put(ir.Constant(ir_i8, ord('-')))
+
+            def digit_or_zero(index):
+                present = self.builder.icmp_signed('<', index, count)
+                safe = self.builder.select(present, index, zero)
+                return self.builder.select(present, self.builder.load(self.builder.gep(digits, [safe])), ir.Constant(ir_i8, ord('0')))
+            # repr() switches to scientific notation outside 1e-4 <= |x| < 1e16.
+            fixed = self.builder.and_(self.builder.icmp_signed('>=', exponent, ir.Constant(ir_i64, -4)),
+                                      self.builder.icmp_signed('<', exponent, ir.Constant(ir_i64, 16)))
+            with self.builder.if_else(fixed) as (positional, scientific):
+                with positional:
+                    with self.builder.if_else(self.builder.icmp_signed('>=', exponent, zero)) as (large, small):
+                        with large:
+                            integral = self.builder.add(exponent, one)
+                            self._for_range(zero, integral, lambda index: put(digit_or_zero(index)), 'from_float_integral')
+                            put(ir.Constant(ir_i8, ord('.')))
+                            with self.builder.if_else(self.builder.icmp_signed('>', count, integral)) as (fraction, whole):
+                                with fraction:
+                                    self._for_range(integral, count, lambda index: put(digit_or_zero(index)), 'from_float_fraction')
+                                with whole: put(ir.Constant(ir_i8, ord('0')))
+                        with small:
+                            put_text('0.')
+                            self._for_range(one, self.builder.neg(exponent), lambda index: put(ir.Constant(ir_i8, ord('0'))), 'from_float_zeros')
+                            self._for_range(zero, count, lambda index: put(digit_or_zero(index)), 'from_float_significand')
+                with scientific:
+                    put(digit_or_zero(zero))
+                    with self.builder.if_then(self.builder.icmp_signed('>', count, one)):
+                        put(ir.Constant(ir_i8, ord('.')))
+                        self._for_range(one, count, lambda index: put(digit_or_zero(index)), 'from_float_mantissa_digits')
+                    put(ir.Constant(ir_i8, ord('e')))
+                    put(self.builder.select(exponent_negative, ir.Constant(ir_i8, ord('-')), ir.Constant(ir_i8, ord('+'))))
+                    for scale in (100, 10, 1):
+                        place = self.builder.urem(self.builder.udiv(magnitude, ir.Constant(ir_i64, scale)), ir.Constant(ir_i64, 10))
+                        wanted = self.builder.icmp_signed('>=', magnitude, ir.Constant(ir_i64, scale)) if scale == 100 else ir.Constant(ir_i1, 1)
+                        with self.builder.if_then(wanted):
+                            put(self.builder.add(self.builder.trunc(place, ir_i8), ir.Constant(ir_i8, ord('0'))))
+            self.builder.branch(finish)
+            self.set_block(finish)
+            self._finish_ascii(text, self.builder.load(position_ptr), out)
+        return function
+
+    def _by_width(self, kinds, emit):
+        """Emit ``emit(width)`` once per kind shared by ``kinds`` plus a mixed-kind fallback."""
+        done = self.new_block('kind_done')
+        blocks = {width: self.new_block(f'kind_ucs{width}') for width in STRING_KINDS}
+        mixed = self.new_block('kind_mixed')
+        same = self.builder.and_(*[self.builder.icmp_signed('==', kinds[0], kind) for kind in kinds[1:]]) \
+            if len(kinds) > 2 else self.builder.icmp_signed('==', kinds[0], kinds[-1])
+        dispatch = self.new_block('kind_dispatch')
+        self.builder.cbranch(same, dispatch, mixed)
+        self.set_block(dispatch)
+        switch = self.builder.switch(kinds[0], mixed)
+        for width, block in blocks.items(): switch.add_case(ir.Constant(ir_i64, width), block)
+        for width, block in [*blocks.items(), (None, mixed)]:
+            self.set_block(block); emit(width)
+            if not self.terminated(): self.builder.branch(done)
+        self.set_block(done)
 
-    def _string_character(self, value, raw_index):
-        length = self.builder.load(self.builder.gep(
-            value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1)]))
+    def _checked_index(self, raw_index, length):
+        """Wrap a negative index once and guard it against ``length``."""
         negative = self.builder.icmp_signed('<', raw_index, ir.Constant(ir_i64, 0))
         index = self.builder.select(negative, self.builder.add(raw_index, length), raw_index)
         lower_ok = self.builder.icmp_signed('>=', index, ir.Constant(ir_i64, 0))
         upper_ok = self.builder.icmp_signed('<', index, length)
         self.guard(self.builder.and_(lower_ok, upper_ok), ERROR_INDEX_OUT_OF_BOUNDS)
-        descriptor = self._allocate_structure(string_type())
-        data = self.builder.load(self.builder.gep(
-            value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 0)]))
-        character = self.builder.gep(data, [index])
-        self.builder.store(character, self.builder.gep(
-            descriptor, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 0)]))
-        self.builder.store(ir.Constant(ir_i64, 1), self.builder.gep(
-            descriptor, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1)]))
-        return descriptor
+        return index
+
+    def _string_character(self, value, raw_index, descriptor):
+        data, length, kind = self._string_fields(value)
+        index = self._checked_index(raw_index, length)
+        character = self.builder.gep(data, [self.builder.mul(index, kind)])
+        return self._string_view(character, ir.Constant(ir_i64, 1), kind, descriptor)
+
+    def _string_slice(self, value, index, descriptor):
+        """Borrow a step-1 slice as a view into the parent's code units."""
+        data, length, kind = self._string_fields(value)
+        zero = ir.Constant(ir_i64, 0)
+
+        def bound(node, default):
+            if node is None: return default
+            raw = self.cast(self.visit(node), node.type, int64_t)
+            raw = self.builder.select(self.builder.icmp_signed('<', raw, zero), self.builder.add(raw, length), raw)
+            raw = self.builder.select(self.builder.icmp_signed('<', raw, zero), zero, raw)
+            return self.builder.select(self.builder.icmp_signed('>', raw, length), length, raw)
+        lower, upper = bound(index.lower, zero), bound(index.upper, length)
+        size = self.builder.sub(upper, lower)
+        size = self.builder.select(self.builder.icmp_signed('<', size, zero), zero, size)
+        start = self.builder.gep(data, [self.builder.mul(lower, kind)])
+        return self._string_view(start, size, kind, descriptor)
     def visit_Var(self, node):
         if node.id in self.arrays: return self.locals[node.id]
         return self.builder.load(self.locals[node.id])
@@ -295,7 +1537,37 @@ class LLVMCodeGen:
 
     def _array_element_address(self, metadata, byte_offset):
         byte_address = self.builder.gep(metadata['data'], [byte_offset])
-        return self.builder.bitcast(byte_address, ir.PointerType(to_lltype(metadata['element'])))
+        return self.builder.bitcast(byte_address, ir.PointerType(storage_type(metadata['element'])))
+
+    def _array_element(self, metadata, address, descriptor=None):
+        if is_string(metadata['element']): return self._unicode_element(metadata, address, descriptor)
+        return self.builder.load(address, align=1)
+
+    def _unicode_element(self, metadata, address, descriptor):
+        """View one fixed-width NumPy unicode slot in place, trimming trailing NULs like NumPy."""
+        length_ptr = self.entry_alloca(ir_i64, 'unicode_length')
+        self.builder.store(self.builder.sdiv(metadata['itemsize'], ir.Constant(ir_i64, 4)), length_ptr)
+        test, check, shrink, done = (self.new_block('unicode_trim_test'), self.new_block('unicode_trim_check'),
+                                     self.new_block('unicode_trim_shrink'), self.new_block('unicode_trim_done'))
+        self.builder.branch(test); self.set_block(test)
+        length = self.builder.load(length_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('>', length, ir.Constant(ir_i64, 0)), check, done)
+        self.set_block(check)
+        last = self.builder.sub(length, ir.Constant(ir_i64, 1))
+        codepoint = self.builder.load(self.builder.gep(address, [last]), align=1)
+        self.builder.cbranch(self.builder.icmp_unsigned('==', codepoint, ir.Constant(ir_i32, 0)), shrink, done)
+        self.set_block(shrink)
+        self.builder.store(last, length_ptr); self.builder.branch(test)
+        self.set_block(done)
+        data = self.builder.bitcast(address, ir.PointerType(ir_i8))
+        return self._string_view(data, self.builder.load(length_ptr), ir.Constant(ir_i64, 4), descriptor)
+
+    def _string_view(self, data, length, kind, descriptor=None, owner=None):
+        descriptor = descriptor or self._allocate_structure(string_type())
+        owner = owner or ir.Constant(ir.PointerType(ir_i8), None)
+        for index, field in enumerate((data, length, kind, owner)):
+            self.builder.store(field, self.builder.gep(descriptor, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)]))
+        return descriptor
 
     def _guard_array_writeable(self, value):
         if not isinstance(value, core.Var) or value.id not in self.arrays:
@@ -313,6 +1585,9 @@ class LLVMCodeGen:
             return self.builder.load(address)
         if is_string(node.value.type):
             value = self.visit(node.value); index = node.indices[0]
+            if isinstance(index, core.Slice) and (index.step is None or (
+                    isinstance(index.step, core.LitInt) and index.step.n == 1)):
+                return self._string_slice(value, index, self._stack_string())
             if isinstance(index, core.Slice):
                 lower = self.cast(self.visit(index.lower), index.lower.type, int64_t) if index.lower else ir.Constant(ir_i64, 0)
                 upper = self.cast(self.visit(index.upper), index.upper.type, int64_t) if index.upper else ir.Constant(ir_i64, 0)
@@ -325,7 +1600,11 @@ class LLVMCodeGen:
                      ir.Constant(ir_i64, int(index.step is not None)), step, self.error_ptr])
                 self.propagate_error(); return result
             raw_index = self.cast(self.visit(index), index.type, int64_t)
-            return self._string_character(value, raw_index)
+            return self._string_character(value, raw_index, self._stack_string())
+        if is_list(node.value.type):
+            value = self.visit(node.value)
+            raw_index = self.cast(self.visit(node.indices[0]), node.indices[0].type, int64_t)
+            return self.builder.gep(self._string_field(value, 0), [self._checked_index(raw_index, self._string_field(value, 1))])
         if node.value.type == shape_t:
             if not isinstance(node.value, core.Prim) or not isinstance(node.value.args[0], core.Var): raise CodegenError('shape value is not indexable', node)
             metadata = self.arrays[node.value.args[0].id]
@@ -338,19 +1617,25 @@ class LLVMCodeGen:
             self.guard(self.builder.and_(lower_ok, upper_ok), ERROR_INDEX_OUT_OF_BOUNDS)
             return self.builder.load(self.builder.gep(shape, [index]))
         address, _ = self._index_address(node.value, node.indices)
-        return self.builder.load(address, align=1)
+        metadata = self.arrays[node.value.id]
+        descriptor = self._stack_string() if is_string(metadata['element']) else None
+        return self._array_element(metadata, address, descriptor)
 
     def visit_Assign(self, node):
         value = self.visit(node.value); value = self.cast(value, node.value.type, node.type)
         ptr = self.locals.get(node.ref)
         if ptr is None: raise CodegenError(f'unknown local {node.ref}', node)
+        slot = self.string_slots.get(node.ref) if is_string(node.type) else None
+        if slot is not None: value = self._copy_string(value, slot)
         self.builder.store(value, ptr)
 
     def visit_UnpackAssign(self, node):
         value = self.visit(node.value)
-        for index, name in enumerate(node.refs):
-            address = self.builder.gep(value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)])
-            item = self.cast(self.builder.load(address), node.source_types[index], node.ref_types[index])
+        items = [self.cast(self.builder.load(self.builder.gep(value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, index)])),
+                           node.source_types[index], node.ref_types[index]) for index in range(len(node.refs))]
+        for name, item, ty in zip(node.refs, items, node.ref_types):
+            slot = self.string_slots.get(name) if is_string(ty) else None
+            if slot is not None: item = self._copy_string(item, slot)
             self.builder.store(item, self.locals[name])
 
     def visit_StoreIndex(self, node):
@@ -364,15 +1649,15 @@ class LLVMCodeGen:
         self._guard_array_writeable(node.value)
         left = self.cast(self.builder.load(address, align=1), element, node.operand_type)
         right = self.cast(self.visit(node.rhs), node.rhs.type, node.operand_type)
-        if node.fn == 'add#': result = self.builder.fadd(left, right) if is_float(node.type) else self.builder.add(left, right)
-        elif node.fn == 'sub#': result = self.builder.fsub(left, right) if is_float(node.type) else self.builder.sub(left, right)
-        elif node.fn == 'mult#': result = self.builder.fmul(left, right) if is_float(node.type) else self.builder.mul(left, right)
+        if node.fn == 'add#': result = self.builder.fadd(left, right, flags=self.fastmath) if is_float(node.type) else self.builder.add(left, right)
+        elif node.fn == 'sub#': result = self.builder.fsub(left, right, flags=self.fastmath) if is_float(node.type) else self.builder.sub(left, right)
+        elif node.fn == 'mult#': result = self.builder.fmul(left, right, flags=self.fastmath) if is_float(node.type) else self.builder.mul(left, right)
         elif node.fn == 'div#':
             self.guard_nonzero(right, node.operand_type, ERROR_DIVISION_BY_ZERO)
-            result = self.builder.fdiv(self.cast(left, node.operand_type, node.type), self.cast(right, node.operand_type, node.type))
+            result = self.builder.fdiv(self.cast(left, node.operand_type, node.type), self.cast(right, node.operand_type, node.type), flags=self.fastmath)
         elif node.fn == 'floordiv#':
             self.guard_nonzero(right, node.operand_type, ERROR_DIVISION_BY_ZERO)
-            result = self.builder.call(self._llvm_floor(node.type), [self.builder.fdiv(left, right)]) if is_float(node.type) else self._integer_floor_div(left, right)
+            result = self.builder.call(self._llvm_floor(node.type), [self.builder.fdiv(left, right, flags=self.fastmath)], fastmath=self.fastmath) if is_float(node.type) else self._integer_floor_div(left, right)
         elif node.fn == 'mod#':
             self.guard_nonzero(right, node.operand_type, ERROR_DIVISION_BY_ZERO)
             result = self._float_mod(left, right) if is_float(node.type) else self._integer_mod(left, right)
@@ -385,10 +1670,11 @@ class LLVMCodeGen:
     def _compare(self, op, left, right, ty):
         if is_string(ty):
             if op in core.MEMBERSHIP_OPS:
-                contains = self._checked_runtime_call(
-                    'contains', ir_i64, [string_type(), string_type()], [left, right])
-                present = self.builder.icmp_signed('!=', contains, ir.Constant(ir_i64, 0))
+                present = self.builder.icmp_signed('>=', self._string_search('find', right, left), ir.Constant(ir_i64, 0))
                 return self.builder.not_(present) if op == 'notin#' else present
+            if op in ('eq#', 'ne#'):
+                equal = self._call_helper('pyjiting.string.equal', self._build_string_equal, ir_i64, [left, right])
+                return self.builder.icmp_signed('!=' if op == 'eq#' else '==', equal, ir.Constant(ir_i64, 0))
             compared = self._native_string_compare(left, right)
             zero = ir.Constant(ir_i64, 0)
             predicates = {'eq#': '==', 'ne#': '!=', 'lt#': '<', 'le#': '<=', 'gt#': '>', 'ge#': '>='}
@@ -400,53 +1686,139 @@ class LLVMCodeGen:
         predicates = {'eq#': '==', 'ne#': '!=', 'lt#': '<', 'le#': '<=', 'gt#': '>', 'ge#': '>='}
         return self.builder.icmp_signed(predicates[op], left, right)
 
+    def _memcmp(self, left, right, size):
+        memcmp = self._libc_function('memcmp', ir.IntType(32), [ir.PointerType(ir_i8)] * 2 + [ir_i64])
+        return self.builder.call(memcmp, [left, right, size])
+
+    def _build_string_equal(self):
+        """Emit string equality: lengths first, then ``memcmp`` for equal kinds or a code point loop."""
+        arg_types = [string_type(), string_type(), ir.PointerType(ir_i64), ir.PointerType(ir_i32)]
+        with self._helper_function('pyjiting.string.equal', arg_types) as function:
+            left, right, result, _ = function.args
+            left_data, length, left_kind = self._string_fields(left)
+            right_data, right_length, right_kind = self._string_fields(right)
+            zero = ir.Constant(ir_i64, 0)
+            self.builder.store(zero, result)
+            compare = self.new_block('equal_compare')
+            self.builder.cbranch(self.builder.icmp_signed('==', length, right_length), compare, self.exit_block)
+            self.set_block(compare)
+
+            def emit(width):
+                if width is not None:
+                    same = self._memcmp(left_data, right_data, self.builder.mul(length, left_kind))
+                    self.builder.store(self.builder.zext(self.builder.icmp_signed('==', same, ir.Constant(ir.IntType(32), 0)),
+                                                         ir_i64), result)
+                    return
+
+                def body(index):
+                    differ = self.builder.icmp_unsigned('!=', self._codepoint(left_data, left_kind, index),
+                                                        self._codepoint(right_data, right_kind, index))
+                    with self.builder.if_then(differ): self.builder.branch(self.exit_block)
+                self._for_range(zero, length, body, 'equal')
+                self.builder.store(ir.Constant(ir_i64, 1), result)
+            self._by_width([left_kind, right_kind], emit)
+        return function
+
+    def _string_hash(self, value):
+        return self._call_helper('pyjiting.string.hash', self._build_string_hash, ir_i64, [value])
+
+    def _build_string_hash(self):
+        """Emit ``string_hash``: pack four code points into two words per 128-bit multiply, so the
+        result is independent of the storage kind."""
+        with self._helper_function('pyjiting.string.hash',
+                                   [string_type(), ir.PointerType(ir_i64), ir.PointerType(ir_i32)]) as function:
+            value, result, _ = function.args
+            data, length, kind = self._string_fields(value)
+            secrets = [ir.Constant(ir_i64, secret) for secret in HASH_SECRETS]
+            state_ptr = self.entry_alloca(ir_i64, 'hash_state')
+            self.builder.store(self.builder.xor(secrets[0], self.builder.mul(length, secrets[1])), state_ptr)
+            blocks = self.builder.lshr(length, ir.Constant(ir_i64, 2))
+            remainder = self.builder.and_(length, ir.Constant(ir_i64, 3))
+
+            def mix(left, right):
+                wide = ir.IntType(128)
+                product = self.builder.mul(self.builder.zext(left, wide), self.builder.zext(right, wide))
+                return self.builder.xor(self.builder.trunc(product, ir_i64),
+                                        self.builder.trunc(self.builder.lshr(product, ir.Constant(wide, 64)), ir_i64))
+
+            def absorb(codepoints):
+                words = [self.builder.or_(self.builder.zext(low, ir_i64),
+                                          self.builder.shl(self.builder.zext(high, ir_i64), ir.Constant(ir_i64, 32)))
+                         for low, high in (codepoints[:2], codepoints[2:])]
+                state = self.builder.load(state_ptr)
+                self.builder.store(mix(self.builder.xor(words[0], secrets[1]), self.builder.xor(words[1], state)), state_ptr)
+
+            def emit(width):
+                def body(block):
+                    base = self.builder.shl(block, ir.Constant(ir_i64, 2))
+                    absorb([self._codepoint(data, kind, self.builder.add(base, ir.Constant(ir_i64, offset)), width)
+                            for offset in range(4)])
+                self._for_range(ir.Constant(ir_i64, 0), blocks, body, 'hash')
+            self._by_width([kind], emit)
+            with self.builder.if_then(self.builder.icmp_signed('!=', remainder, ir.Constant(ir_i64, 0))):
+                base = self.builder.shl(blocks, ir.Constant(ir_i64, 2))
+                tail = []
+                for offset in range(4):
+                    present = self.builder.icmp_signed('<', ir.Constant(ir_i64, offset), remainder)
+                    # Clamp the index so absent positions reread a valid code point, then zero them.
+                    index = self.builder.select(present, self.builder.add(base, ir.Constant(ir_i64, offset)), base)
+                    tail.append(self.builder.select(present, self._codepoint(data, kind, index), ir.Constant(ir_i32, 0)))
+                absorb(tail)
+            state = self.builder.load(state_ptr)
+            self.builder.store(mix(self.builder.xor(state, secrets[2]), self.builder.xor(length, secrets[3])), result)
+        return function
+
     def _native_string_compare(self, left, right):
-        zero32 = ir.Constant(ir_i32, 0)
-        data_index = ir.Constant(ir_i32, 0)
-        length_index = ir.Constant(ir_i32, 1)
-        left_data = self.builder.load(self.builder.gep(left, [zero32, data_index]))
-        right_data = self.builder.load(self.builder.gep(right, [zero32, data_index]))
-        left_length = self.builder.load(self.builder.gep(left, [zero32, length_index]))
-        right_length = self.builder.load(self.builder.gep(right, [zero32, length_index]))
+        left_data, left_length, left_kind = self._string_fields(left)
+        right_data, right_length, right_kind = self._string_fields(right)
         minimum = self.builder.select(
             self.builder.icmp_signed('<', left_length, right_length), left_length, right_length)
-        index_ptr = self.builder.alloca(ir_i64, name=f'string_compare_index_{self.counter}')
-        result_ptr = self.builder.alloca(ir_i64, name=f'string_compare_result_{self.counter}')
+        index_ptr = self.entry_alloca(ir_i64, f'string_compare_index_{self.counter}')
+        result_ptr = self.entry_alloca(ir_i64, f'string_compare_result_{self.counter}')
         self.counter += 1
-        self.builder.store(ir.Constant(ir_i64, 0), index_ptr)
-        self.builder.store(ir.Constant(ir_i64, 0), result_ptr)
-        test = self.new_block('string_compare_test')
-        body = self.new_block('string_compare_body')
-        different = self.new_block('string_compare_different')
-        advance = self.new_block('string_compare_advance')
-        lengths = self.new_block('string_compare_lengths')
-        done = self.new_block('string_compare_done')
-        self.builder.branch(test)
-        self.set_block(test)
-        index = self.builder.load(index_ptr)
-        self.builder.cbranch(self.builder.icmp_signed('<', index, minimum), body, lengths)
-        self.set_block(body)
-        left_codepoint = self.builder.load(self.builder.gep(left_data, [index]))
-        right_codepoint = self.builder.load(self.builder.gep(right_data, [index]))
-        self.builder.cbranch(
-            self.builder.icmp_unsigned('!=', left_codepoint, right_codepoint), different, advance)
-        self.set_block(different)
-        order = self.builder.select(
-            self.builder.icmp_unsigned('<', left_codepoint, right_codepoint),
-            ir.Constant(ir_i64, -1), ir.Constant(ir_i64, 1))
-        self.builder.store(order, result_ptr)
-        self.builder.branch(done)
-        self.set_block(advance)
-        self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr)
-        self.builder.branch(test)
-        self.set_block(lengths)
         length_order = self.builder.select(
             self.builder.icmp_signed('<', left_length, right_length), ir.Constant(ir_i64, -1),
             self.builder.select(self.builder.icmp_signed('>', left_length, right_length),
                                 ir.Constant(ir_i64, 1), ir.Constant(ir_i64, 0)))
-        self.builder.store(length_order, result_ptr)
-        self.builder.branch(done)
-        self.set_block(done)
+
+        def emit(width):
+            if width == 1:
+                # Unsigned byte order is code point order for latin-1 units.
+                order = self._memcmp(left_data, right_data, minimum)
+                order = self.builder.sext(order, ir_i64)
+                self.builder.store(self.builder.select(self.builder.icmp_signed('==', order, ir.Constant(ir_i64, 0)),
+                                                       length_order, order), result_ptr)
+                return
+            test = self.new_block('string_compare_test')
+            body = self.new_block('string_compare_body')
+            different = self.new_block('string_compare_different')
+            advance = self.new_block('string_compare_advance')
+            lengths = self.new_block('string_compare_lengths')
+            done = self.new_block('string_compare_done')
+            self.builder.store(ir.Constant(ir_i64, 0), index_ptr)
+            self.builder.branch(test)
+            self.set_block(test)
+            index = self.builder.load(index_ptr)
+            self.builder.cbranch(self.builder.icmp_signed('<', index, minimum), body, lengths)
+            self.set_block(body)
+            left_codepoint = self._codepoint(left_data, left_kind, index, width)
+            right_codepoint = self._codepoint(right_data, right_kind, index, width)
+            self.builder.cbranch(
+                self.builder.icmp_unsigned('!=', left_codepoint, right_codepoint), different, advance)
+            self.set_block(different)
+            order = self.builder.select(
+                self.builder.icmp_unsigned('<', left_codepoint, right_codepoint),
+                ir.Constant(ir_i64, -1), ir.Constant(ir_i64, 1))
+            self.builder.store(order, result_ptr)
+            self.builder.branch(done)
+            self.set_block(advance)
+            self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr)
+            self.builder.branch(test)
+            self.set_block(lengths)
+            self.builder.store(length_order, result_ptr)
+            self.builder.branch(done)
+            self.set_block(done)
+        self._by_width([left_kind, right_kind], emit)
         return self.builder.load(result_ptr)
 
     def visit_Compare(self, node):
@@ -495,11 +1867,9 @@ class LLVMCodeGen:
             truth = self.truthy(self.visit(node.args[0]), node.args[0].type)
             return self.builder.zext(self.builder.not_(truth), ir_i64)
         if node.fn == 'neg#':
-            value = self.visit(node.args[0]); return self.builder.fneg(value) if is_float(node.type) else self.builder.neg(value)
+            value = self.visit(node.args[0]); return self.builder.fneg(value, flags=self.fastmath) if is_float(node.type) else self.builder.neg(value)
         if node.fn == 'add#' and is_string(node.type):
-            return self._checked_runtime_call(
-                'concat', string_type(), [string_type(), string_type()],
-                [self.visit(node.args[0]), self.visit(node.args[1])])
+            return self._string_concat(self.visit(node.args[0]), self.visit(node.args[1]))
         if node.fn == 'mult#' and is_string(node.type):
             if is_string(node.args[0].type): value, count_node = self.visit(node.args[0]), node.args[1]
             else: value, count_node = self.visit(node.args[1]), node.args[0]
@@ -508,16 +1878,16 @@ class LLVMCodeGen:
                 'repeat', string_type(), [string_type(), ir_i64], [value, count])
         left = self.cast(self.visit(node.args[0]), node.args[0].type, node.operand_type)
         right = self.cast(self.visit(node.args[1]), node.args[1].type, node.operand_type)
-        if node.fn == 'add#': return self.builder.fadd(left, right) if is_float(node.type) else self.builder.add(left, right)
-        if node.fn == 'sub#': return self.builder.fsub(left, right) if is_float(node.type) else self.builder.sub(left, right)
-        if node.fn == 'mult#': return self.builder.fmul(left, right) if is_float(node.type) else self.builder.mul(left, right)
+        if node.fn == 'add#': return self.builder.fadd(left, right, flags=self.fastmath) if is_float(node.type) else self.builder.add(left, right)
+        if node.fn == 'sub#': return self.builder.fsub(left, right, flags=self.fastmath) if is_float(node.type) else self.builder.sub(left, right)
+        if node.fn == 'mult#': return self.builder.fmul(left, right, flags=self.fastmath) if is_float(node.type) else self.builder.mul(left, right)
         if node.fn == 'div#':
             self.guard_nonzero(right, node.operand_type, ERROR_DIVISION_BY_ZERO)
-            return self.builder.fdiv(self.cast(left, node.operand_type, node.type), self.cast(right, node.operand_type, node.type))
+            return self.builder.fdiv(self.cast(left, node.operand_type, node.type), self.cast(right, node.operand_type, node.type), flags=self.fastmath)
         if node.fn == 'floordiv#':
             self.guard_nonzero(right, node.operand_type, ERROR_DIVISION_BY_ZERO)
             if is_float(node.type):
-                division = self.builder.fdiv(left, right); floor = self._llvm_floor(node.type); return self.builder.call(floor, [division])
+                division = self.builder.fdiv(left, right, flags=self.fastmath); floor = self._llvm_floor(node.type); return self.builder.call(floor, [division], fastmath=self.fastmath)
             return self._integer_floor_div(left, right)
         if node.fn == 'mod#':
             self.guard_nonzero(right, node.operand_type, ERROR_DIVISION_BY_ZERO)
@@ -587,7 +1957,7 @@ class LLVMCodeGen:
         if is_float(node.type):
             ty = to_lltype(node.type); name = 'llvm.pow.f32' if node.type == float32_t else 'llvm.pow.f64'
             fn = self.module.globals.get(name) or ir.Function(self.module, ir.FunctionType(ty, [ty, ty]), name)
-            return self.builder.call(fn, [self.cast(left, node.operand_type, node.type), self.cast(right, node.operand_type, node.type)])
+            return self.builder.call(fn, [self.cast(left, node.operand_type, node.type), self.cast(right, node.operand_type, node.type)], fastmath=self.fastmath)
         exponent_node = node.rhs if isinstance(node, core.AugStoreIndex) else node.args[1]
         exponent = core.integer_constant_value(exponent_node)
         if exponent is None: raise CodegenError('integer power requires a constant exponent', node)
@@ -654,9 +2024,11 @@ class LLVMCodeGen:
                                           self.new_block('foreach_after'))
         otherwise = self.new_block('foreach_else') if node.orelse else after
         index_ptr = self.builder.alloca(ir_i64, name=f'foreach_index_{self.counter}')
-        character_descriptor = None
+        slot = self.string_slots.get(node.var.id)
         if is_string(node.iterable.type):
-            character_descriptor = self._allocate_structure(string_type())
+            data, length, kind = self._string_fields(iterable)
+        elif is_list(node.iterable.type):
+            data, length = self._string_field(iterable, 0), self._string_field(iterable, 1)
         self.builder.branch(init); self.set_block(init)
         self.builder.store(ir.Constant(ir_i64, 0), index_ptr)
         if is_array(node.iterable.type):
@@ -666,8 +2038,6 @@ class LLVMCodeGen:
             self.guard(self.builder.icmp_signed('==', metadata['ndim'], ir.Constant(ir_i64, 1)),
                        ERROR_ARRAY_DIMENSION_MISMATCH)
             length = self.builder.load(metadata['shape'])
-        else:
-            length = self.builder.load(self.builder.gep(iterable, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1)]))
         self.builder.branch(test); self.set_block(test)
         index = self.builder.load(index_ptr)
         self.builder.cbranch(self.builder.icmp_signed('<', index, length), body, otherwise)
@@ -676,16 +2046,14 @@ class LLVMCodeGen:
         if is_array(node.iterable.type):
             stride = self.builder.load(metadata['strides'])
             address = self._array_element_address(metadata, self.builder.mul(index, stride))
-            item = self.builder.load(address, align=1)
+            descriptor = None
+            if is_string(metadata['element']): descriptor = slot
+            item = self._array_element(metadata, address, descriptor)
+        elif is_list(node.iterable.type):
+            item = self._copy_string(self.builder.gep(data, [index]), slot)
         else:
-            data = self.builder.load(self.builder.gep(
-                iterable, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 0)]))
-            character = self.builder.gep(data, [index])
-            self.builder.store(character, self.builder.gep(
-                character_descriptor, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 0)]))
-            self.builder.store(ir.Constant(ir_i64, 1), self.builder.gep(
-                character_descriptor, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1)]))
-            item = character_descriptor
+            character = self.builder.gep(data, [self.builder.mul(index, kind)])
+            item = self._string_view(character, ir.Constant(ir_i64, 1), kind, slot)
         self.builder.store(item, self.locals[node.var.id]); self.visit(node.body)
         if not self.terminated(): self.builder.branch(latch)
         self.set_block(latch); self.builder.store(self.builder.add(self.builder.load(index_ptr), ir.Constant(ir_i64, 1)), index_ptr); self.builder.branch(test)
@@ -695,11 +2063,43 @@ class LLVMCodeGen:
             if not self.terminated(): self.builder.branch(after)
         self.set_block(after)
 
+    def _tuple_value(self, node):
+        """Load a returned tuple as a struct value, copying strings that may borrow this frame."""
+        struct = value_lltype(node.type)
+        if isinstance(node, core.LitTuple):
+            result = ir.Constant(struct, ir.Undefined)
+            for index, element in enumerate(node.elements):
+                value = self.visit(element)
+                if is_string(element.type): value = self._retain_string(element, value)
+                result = self.builder.insert_value(result, value, index)
+            return result
+        result = self.builder.load(self.visit(node))
+        for index, element in enumerate(node.type.elements):
+            if is_string(element):
+                value = self._copy_string(self.builder.extract_value(result, index), self._allocate_structure(string_type()))
+                result = self.builder.insert_value(result, value, index)
+        return result
+
+    def _call_result(self, node, value):
+        """Give a by-value tuple result an address: a stack slot when it does not escape."""
+        if not is_tuple(node.type): return value
+        pointer = self.entry_alloca(value.type, 'call_tuple') if node in self.stack_tuples \
+            else self._allocate_structure(to_lltype(node.type))
+        self.builder.store(value, pointer)
+        return pointer
+
+    def _by_value_args(self, args, arg_types):
+        return [self.builder.load(arg) if is_tuple(ty) else arg for arg, ty in zip(args, arg_types)]
+
     def visit_Break(self, node): self.builder.branch(self.break_blocks[-1])
     def visit_Continue(self, node): self.builder.branch(self.continue_blocks[-1])
 
     def visit_Return(self, node):
-        if self.return_type != void_t: self.builder.store(self.cast(self.visit(node.value), node.value.type, self.return_type), self.return_slot)
+        if is_tuple(self.return_type): self.builder.store(self._tuple_value(node.value), self.return_slot)
+        elif self.return_type != void_t:
+            value = self.cast(self.visit(node.value), node.value.type, self.return_type)
+            if is_string(self.return_type): value = self._retain_string(node.value, value)
+            self.builder.store(value, self.return_slot)
         self.builder.branch(self.exit_block)
 
     def visit_CallFunc(self, node):
@@ -707,8 +2107,7 @@ class LLVMCodeGen:
         if node.fn.id == 'len':
             value = args[0]
             if is_tuple(node.args[0].type): return ir.Constant(ir_i64, len(node.args[0].type.elements))
-            if is_string(node.args[0].type):
-                return self.builder.load(self.builder.gep(value, [ir.Constant(ir_i32, 0), ir.Constant(ir_i32, 1)]))
+            if is_string(node.args[0].type) or is_list(node.args[0].type): return self._string_field(value, 1)
             if not isinstance(node.args[0], core.Var) or node.args[0].id not in self.arrays:
                 raise CodegenError('len only supports parameter arrays', node.args[0])
             metadata = self.arrays[node.args[0].id]
@@ -719,7 +2118,7 @@ class LLVMCodeGen:
             if is_float(node.type):
                 name = 'llvm.fabs.f32' if node.type == float32_t else 'llvm.fabs.f64'
                 fn = self.module.globals.get(name) or ir.Function(self.module, ir.FunctionType(value.type, [value.type]), name)
-                return self.builder.call(fn, [value])
+                return self.builder.call(fn, [value], fastmath=self.fastmath)
             negative = self.builder.icmp_signed('<', value, ir.Constant(value.type, 0))
             return self.builder.select(negative, self.builder.neg(value), value)
         if node.fn.id in ('min', 'max'):
@@ -737,10 +2136,27 @@ class LLVMCodeGen:
                                         [value, self.error_ptr])
             self.propagate_error(); return result
         if node.fn.id in MATH_INTRINSICS:
-            value = self.cast(args[0], node.args[0].type, double64_t)
-            return self._math_intrinsic(node.fn.id[5:], value)
+            if node.fn.id in MATH_INTEGER_RESULTS and is_integer(node.args[0].type):
+                return self.cast(args[0], node.args[0].type, int64_t)
+            values = [self.cast(value, arg.type, node.operand_type) for value, arg in zip(args, node.args)]
+            result = self._math_intrinsic(node.fn.id[5:], values)
+            if node.fn.id not in MATH_INTEGER_RESULTS: return result
+            return self._float_to_int(self.cast(result, node.operand_type, double64_t))
         if node.fn.id in ('sum', 'any', 'all'):
             return self._array_reduction(node, node.fn.id)
+        if node.fn.id == 'str.join': return self._string_join(node)
+        if node.fn.id in ('str.upper', 'str.lower'): return self._case_mapping(node.fn.id[4:], args[0])
+        if node.fn.id == 'pyjiting.string_hash': return self._string_hash(args[0])
+        if node.fn.id in STRING_PREDICATES:
+            mask = ir.Constant(ir_i64, PREDICATE_FLAGS[node.fn.id[4:]])
+            return self._call_helper('pyjiting.string.classify', self._build_classify, ir_i64, [args[0], mask])
+        if node.fn.id in ('str.split', 'str.splitlines'): return self._string_pieces(node.fn.id[4:], args)
+        if node.fn.id == 'str.partition': return self._string_partition(*args)
+        if node.fn.id in ('int', 'float', 'str'):
+            return self._convert(node.fn.id, args[0], node.args[0].type)
+        if node.fn.id in ('str.find', 'str.count', 'str.startswith', 'str.endswith'):
+            bounds = [self.cast(value, arg.type, int64_t) for value, arg in zip(args[2:], node.args[2:])]
+            return self._string_search(node.fn.id[4:], args[0], args[1], *bounds)
         if node.fn.id in STRING_INTRINSICS:
             name = node.fn.id[4:]
             if node.fn.id in STRING_TRANSFORMS:
@@ -749,25 +2165,40 @@ class LLVMCodeGen:
                 return self._checked_runtime_call(name, string_type(), [string_type()] * 3, args)
             if node.fn.id in STRING_PREDICATES:
                 return self._checked_runtime_call(name, ir_i64, [string_type()], args)
-            return self._checked_runtime_call(
-                name, ir_i64, [string_type(), string_type()], args)
+            raise CodegenError(f'unsupported string method {name!r}', node)
         if node.fn.id == self.org_func_name:
-            result = self.builder.call(self.function, args + [self.error_ptr])
+            callee = self.recursive_callee or self.function
+            if self.batches: self._flush_batches(); self.propagate_error()
+            result = self.builder.call(callee, self._by_value_args(args, self.args) + [self.error_ptr])
             self.propagate_error()
-            return result
+            return self._call_result(node, result)
         if hasattr(node, 'jit_signature'):
             signature = node.jit_signature
-            ll_args = [to_lltype(ty) for ty in signature.args]
-            function_type = ir.FunctionType(to_lltype(signature.return_type), ll_args + [ir.PointerType(ir_i32)])
-            callee = self.module.globals.get(node.jit_symbol)
-            if callee is None: callee = ir.Function(self.module, function_type, node.jit_symbol)
-            result = self.builder.call(callee, args + [self.error_ptr])
+            ll_args = [value_lltype(ty) for ty in signature.args]
+            function_type = ir.FunctionType(value_lltype(signature.return_type), ll_args + [ir.PointerType(ir_i32)])
+            symbol = by_value_symbol(node.jit_symbol, signature.args, signature.return_type)
+            callee = self.module.globals.get(symbol)
+            if callee is None: callee = ir.Function(self.module, function_type, symbol)
+            # Pending chunks go first, so a callee's batched calls cannot overtake the caller's.
+            if self.batches: self._flush_batches(); self.propagate_error()
+            result = self.builder.call(callee, self._by_value_args(args, signature.args) + [self.error_ptr])
             self.propagate_error()
-            return result
+            return self._call_result(node, result)
         registered_identifier = getattr(node, 'registered_id', node.fn.id)
         registered = get_registered(registered_identifier)
         if registered is None: raise CodegenError(f'function {node.fn.id!r} is not registered', node)
         fn, signature = registered; ll_args = [to_lltype(ty) for ty in signature.args]; ll_return = to_lltype(signature.return_type)
+        args = [self.cast(value, item.type, ty) for value, item, ty in zip(args, node.args, signature.args)]
+        if is_batched(registered_identifier): return self._batched_call(registered_identifier, fn, signature, args)
+        target = native_target(registered_identifier)
+        if target is not None:
+            # Native registrations follow the C ABI: no error pointer, no GIL, no callback bookkeeping.
+            function_type = ir.FunctionType(ll_return, ll_args)
+            callee = self.module.globals.get(target.symbol) if target.symbol else None
+            if callee is None and target.symbol: callee = ir.Function(self.module, function_type, target.symbol)
+            if callee is None or callee.function_type != function_type:
+                callee = self.builder.inttoptr(ir.Constant(ir_i64, target.address), function_type.as_pointer())
+            return self.builder.call(callee, args)
         def callback_type(ty) -> Any:
             if ty in (int64_t, bool_t): return ctypes.c_int64
             if ty == int32_t: return ctypes.c_int32
@@ -802,38 +2233,201 @@ class LLVMCodeGen:
         address = keep_callback(registered_identifier, callback)
         pointer_ty = ir.PointerType(ir.FunctionType(ll_return, ll_args + [ir.PointerType(ir_i32)]))
         pointer = self.builder.inttoptr(ir.Constant(ir_i64, address), pointer_ty)
-        result = self.builder.call(pointer, args + [self.error_ptr])
+
+        def call():
+            result = self.builder.call(pointer, args + [self.error_ptr])
+            self.propagate_error()
+            return result
+        cache = result_cache(registered_identifier)
+        return call() if cache is None else self._cached_call(cache, signature, args, call)
+
+    def _batched_call(self, identifier, fn, signature, args):
+        """Append one call's arguments to this frame's buffers, handing full chunks to Python."""
+        if identifier not in self.batches:
+            ll_args = [to_lltype(ty) for ty in signature.args]
+            function_type = ir.FunctionType(ir_void, [ir_i64, *map(ir.PointerType, ll_args), ir.PointerType(ir_i32)])
+            address = ir.Constant(ir_i64, self._batch_bridge(identifier, fn, signature))
+            # Buffers live in the entry block, which dominates both the call sites and the exit flush.
+            block = self.builder.block
+            self.builder.position_at_start(self.function.entry_basic_block)
+            bridge = self.builder.inttoptr(address, function_type.as_pointer())
+            arrays = [self.builder.alloca(ir.ArrayType(ty, BATCH_SIZE), name='batch') for ty in ll_args]
+            count = self.builder.alloca(ir_i64, name='batch_count')
+            self.builder.store(ir.Constant(ir_i64, 0), count)
+            zero = ir.Constant(ir_i64, 0)
+            buffers = [self.builder.gep(array, [zero, zero]) for array in arrays]
+            self.builder.position_at_end(block)
+            self.batches[identifier] = bridge, buffers, count
+        bridge, buffers, count = self.batches[identifier]
+        index = self.builder.load(count)
+        for buffer, value in zip(buffers, args): self.builder.store(value, self.builder.gep(buffer, [index]))
+        index = self.builder.add(index, ir.Constant(ir_i64, 1))
+        self.builder.store(index, count)
+        with self.builder.if_then(self.builder.icmp_signed('==', index, ir.Constant(ir_i64, BATCH_SIZE)), likely=False):
+            self.builder.store(ir.Constant(ir_i64, 0), count)
+            self.builder.call(bridge, [index, *buffers, self.error_ptr])
         self.propagate_error()
-        return result
+        return None
+
+    def _flush_batches(self):
+        """Deliver every pending chunk of this frame, e.g. before a callee can make calls of its own."""
+        for bridge, buffers, count in self.batches.values():
+            pending = self.builder.load(count)
+            with self.builder.if_then(self.builder.icmp_signed('!=', pending, ir.Constant(ir_i64, 0))):
+                self.builder.store(ir.Constant(ir_i64, 0), count)
+                self.builder.call(bridge, [pending, *buffers, self.error_ptr])
+
+    def _batch_bridge(self, identifier, fn, signature):
+        c_types = {int64_t: ctypes.c_int64, bool_t: ctypes.c_int64, int32_t: ctypes.c_int32,
+                   float32_t: ctypes.c_float, double64_t: ctypes.c_double}
+        c_args = [ctypes.POINTER(c_types[ty]) for ty in signature.args]
+
+        def bridge(count, *values):
+            buffers, error = values[:-1], values[-1]
+            try:
+                record_callback(identifier)
+                # The stack buffers are reused for the next chunk, so the callback gets copies.
+                arrays = [np.ctypeslib.as_array(buffer, (count,)).copy() for buffer in buffers]
+                fn(*[array != 0 if ty == bool_t else array for array, ty in zip(arrays, signature.args)])
+            except BaseException as exception:
+                # A chunk flushed while the frame is already failing must not replace that error.
+                if not error[0]:
+                    set_pending_exception(exception)
+                    error[0] = 11
+        callback = ctypes.CFUNCTYPE(None, ctypes.c_int64, *c_args, ctypes.POINTER(ctypes.c_int32))(bridge)
+        return keep_callback(identifier, callback)
+
+    def _cached_call(self, cache, signature, args, call):
+        """Probe a pure callback's direct-mapped result cache, calling the bridge only on a miss.
+
+        Entries follow a seqlock protocol: a writer makes the version odd while it fills
+        the entry, so a reader that sees one even version before and after its loads saw a
+        whole entry. Writers that lose the race skip caching rather than wait.
+        """
+        key_offsets, result_offset = cache_key_offsets(signature.args)
+        header = self.builder.inttoptr(ir.Constant(ir_i64, cache.address), ir.PointerType(ir_i64))
+        keys = [self._string_hash(arg) if is_string(ty) else self._cache_word(arg, ty)
+                for arg, ty in zip(args, signature.args)]
+        digest = ir.Constant(ir_i64, HASH_SECRETS[0])
+        for key in keys:
+            digest = self.builder.mul(self.builder.xor(digest, key), ir.Constant(ir_i64, HASH_SECRETS[1]))
+            digest = self.builder.xor(digest, self.builder.lshr(digest, ir.Constant(ir_i64, 32)))
+        slot = self.builder.and_(digest, ir.Constant(ir_i64, cache.size - 1))
+        entry = self.builder.gep(header, [self.builder.add(
+            ir.Constant(ir_i64, CACHE_HEADER_WORDS), self.builder.mul(slot, ir.Constant(ir_i64, cache.entry_words)))])
+
+        def word(offset): return self.builder.gep(entry, [ir.Constant(ir_i64, offset)])
+        def equal(left, right): return self.builder.icmp_signed('==', left, right)
+        zero, one = ir.Constant(ir_i64, 0), ir.Constant(ir_i64, 1)
+        fits = ir.Constant(ir_i1, 1)
+        for arg, ty in zip(args, signature.args):
+            if is_string(ty):
+                _, length, kind = self._string_fields(arg)
+                size = self.builder.mul(length, kind)
+                fits = self.builder.and_(fits, self.builder.icmp_signed('<=', size, ir.Constant(ir_i64, CACHE_KEY_BYTES)))
+        result = self.entry_alloca(to_lltype(signature.return_type), 'cached_result')
+        hit, miss, done = self.new_block('cache_hit'), self.new_block('cache_miss'), self.new_block('cache_done')
+
+        def require(condition):
+            probe = self.new_block('cache_probe')
+            self.builder.cbranch(condition, probe, miss)
+            self.set_block(probe)
+        version = self.builder.load_atomic(word(0), 'acquire', 8)
+        require(self.builder.and_(fits, self.builder.and_(
+            equal(self.builder.and_(version, one), zero), self.builder.icmp_signed('!=', version, zero))))
+        require(equal(self.builder.load(word(1)), digest))
+        for arg, ty, key, offset in zip(args, signature.args, keys, key_offsets):
+            if not is_string(ty):
+                require(equal(self.builder.load(word(offset)), key)); continue
+            data, length, kind = self._string_fields(arg)
+            require(self.builder.and_(equal(self.builder.load(word(offset)), length),
+                                      equal(self.builder.load(word(offset + 1)), kind)))
+            inline = self.builder.bitcast(word(offset + 2), ir.PointerType(ir_i8))
+            require(equal(self._memcmp(inline, data, self.builder.mul(length, kind)), ir.Constant(ir.IntType(32), 0)))
+        cached = self.builder.load(word(result_offset))
+        self.builder.fence('acquire')
+        require(equal(self.builder.load_atomic(word(0), 'monotonic', 8), version))
+        self.builder.branch(hit)
+
+        self.set_block(hit)
+        self.builder.atomic_rmw('add', header, one, 'monotonic')
+        self.builder.store(self._cache_value(cached, signature.return_type), result)
+        self.builder.branch(done)
 
-    def _math_intrinsic(self, name, value):
-        infinity = ir.Constant(ir_f64, float('inf'))
-        negative_infinity = ir.Constant(ir_f64, float('-inf'))
-        is_positive_infinite = self.builder.fcmp_ordered('==', value, infinity)
-        is_negative_infinite = self.builder.fcmp_ordered('==', value, negative_infinity)
-        is_infinite = self.builder.or_(is_positive_infinite, is_negative_infinite)
-        is_nan = self.builder.fcmp_unordered('!=', value, value)
-        if name == 'isnan': return self.builder.zext(is_nan, ir_i64)
-        if name == 'isinf': return self.builder.zext(is_infinite, ir_i64)
-        if name == 'isfinite': return self.builder.zext(self.builder.not_(self.builder.or_(is_nan, is_infinite)), ir_i64)
-
-        if name in ('sin', 'cos'):
-            self.guard(self.builder.not_(is_infinite), ERROR_MATH_DOMAIN)
-        elif name == 'sqrt':
-            nonnegative = self.builder.fcmp_ordered('>=', value, ir.Constant(ir_f64, 0.0))
-            self.guard(self.builder.or_(is_nan, nonnegative), ERROR_MATH_DOMAIN)
-        elif name in ('log', 'log2', 'log10'):
-            positive = self.builder.fcmp_ordered('>', value, ir.Constant(ir_f64, 0.0))
-            self.guard(self.builder.or_(is_nan, positive), ERROR_MATH_DOMAIN)
-
-        llvm_name = f'llvm.{name}.f64'
-        intrinsic = self.module.globals.get(llvm_name) or ir.Function(
-            self.module, ir.FunctionType(ir_f64, [ir_f64]), llvm_name)
-        result = self.builder.call(intrinsic, [value])
-        if name == 'exp':
-            result_is_infinite = self.builder.fcmp_ordered('==', result, infinity)
-            finite_input = self.builder.not_(self.builder.or_(is_nan, is_infinite))
-            self.guard(self.builder.not_(self.builder.and_(finite_input, result_is_infinite)), ERROR_MATH_RANGE)
+        self.set_block(miss)
+        self.builder.atomic_rmw('add', self.builder.gep(header, [one]), one, 'monotonic')
+        value = call()
+        self.builder.store(value, result)
+        current = self.builder.load_atomic(word(0), 'monotonic', 8)
+        with self.builder.if_then(self.builder.and_(fits, equal(self.builder.and_(current, one), zero))):
+            claimed = self.builder.cmpxchg(word(0), current, self.builder.add(current, one), 'acquire', 'monotonic')
+            with self.builder.if_then(self.builder.extract_value(claimed, 1)):
+                self.builder.store(digest, word(1))
+                for arg, ty, key, offset in zip(args, signature.args, keys, key_offsets):
+                    if not is_string(ty):
+                        self.builder.store(key, word(offset)); continue
+                    data, length, kind = self._string_fields(arg)
+                    self.builder.store(length, word(offset)); self.builder.store(kind, word(offset + 1))
+                    memcpy = self.module.declare_intrinsic('llvm.memcpy', [ir.PointerType(ir_i8), ir.PointerType(ir_i8), ir_i64])
+                    self.builder.call(memcpy, [self.builder.bitcast(word(offset + 2), ir.PointerType(ir_i8)), data,
+                                               self.builder.mul(length, kind), ir.Constant(ir_i1, 0)])
+                self.builder.store(self._cache_word(value, signature.return_type), word(result_offset))
+                self.builder.store_atomic(self.builder.add(current, ir.Constant(ir_i64, 2)), word(0), 'release', 8)
+        self.builder.branch(done)
+        self.set_block(done)
+        return self.builder.load(result)
+
+    def _cache_word(self, value, ty):
+        """Widen a scalar to the int64 word a result cache stores, keeping float bit patterns."""
+        if ty == int32_t: return self.builder.sext(value, ir_i64)
+        if ty == double64_t: return self.builder.bitcast(value, ir_i64)
+        if ty == float32_t: return self.builder.zext(self.builder.bitcast(value, ir_i32), ir_i64)
+        return value
+
+    def _cache_value(self, word, ty):
+        if ty == int32_t: return self.builder.trunc(word, ir_i32)
+        if ty == double64_t: return self.builder.bitcast(word, ir_f64)
+        if ty == float32_t: return self.builder.bitcast(self.builder.trunc(word, ir_i32), ir_f32)
+        return word
+
+    def _math_intrinsic(self, name, values):
+        """Emit a math function at the operands' own width, so float32 code vectorizes at full width.
+
+        Errors follow CPython's ``math`` module: a NaN from non-NaN arguments is a domain
+        error, and an infinity from finite arguments is a range error, or a domain error
+        at a pole such as ``log(0)``.
+        """
+        ty = values[0].type
+        infinity, zero = ir.Constant(ty, float('inf')), ir.Constant(ty, 0.0)
+
+        def is_nan(value): return self.builder.fcmp_unordered('!=', value, value)
+        def is_infinite(value):
+            return self.builder.or_(self.builder.fcmp_ordered('==', value, infinity),
+                                    self.builder.fcmp_ordered('==', value, ir.Constant(ty, float('-inf'))))
+        value = values[0]
+        if name == 'isnan': return self.builder.zext(is_nan(value), ir_i64)
+        if name == 'isinf': return self.builder.zext(is_infinite(value), ir_i64)
+        if name == 'isfinite': return self.builder.zext(self.builder.not_(self.builder.or_(is_nan(value), is_infinite(value))), ir_i64)
+
+        function_type = ir.FunctionType(ty, [ty] * len(values))
+        if name in LLVM_MATH:
+            llvm_name = f'llvm.{name}.{"f32" if ty == ir_f32 else "f64"}'
+            callee = self.module.globals.get(llvm_name) or ir.Function(self.module, function_type, llvm_name)
+        else:
+            callee = self._libc_function(name + ('f' if ty == ir_f32 else ''), ty, [ty] * len(values))
+        result = self.builder.call(callee, values, fastmath=self.fastmath)
+        if name in MATH_TOTAL: return result
+
+        any_nan = is_nan(values[0]); all_finite = self.builder.not_(self.builder.or_(any_nan, is_infinite(values[0])))
+        for value in values[1:]:
+            any_nan = self.builder.or_(any_nan, is_nan(value))
+            all_finite = self.builder.and_(all_finite, self.builder.not_(self.builder.or_(is_nan(value), is_infinite(value))))
+        self.guard(self.builder.not_(self.builder.and_(is_nan(result), self.builder.not_(any_nan))), ERROR_MATH_DOMAIN)
+        overflow = self.builder.and_(is_infinite(result), all_finite)
+        if name == 'pow':
+            pole = self.builder.fcmp_ordered('==', values[0], zero)
+            self.guard(self.builder.not_(self.builder.and_(overflow, pole)), ERROR_MATH_DOMAIN)
+        self.guard(self.builder.not_(overflow), ERROR_MATH_DOMAIN if name in MATH_POLES else ERROR_MATH_RANGE)
         return result
 
     def _array_reduction(self, node, operation):
@@ -870,12 +2464,29 @@ class LLVMCodeGen:
         self.builder.store(self.builder.add(dimension, ir.Constant(ir_i64, 1)), dimension_ptr)
         self.builder.branch(dimension_test)
         self.set_block(dimension_done)
+        linear_test = self.new_block(f'{operation}_linear_test')
+        linear_body = self.new_block(f'{operation}_linear_body')
+        strided = self.new_block(f'{operation}_strided')
+        after = self.new_block(f'{operation}_after')
+        self.builder.cbranch(self.builder.icmp_signed('==', metadata['ndim'], ir.Constant(ir_i64, 1)),
+                             linear_test, strided)
+        # One-dimensional arrays use a plain counted loop the vectorizer can recognize.
+        self.set_block(linear_test)
+        index = self.builder.load(index_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', index, self.builder.load(length_ptr)),
+                             linear_body, after)
+        self.set_block(linear_body)
+        stride = self.builder.load(metadata['strides'])
+        address = self._array_element_address(metadata, self.builder.mul(index, stride))
+        self._reduce_element(node, operation, metadata, result_ptr, self.builder.load(address, align=1))
+        self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr)
+        self.builder.branch(linear_test)
+        self.set_block(strided)
         test = self.new_block(f'{operation}_test')
         body = self.new_block(f'{operation}_body')
         offset_test = self.new_block(f'{operation}_offset_test')
         offset_body = self.new_block(f'{operation}_offset_body')
         offset_done = self.new_block(f'{operation}_offset_done')
-        after = self.new_block(f'{operation}_after')
         self.builder.branch(test)
         self.set_block(test)
         index = self.builder.load(index_ptr)
@@ -902,20 +2513,22 @@ class LLVMCodeGen:
         self.builder.branch(offset_test)
         self.set_block(offset_done)
         address = self._array_element_address(metadata, self.builder.load(offset_ptr))
-        element = self.builder.load(address, align=1)
+        self._reduce_element(node, operation, metadata, result_ptr, self.builder.load(address, align=1))
+        self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr)
+        self.builder.branch(test)
+        self.set_block(after)
+        return self.builder.load(result_ptr)
+
+    def _reduce_element(self, node, operation, metadata, result_ptr, element):
         if operation == 'sum':
             widened = self.cast(element, metadata['element'], node.type)
             current = self.builder.load(result_ptr)
-            updated = self.builder.fadd(current, widened) if is_float(node.type) else self.builder.add(current, widened)
+            updated = self.builder.fadd(current, widened, flags=self.fastmath) if is_float(node.type) else self.builder.add(current, widened)
         else:
             truth = self.truthy(element, metadata['element'], normalize=True)
             current = self.builder.load(result_ptr)
             updated = self.builder.or_(current, truth) if operation == 'any' else self.builder.and_(current, truth)
         self.builder.store(updated, result_ptr)
-        self.builder.store(self.builder.add(index, ir.Constant(ir_i64, 1)), index_ptr)
-        self.builder.branch(test)
-        self.set_block(after)
-        return self.builder.load(result_ptr)
 
     def _runtime_call(self, name, return_type, arg_types, args):
         pointer_type = ir.PointerType(ir.FunctionType(return_type, arg_types))
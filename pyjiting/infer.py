@@ -1,10 +1,11 @@
 from . import ast as core
 from .errors import InferError
-from .intrinsics import MATH_INTRINSICS, STRING_INTRINSICS, STRING_PREDICATES, STRING_TRANSFORMS
+from .intrinsics import (MATH_ARITY, MATH_CLASSIFIERS, MATH_INTEGER_RESULTS, MATH_INTRINSICS,
+                         STRING_PREDICATES, STRING_TRANSFORMS)
 from .types import (FuncType, TupleType, bool_t, can_widen, contains_array,
                     double64_t, float32_t, int32_t, int64_t, is_array, is_integer,
-                    is_numeric, is_string, is_truthy_type, is_tuple, promote_numeric,
-                    shape_t, str_t, void_t)
+                    is_list, is_numeric, is_string, is_truthy_type, is_tuple, promote_numeric,
+                    shape_t, str_list_t, str_t, void_t)
 
 
 class UnderDetermined(InferError):
@@ -108,6 +109,7 @@ class TypeInferencer:
     def visit_StoreIndex(self, node):
         array_ty = self.visit(node.value)
         if not is_array(array_ty): raise InferError('subscript assignment requires an array', node.value)
+        if is_string(array_ty.b): raise InferError('unicode arrays are read-only in JIT code', node.value)
         for index in node.indices: self._coerce(self.visit(index), int64_t, index)
         node.type = self._coerce(self.visit(node.rhs), array_ty.b, node.rhs)
 
@@ -145,6 +147,10 @@ class TypeInferencer:
                     self._coerce(self.visit(index.step), int64_t, index.step)
                 setattr(index, 'type', str_t); node.type = str_t; return str_t
             self._coerce(self.visit(index), int64_t, index); node.type = str_t; return str_t
+        if is_list(value_ty):
+            if len(node.indices) != 1 or isinstance(node.indices[0], core.Slice):
+                raise InferError('list expects one integer index', node)
+            self._coerce(self.visit(node.indices[0]), int64_t, node.indices[0]); node.type = value_ty.b; return node.type
         if value_ty == shape_t:
             if len(node.indices) != 1: raise InferError('shape expects one index', node)
             self._coerce(self.visit(node.indices[0]), int64_t, node.indices[0]); node.type = int64_t; return node.type
@@ -261,9 +267,9 @@ class TypeInferencer:
 
     def visit_ForEach(self, node):
         iterable = self.visit(node.iterable)
-        if is_array(iterable): item_type = iterable.b
+        if is_array(iterable) or is_list(iterable): item_type = iterable.b
         elif is_string(iterable): item_type = str_t
-        else: raise InferError('for iteration requires an array or string', node.iterable)
+        else: raise InferError('for iteration requires an array, list or string', node.iterable)
         before = self.env.copy(); self.env[node.var.id] = item_type; node.var.type = item_type
         for stmt in node.body: self._visit_statement(stmt)
         for stmt in node.orelse: self._visit_statement(stmt)
@@ -282,8 +288,9 @@ class TypeInferencer:
     def visit_CallFunc(self, node):
         arg_types = [self.visit(arg) for arg in node.args]
         if node.fn.id == 'len':
-            if len(arg_types) != 1 or not (is_string(arg_types[0]) or is_array(arg_types[0]) or is_tuple(arg_types[0])):
-                raise InferError('len expects one string, tuple, or array argument', node)
+            if len(arg_types) != 1 or not (is_string(arg_types[0]) or is_array(arg_types[0]) or is_tuple(arg_types[0])
+                                           or is_list(arg_types[0])):
+                raise InferError('len expects one string, tuple, list, or array argument', node)
             node.type = int64_t; return int64_t
         if node.fn.id == 'abs':
             if len(arg_types) != 1 or not is_numeric(arg_types[0]):
@@ -302,15 +309,29 @@ class TypeInferencer:
             if len(arg_types) != 1 or not is_integer(arg_types[0]):
                 raise InferError('chr expects one integer argument', node)
             node.type = str_t; return str_t
+        if node.fn.id in ('int', 'float', 'str'):
+            if len(arg_types) != 1 or not (is_numeric(arg_types[0]) or is_string(arg_types[0])):
+                raise InferError(f'{node.fn.id} expects one numeric or string argument', node)
+            node.type = {'int': int64_t, 'float': double64_t, 'str': str_t}[node.fn.id]; return node.type
+        if node.fn.id == 'pyjiting.string_hash':
+            if arg_types != [str_t]: raise InferError('string_hash expects one string argument', node)
+            node.type = int64_t; return int64_t
         if node.fn.id in MATH_INTRINSICS:
-            if len(arg_types) != 1 or not is_numeric(arg_types[0]):
-                raise InferError(f'{node.fn.id} expects one numeric argument', node)
-            node.operand_type = double64_t
-            node.type = bool_t if node.fn.id in ('math.isnan', 'math.isinf', 'math.isfinite') else double64_t
+            arity = MATH_ARITY.get(node.fn.id[5:], 1)
+            if len(arg_types) != arity or not all(map(is_numeric, arg_types)):
+                raise InferError(f'{node.fn.id} expects {("one", "two", "three")[arity - 1]} numeric '
+                                 f'argument{"s" if arity > 1 else ""}', node)
+            # float32 operands stay float32 (llvm.*.f32) rather than round-tripping through double.
+            node.operand_type = float32_t if all(ty == float32_t for ty in arg_types) else double64_t
+            if node.fn.id in MATH_CLASSIFIERS: node.type = bool_t
+            elif node.fn.id in MATH_INTEGER_RESULTS: node.type = int64_t
+            else: node.type = node.operand_type
             return node.type
         if node.fn.id in ('sum', 'any', 'all'):
             if len(arg_types) != 1 or not is_array(arg_types[0]):
                 raise InferError(f'{node.fn.id} expects one array argument', node)
+            if not is_numeric(arg_types[0].b):
+                raise InferError(f'{node.fn.id} expects a numeric array', node)
             element = arg_types[0].b
             if node.fn.id in ('any', 'all'):
                 node.type = bool_t
@@ -321,15 +342,27 @@ class TypeInferencer:
             else:
                 node.type = element
             return node.type
-        if node.fn.id in STRING_INTRINSICS and node.fn.id in ('str.startswith', 'str.endswith'):
-            if arg_types != [str_t, str_t]: raise InferError(f'{node.fn.id[4:]} expects one string argument', node)
-            node.type = bool_t; return bool_t
-        if node.fn.id in STRING_INTRINSICS and node.fn.id in ('str.find', 'str.count'):
-            if arg_types != [str_t, str_t]: raise InferError(f'{node.fn.id[4:]} expects one string argument', node)
-            node.type = int64_t; return int64_t
+        if node.fn.id in ('str.startswith', 'str.endswith', 'str.find', 'str.count'):
+            if arg_types[:2] != [str_t, str_t] or len(arg_types) > 4 or not all(is_integer(ty) for ty in arg_types[2:]):
+                raise InferError(f'{node.fn.id[4:]} expects one string argument and optional integer start and end', node)
+            node.type = bool_t if node.fn.id in ('str.startswith', 'str.endswith') else int64_t
+            return node.type
         if node.fn.id in STRING_TRANSFORMS:
             if arg_types != [str_t]: raise InferError(f'{node.fn.id[4:]} expects no arguments', node)
             node.type = str_t; return str_t
+        if node.fn.id == 'str.join':
+            items = arg_types[1] if len(arg_types) == 2 else None
+            if arg_types[0] != str_t or not (items == str_t or ((is_array(items) or is_list(items)) and is_string(items.b)) or (
+                    is_tuple(items) and all(is_string(element) for element in items.elements))):
+                raise InferError('join expects a string, a list or tuple of strings, or a unicode array', node)
+            node.type = str_t; return str_t
+        if node.fn.id in ('str.split', 'str.splitlines', 'str.partition'):
+            expected, message = {'str.split': (([str_t], [str_t, str_t]), 'split expects an optional string separator'),
+                                 'str.splitlines': (([str_t],), 'splitlines expects no arguments'),
+                                 'str.partition': (([str_t, str_t],), 'partition expects one string argument')}[node.fn.id]
+            if arg_types not in expected: raise InferError(message, node)
+            node.type = TupleType((str_t,) * 3) if node.fn.id == 'str.partition' else str_list_t
+            return node.type
         if node.fn.id == 'str.replace':
             if arg_types != [str_t, str_t, str_t]:
                 raise InferError('replace expects two string arguments', node)
@@ -1,13 +1,27 @@
-FUNCTION_INTRINSICS = frozenset({'len', 'abs', 'min', 'max', 'ord', 'chr', 'sum', 'any', 'all'})
+import math
+
+FUNCTION_INTRINSICS = frozenset({
+    'len', 'abs', 'min', 'max', 'ord', 'chr', 'sum', 'any', 'all', 'int', 'float', 'str',
+    'pyjiting.string_hash',
+})
 MATH_FUNCTIONS = frozenset({
-    'sin', 'cos', 'sqrt', 'exp', 'log', 'log2', 'log10',
+    'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'atan2', 'sinh', 'cosh', 'tanh', 'asinh', 'acosh', 'atanh',
+    'sqrt', 'cbrt', 'exp', 'exp2', 'expm1', 'log', 'log2', 'log10', 'log1p', 'pow', 'hypot',
+    'erf', 'erfc', 'fabs', 'copysign', 'floor', 'ceil', 'trunc',
     'isnan', 'isinf', 'isfinite',
+    # math.fma is new in Python 3.13; offering it earlier would break the Python fallback.
+    *(('fma',) if hasattr(math, 'fma') else ()),
 })
+MATH_ARITY = {'atan2': 2, 'pow': 2, 'hypot': 2, 'copysign': 2, 'fma': 3}
+# Like CPython, these return int and raise for NaN, infinities and values outside int64.
+MATH_INTEGER_RESULTS = frozenset({'math.floor', 'math.ceil', 'math.trunc'})
+MATH_CLASSIFIERS = frozenset({'math.isnan', 'math.isinf', 'math.isfinite'})
 MATH_INTRINSICS = frozenset(f'math.{name}' for name in MATH_FUNCTIONS)
 MATH_CONSTANTS = frozenset({'pi', 'e', 'tau', 'inf', 'nan'})
 STRING_METHODS = frozenset({
     'startswith', 'endswith', 'find', 'count', 'upper', 'lower', 'strip',
-    'lstrip', 'rstrip', 'replace', 'isalpha', 'isalnum', 'isdigit', 'isspace',
+    'lstrip', 'rstrip', 'replace', 'isalpha', 'isalnum', 'isdigit', 'isspace', 'join',
+    'split', 'splitlines', 'partition',
 })
 STRING_INTRINSICS = frozenset(f'str.{name}' for name in STRING_METHODS)
 STRING_TRANSFORMS = frozenset(f'str.{name}' for name in ('upper', 'lower', 'strip', 'lstrip', 'rstrip'))
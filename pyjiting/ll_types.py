@@ -1,16 +1,27 @@
 # pyright: reportArgumentType=false, reportAttributeAccessIssue=false, reportOptionalSubscript=false, reportGeneralTypeIssues=false
 
 import ctypes
+import functools
 from typing import Any
 
 import numpy as np
 from llvmlite import ir
 
-from .string_runtime import (StringDescriptor, StringPointer, begin_call, end_call,
-                             keep_alive, make_string, take_pending_exception,
+from .string_runtime import (StringDescriptor, StringListDescriptor, StringListPointer,
+                             StringPointer, begin_call, end_call, keep_alive,
+                             list_to_python, make_string, take_pending_exception,
                              to_python)
 
 
+@functools.cache
+def llvm_binding():
+    """Import llvmlite's binding layer and initialize the native target on first use."""
+    import llvmlite.binding as llvm
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+    return llvm
+
+
 ERROR_DIVISION_BY_ZERO = 1
 ERROR_RANGE_STEP_ZERO = 2
 ERROR_ARRAY_DIMENSION_MISMATCH = 3
@@ -22,6 +33,7 @@ ERROR_MATH_DOMAIN = 8
 ERROR_MATH_RANGE = 9
 ERROR_ARRAY_READONLY = 10
 ERROR_PYTHON_CALLBACK = 11
+ERROR_EMPTY_SEPARATOR = 12
 
 ARRAY_WRITEABLE = 1 << 0
 ARRAY_ALIGNED = 1 << 1
@@ -36,8 +48,9 @@ _tuple_ctypes = {}
 
 
 def type_repr(ty):
-    from .types import GenericType, TupleType, array_t
+    from .types import GenericType, TupleType, array_t, list_t
     if isinstance(ty, GenericType) and ty.a == array_t: return f'arr_{type_repr(ty.b)}'
+    if isinstance(ty, GenericType) and ty.a == list_t: return f'list_{type_repr(ty.b)}'
     if isinstance(ty, TupleType): return 'tuple_' + '_'.join(type_repr(element) for element in ty.elements) + '_end'
     return {'Int32': 'i32', 'Int64': 'i64', 'Bool': 'bool', 'Float': 'f32', 'Double': 'f64',
             'String': 'str', 'Void': 'void'}.get(str(ty), str(ty).lower())
@@ -61,6 +74,7 @@ def wrap_type(llvm_type) -> Any:
         return _tuple_ctypes[key]
     if isinstance(llvm_type, ir.IdentifiedStructType):
         if llvm_type.name == 'pyjiting.string': return StringDescriptor
+        if llvm_type.name == 'pyjiting.strlist': return StringListDescriptor
         cached = getattr(llvm_type, '_pyjiting_ctype', None)
         if cached is not None: return cached
         fields = [
@@ -82,7 +96,8 @@ def wrap_type(llvm_type) -> Any:
 
 def wrap_ndarray(value):
     dtype = np.dtype(value.dtype)
-    if dtype not in _numpy_ctypes: raise TypeError(f'unsupported ndarray dtype {dtype}')
+    if dtype not in _numpy_ctypes and not (dtype.kind == 'U' and dtype.isnative):
+        raise TypeError(f'unsupported ndarray dtype {dtype}')
     data = ctypes.cast(value.ctypes.data, ctypes.POINTER(ctypes.c_int8))
     shape = (ctypes.c_int64 * value.ndim)(*value.shape)
     strides = (ctypes.c_int64 * value.ndim)(*value.strides)
@@ -125,6 +140,7 @@ def unwrap_tuple(pointer):
     for name, field_type in pointer._type_._fields_:
         value = getattr(pointer.contents, name)
         if field_type == StringPointer: result.append(to_python(value))
+        elif field_type == StringListPointer: result.append(list_to_python(value))
         elif issubclass(field_type, ctypes._Pointer) and getattr(field_type._type_, '_pyjiting_tuple', False):
             result.append(unwrap_tuple(value))
         else: result.append(value)
@@ -156,12 +172,14 @@ def dispatcher(fn, user_arg_count):
             if error.value == ERROR_MATH_DOMAIN: raise ValueError('math domain error')
             if error.value == ERROR_MATH_RANGE: raise OverflowError('math range error')
             if error.value == ERROR_ARRAY_READONLY: raise ValueError('assignment destination is read-only')
+            if error.value == ERROR_EMPTY_SEPARATOR: raise ValueError('empty separator')
             if error.value == ERROR_PYTHON_CALLBACK:
                 pending = take_pending_exception()
                 if pending is None:
                     raise RuntimeError('registered callback failed without a Python exception')
                 raise pending
             if fn._restype_ == StringPointer: return to_python(result)
+            if fn._restype_ == StringListPointer: return list_to_python(result)
             if (isinstance(fn._restype_, type) and issubclass(fn._restype_, ctypes._Pointer) and
                     getattr(fn._restype_._type_, '_pyjiting_tuple', False)):
                 return unwrap_tuple(result)
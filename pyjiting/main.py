@@ -1,7 +1,7 @@
 # pyright: reportArgumentType=false
 
 import ast as py_ast
-import copy
+from collections import OrderedDict
 import functools
 import hashlib
 import inspect
@@ -10,37 +10,61 @@ import sys
 import threading
 from time import perf_counter_ns, time_ns
 from types import MappingProxyType
-from typing import Any, Callable, ParamSpec, TypeVar, overload
+from typing import AbstractSet, Any, Callable, ParamSpec, Sequence, TypeVar, overload
 import warnings
 
-import llvmlite.binding as llvm
 import numpy as np
 from llvmlite import ir
 
-from .codegen import LLVMCodeGen
+from .ast import annotation_table
+from .codegen import DEFAULT_FASTMATH, FASTMATH_FLAGS, LLVMCodeGen, literal_footprint
 from .errors import (CodegenError, CompileError, FallbackWarning, InferError, RuntimeClosedError,
                      RuntimeResourceError, SpecializationLimitError)
 from .infer import TypeInferencer
-from .ll_types import mangler, wrap_module
+from .ll_types import llvm_binding, mangler, wrap_module
 from .parser import ASTVisitor
-from .registry import (callback_count, callback_stats as registered_callback_stats,
+from .registry import (cache_stats as registered_cache_stats, callback_count,
+                       callback_stats as registered_callback_stats,
                        get as get_registered, register, unregister,
                        registration_id, signatures)
-from .string_runtime import callback_stats, literal_count
+from .string_runtime import callback_stats
 from .types import (TupleType, bool_t, contains_array, double64_t, float32_t,
                     int32_t, int64_t, make_array_type, str_t)
 
 
 DEFAULT_MAX_SPECIALIZATIONS = 64
+IR_CACHE_SIZE = 8
+BASELINE_OPT_LEVEL = 1
+OPTIMIZED_OPT_LEVEL = 3
 DEBUG = False
 P = ParamSpec('P')
 R = TypeVar('R')
-llvm.initialize_native_target()
-llvm.initialize_native_asmprinter()
+# Created on first use, so importing pyjiting neither loads LLVM nor builds an engine.
+TARGET_ATTRIBUTES = frozenset({'target_cpu', 'target_features', 'target_machine', 'target_fingerprint', 'engine'})
+
+
+def validate_target(cpu=None, features=None):
+    if features is not None and not isinstance(features, str):
+        raise ValueError('features must be a feature string or None')
+    if cpu is not None and (not isinstance(cpu, str) or not cpu):
+        raise ValueError("cpu must be 'host', 'generic', an LLVM CPU name, or None")
+
+
+def resolve_target(cpu=None, features=None):
+    """Return the CPU name and feature string used for one runtime's target machine."""
+    validate_target(cpu, features)
+    if cpu is None or cpu == 'generic':
+        name, default_features = 'generic', ''
+    elif cpu == 'host':
+        llvm = llvm_binding()
+        name, default_features = llvm.get_host_cpu_name(), llvm.get_host_cpu_features().flatten()
+    else:
+        name, default_features = cpu, ''
+    return name, ','.join(part for part in (default_features, features) if part)
 
 
 class RuntimeState:
-    def __init__(self, *, max_specializations=None, max_modules=None):
+    def __init__(self, *, max_specializations=None, max_modules=None, cpu=None, features=None):
         if (max_specializations is not None and
                 (not isinstance(max_specializations, int) or max_specializations < 1)):
             raise ValueError('max_specializations must be a positive integer or None')
@@ -50,6 +74,7 @@ class RuntimeState:
         self.compile_lock = self.cache_lock
         self.engine_lock = threading.RLock()
         self.compilation_unit_ids = itertools.count(1)
+        self.shared_units = {}
         self.function_cache = {}
         self.function_signatures = {}
         self.compilation_states = {}
@@ -58,17 +83,41 @@ class RuntimeState:
         self.runtime_counters = {
             'compile_hits': 0, 'compile_misses': 0, 'compile_failures': 0,
             'failure_cache_hits': 0, 'compile_waits': 0,
+            'tier_ups': 0, 'tier_up_failures': 0,
+            'string_literals': 0, 'string_literal_bytes': 0,
         }
         self.specialization_metrics = {}
-        self.specialization_ir = {}
+        self.specialization_ir = OrderedDict()
         self.failure_cache = {}
         self.failure_details = {}
+        self.tier_ups = {}
         self.max_specializations = max_specializations
         self.max_modules = max_modules
         self.closed = False
         self.registered_functions = []
-        self.target_machine = llvm.Target.from_default_triple().create_target_machine()
-        self.engine = llvm.create_mcjit_compiler(llvm.parse_assembly(''), self.target_machine)
+        validate_target(cpu, features)
+        self.requested_target = cpu, features
+
+    def __getattr__(self, name):
+        if name not in TARGET_ATTRIBUTES:
+            raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+        self.initialize_target()
+        return self.__dict__[name]
+
+    def initialize_target(self):
+        """Create the target machine and MCJIT engine; later reads are plain attribute lookups."""
+        with self.engine_lock:
+            if 'engine' in self.__dict__:
+                return
+            llvm = llvm_binding()
+            target_cpu, target_features = resolve_target(*self.requested_target)
+            target_machine = llvm.Target.from_default_triple().create_target_machine(
+                cpu=target_cpu, features=target_features)
+            self.target_cpu, self.target_features = target_cpu, target_features
+            self.target_machine = target_machine
+            self.target_fingerprint = hashlib.sha256('\0'.join(
+                (target_machine.triple, target_cpu, target_features)).encode()).hexdigest()[:16]
+            self.engine = llvm.create_mcjit_compiler(llvm.parse_assembly(''), target_machine)
 
     def ensure_open(self):
         if self.closed:
@@ -88,8 +137,12 @@ retained_modules = default_runtime.retained_modules
 runtime_counters = default_runtime.runtime_counters
 specialization_metrics = default_runtime.specialization_metrics
 specialization_ir = default_runtime.specialization_ir
-target_machine = default_runtime.target_machine
-engine = default_runtime.engine
+
+
+def __getattr__(name):
+    if name in ('target_machine', 'engine'):
+        return getattr(default_runtime, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def debug(*values):
@@ -101,28 +154,96 @@ def validate_specialization_limit(value):
         raise ValueError('max_specializations must be a positive integer or None')
 
 
-def reg(fn: Callable[P, R]) -> Callable[P, R]:
-    return register(fn)
+def validate_specialize_values(value):
+    if isinstance(value, str) or not all(isinstance(name, str) for name in value):
+        raise ValueError('specialize_values must be a sequence of parameter names')
+
+
+def value_parameter_indices(tree, names):
+    validate_specialize_values(names)
+    parameters = [arg.id for arg in tree.args]
+    unknown = [name for name in names if name not in parameters]
+    if unknown:
+        raise ValueError(f'specialize_values names unknown parameters of {tree.fname}(): {", ".join(unknown)}')
+    return tuple(sorted({parameters.index(name) for name in names}))
+
+
+def normalize_fastmath(value):
+    if value is False or value is None:
+        return frozenset()
+    if value is True:
+        return DEFAULT_FASTMATH
+    if (not isinstance(value, (set, frozenset, tuple, list)) or
+            not all(isinstance(flag, str) for flag in value)):
+        raise ValueError('fastmath must be a bool or a set of LLVM fast-math flag names')
+    flags = frozenset(value)
+    unknown = flags - FASTMATH_FLAGS
+    if unknown:
+        raise ValueError(f'unknown fast-math flags: {", ".join(sorted(unknown))}')
+    return flags
+
+
+def validate_tier_threshold(value):
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+        raise ValueError('tier_threshold must be a positive integer or None')
+
+
+@overload
+def reg(fn: Callable[P, R], *, pure: bool = False, cache_size: int | None = None,
+        batch: bool = False) -> Callable[P, R]: ...
+
+
+@overload
+def reg(fn: None = None, *, pure: bool = False, cache_size: int | None = None,
+        batch: bool = False) -> Callable[[Callable[P, R]], Callable[P, R]]: ...
+
+
+def reg(fn: Any = None, *, pure: bool = False, cache_size: int | None = None, batch: bool = False) -> Any:
+    if fn is None:
+        return functools.partial(register, pure=pure, cache_size=cache_size, batch=batch)
+    return register(fn, pure=pure, cache_size=cache_size, batch=batch)
+
+
+ARRAY_DTYPES = {np.dtype(np.int32): int32_t, np.dtype(np.int64): int64_t,
+                np.dtype(np.float32): float32_t, np.dtype(np.float64): double64_t}
+_dispatch_types = {}
 
 
 def arg_pytype(arg):
+    """Classify one call argument, memoizing value-independent results by Python type."""
+    cls = type(arg)
+    key = (cls, arg.dtype) if isinstance(arg, np.ndarray) else cls
+    cached = _dispatch_types.get(key)
+    if cached is not None:
+        return cached
+    if cls is int:
+        if -sys.maxsize - 1 <= arg <= sys.maxsize: return int64_t
+        raise TypeError(f'Unsupported type: {cls.__name__}')
     if isinstance(arg, tuple):
         elements = [arg_pytype(element) for element in arg]
         if any(contains_array(element) for element in elements):
             raise TypeError('ndarray elements inside tuples are not supported')
         return TupleType(elements)
+    if isinstance(arg, int) and not isinstance(arg, (bool, np.bool_)):
+        # Python int subclasses are range-checked per value and never memoized.
+        if -sys.maxsize - 1 <= arg <= sys.maxsize: return int64_t
+        raise TypeError(f'Unsupported type: {cls.__name__}')
+    ty = _classify_arg(arg)
+    _dispatch_types[key] = ty
+    return ty
+
+
+def _classify_arg(arg):
     if isinstance(arg, np.ndarray):
-        dtype_map = {np.dtype(np.int32): int32_t, np.dtype(np.int64): int64_t,
-                     np.dtype(np.float32): float32_t,
-                     np.dtype(np.float64): double64_t}
-        try: return make_array_type(dtype_map[np.dtype(arg.dtype)])
+        # Native-order ``<U{n}`` buffers already hold fixed-width UTF-32 code points.
+        if arg.dtype.kind == 'U' and arg.dtype.isnative: return make_array_type(str_t)
+        try: return make_array_type(ARRAY_DTYPES[np.dtype(arg.dtype)])
         except KeyError as error: raise TypeError(f'Unsupported ndarray dtype: {arg.dtype}') from error
     if isinstance(arg, (bool, np.bool_)): return bool_t
     if isinstance(arg, np.int32): return int32_t
     if isinstance(arg, np.int64): return int64_t
     if isinstance(arg, np.float32): return float32_t
     if isinstance(arg, np.floating) or isinstance(arg, float): return double64_t
-    if isinstance(arg, int) and -sys.maxsize - 1 <= arg <= sys.maxsize: return int64_t
     if isinstance(arg, str): return str_t
     raise TypeError(f'Unsupported type: {type(arg).__name__}')
 
@@ -146,8 +267,46 @@ def _fingerprint_value(value):
     return f'{type(value).__module__}.{type(value).__qualname__}:{value!r}'
 
 
+def _binding_token(value):
+    """Identify a bound name's value for unit sharing, or return None if it cannot be compared safely."""
+    callee_tree = getattr(value, '__pyjiting_tree__', None)
+    if callee_tree is not None:
+        return 'jit', ensure_compilation_unit(callee_tree)
+    identifier = registration_id(value)
+    if identifier is not None:
+        return 'reg', identifier
+    if isinstance(value, type(sys)):
+        return 'module', value.__name__
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return 'value', type(value).__qualname__, repr(value)
+    if isinstance(value, tuple):
+        items = tuple(map(_binding_token, value))
+        return None if None in items else ('tuple', items)
+    return None
+
+
+def sharing_key(tree):
+    """Key under which decorations of one definition with equal code and bindings share a unit."""
+    if not getattr(tree, 'shareable', False):
+        return None
+    tokens = []
+    for name, value in sorted(getattr(tree, 'bindings', {}).items()):
+        token = _binding_token(value)
+        if token is None:
+            return None
+        tokens.append((name, token))
+    return (tree.symbol, tree.semantic_fingerprint, tuple(tokens), getattr(tree, 'fastmath', frozenset()),
+            getattr(tree, 'value_indices', ()), getattr(tree, 'max_specializations', None),
+            getattr(tree, 'tier_threshold', None))
+
+
 def ensure_compilation_unit(tree):
-    """Assign a process-unique identity to one decorated/parsed function tree."""
+    """Assign a compilation unit to one decorated/parsed function tree.
+
+    Decorating the same definition again with equal code, bound values and options, as
+    a closure factory does on every call, joins the existing unit and shares its native
+    specializations instead of compiling identical code again.
+    """
     unit_id = getattr(tree, 'compilation_unit_id', None)
     if unit_id is not None:
         return unit_id
@@ -156,17 +315,39 @@ def ensure_compilation_unit(tree):
     with state.compile_lock:
         unit_id = getattr(tree, 'compilation_unit_id', None)
         if unit_id is None:
-            unit_id = next(state.compilation_unit_ids)
-            tree.compilation_unit_id = unit_id
             fingerprint_source = _fingerprint_value(tree)
             tree.semantic_fingerprint = hashlib.sha256(fingerprint_source.encode()).hexdigest()
-            base_symbol = getattr(tree, 'symbol', tree.fname)
-            tree.symbol = f'{base_symbol}_{tree.semantic_fingerprint[:12]}_u{unit_id:x}'
+            key = sharing_key(tree)
+            if key in state.shared_units:
+                unit_id, tree.symbol = state.shared_units[key]
+            else:
+                unit_id = next(state.compilation_unit_ids)
+                base_symbol = getattr(tree, 'symbol', tree.fname)
+                tree.symbol = f'{base_symbol}_{tree.semantic_fingerprint[:12]}_u{unit_id:x}'
+                if key is not None:
+                    state.shared_units[key] = unit_id, tree.symbol
+            tree.compilation_unit_id = unit_id
     return unit_id
 
 
-def specialization_key(tree, arg_types):
-    return ensure_compilation_unit(tree), tuple(arg_types)
+def specialization_key(tree, arg_types, values=()):
+    return ensure_compilation_unit(tree), tuple(arg_types), values
+
+
+def specialized_values(tree, args, arg_types):
+    """Return the ``(index, value)`` pairs of arguments selected by ``specialize_values``."""
+    indices = getattr(tree, 'value_indices', ()) if len(args) == len(tree.args) else ()
+    for index in indices:
+        if arg_types[index] not in (int64_t, int32_t, bool_t):
+            raise TypeError(f'{tree.fname}() argument {tree.args[index].id!r} is value-specialized '
+                            f'and must be an integer or bool, got {type(args[index]).__name__}')
+    return tuple((index, int(args[index])) for index in indices)
+
+
+def generation_symbol(tree, generation, values=()):
+    # Folded values are part of the symbol, so each value gets its own native function.
+    suffix = ''.join(f'_v{index}_{value}'.replace('-', 'm') for index, value in values)
+    return f'{tree.symbol}_g{generation}{suffix}'
 
 
 def native_symbol(tree, arg_types):
@@ -174,8 +355,11 @@ def native_symbol(tree, arg_types):
     key = specialization_key(tree, arg_types)
     state = getattr(tree, 'runtime_state', default_runtime)
     with state.cache_lock:
+        metrics = state.specialization_metrics.get(key)
+        if metrics is not None:
+            return metrics['native_symbol']
         generation = state.specialization_generations.get(key, 0)
-    return mangler(f'{tree.symbol}_g{generation}', arg_types)
+    return mangler(generation_symbol(tree, generation), arg_types)
 
 
 def visible_binding(tree, name):
@@ -185,10 +369,59 @@ def visible_binding(tree, name):
     return getattr(tree, 'namespace', {}).get(name)
 
 
-def compile_specialization(tree, arg_types):
+def specialization_resolvers(tree):
+    """Resolve JIT and @reg callees visible from one compilation unit."""
+    state = getattr(tree, 'runtime_state', default_runtime)
+
+    def resolve_jit(name, call_arg_types):
+        candidate = visible_binding(tree, name)
+        callee_tree = getattr(candidate, '__pyjiting_tree__', None)
+        if callee_tree is None: return None, None
+        if getattr(callee_tree, 'runtime_state', default_runtime) is not state:
+            raise InferError('JIT functions from different runtime contexts cannot call each other', tree)
+        compile_specialization(callee_tree, call_arg_types)
+        callee_key = specialization_key(callee_tree, call_arg_types)
+        with state.cache_lock:
+            return state.function_signatures[callee_key], native_symbol(callee_tree, call_arg_types)
+
+    def resolve_reg(name):
+        candidate = visible_binding(tree, name)
+        identifier = registration_id(candidate) if candidate is not None else None
+        registered = get_registered(identifier if identifier is not None else name)
+        if registered is None:
+            return None, None
+        return registered[1], identifier
+
+    return resolve_jit, resolve_reg
+
+
+def lower_specialization(tree, arg_types, generation, values=()):
+    """Infer and lower one signature, keeping annotations out of the shared tree."""
+    resolve_jit, resolve_reg = specialization_resolvers(tree)
+    state = getattr(tree, 'runtime_state', default_runtime)
+    base_symbol = generation_symbol(tree, generation, values)
+    with annotation_table():
+        function_type = typeinfer(tree, arg_types, jit_resolver=resolve_jit, reg_resolver=resolve_reg)
+        module = ir.Module(name=f'pyjiting.{state.target_fingerprint}.{mangler(base_symbol, arg_types)}')
+        module.triple = state.target_machine.triple
+        module.data_layout = str(state.target_machine.target_data)
+        llfunc = LLVMCodeGen(module, function_type.return_type, arg_types, base_symbol,
+                             getattr(tree, 'fastmath', frozenset()), dict(values)).visit(tree)
+    return function_type, module, llfunc
+
+
+def optimize_module(state, binding_module, opt_level=OPTIMIZED_OPT_LEVEL):
+    llvm = llvm_binding()
+    pto = llvm.create_pipeline_tuning_options(speed_level=opt_level)
+    pto.loop_vectorization = opt_level >= OPTIMIZED_OPT_LEVEL
+    pass_builder = llvm.create_pass_builder(state.target_machine, pto)
+    pass_builder.getModulePassManager().run(binding_module, pass_builder)
+
+
+def compile_specialization(tree, arg_types, values=()):
     state = getattr(tree, 'runtime_state', default_runtime)
     state.ensure_open()
-    key = specialization_key(tree, arg_types)
+    key = specialization_key(tree, arg_types, values)
     owner = threading.get_ident()
     with state.cache_lock:
         while key in state.compilation_states:
@@ -226,57 +459,36 @@ def compile_specialization(tree, arg_types):
 
     started_ns = perf_counter_ns()
     try:
-        specialized = copy.deepcopy(tree)
         with state.cache_lock:
             generation = state.specialization_generations.get(key, 0)
-        specialized.symbol = f'{tree.symbol}_g{generation}'
-        symbol = mangler(specialized.symbol, arg_types)
-
-        def resolve_jit(name, call_arg_types):
-            candidate = visible_binding(tree, name)
-            callee_tree = getattr(candidate, '__pyjiting_tree__', None)
-            if callee_tree is None: return None, None
-            if getattr(callee_tree, 'runtime_state', default_runtime) is not state:
-                raise InferError('JIT functions from different runtime contexts cannot call each other', tree)
-            compile_specialization(callee_tree, call_arg_types)
-            callee_key = specialization_key(callee_tree, call_arg_types)
-            with state.cache_lock:
-                return state.function_signatures[callee_key], native_symbol(callee_tree, call_arg_types)
-
-        def resolve_reg(name):
-            candidate = visible_binding(tree, name)
-            identifier = registration_id(candidate) if candidate is not None else None
-            registered = get_registered(identifier if identifier is not None else name)
-            if registered is None:
-                return None, None
-            return registered[1], identifier
-
-        function_type = typeinfer(specialized, arg_types, jit_resolver=resolve_jit,
-                                  reg_resolver=resolve_reg)
-        module = ir.Module(name=f'pyjiting.{symbol}')
-        module.triple = llvm.get_default_triple()
-        llfunc = LLVMCodeGen(module, function_type.return_type, arg_types).visit(specialized)
+        symbol = mangler(generation_symbol(tree, generation, values), arg_types)
+        function_type, module, llfunc = lower_specialization(tree, arg_types, generation, values)
+        tiered = getattr(tree, 'tier_threshold', None) is not None
+        opt_level = BASELINE_OPT_LEVEL if tiered else OPTIMIZED_OPT_LEVEL
         with state.engine_lock:
-            binding_module = llvm.parse_assembly(str(module)); binding_module.verify()
-            pto = llvm.create_pipeline_tuning_options(speed_level=3); pto.loop_vectorization = True
-            pass_builder = llvm.create_pass_builder(state.target_machine, pto)
-            unoptimized_ir = str(module)
-            pass_builder.getModulePassManager().run(binding_module, pass_builder)
-            optimized_ir = str(binding_module)
+            binding_module = llvm_binding().parse_assembly(str(module)); binding_module.verify()
+            optimize_module(state, binding_module, opt_level)
             state.engine.add_module(binding_module); state.engine.finalize_object()
             wrapper = wrap_module(arg_types, llfunc, state.engine)
+        literals, literal_bytes = literal_footprint(module)
         with state.cache_lock:
-            state.retained_modules.append(binding_module)
+            retain_module(state, binding_module, literals, literal_bytes)
             state.function_signatures[key] = function_type
             state.function_cache[key] = wrapper
-            state.specialization_ir[key] = (unoptimized_ir, optimized_ir)
             state.specialization_metrics[key] = {
                 'argument_types': tuple(map(str, arg_types)),
+                'argument_values': MappingProxyType({tree.args[index].id: value for index, value in values}),
                 'return_type': str(function_type.return_type),
                 'native_symbol': symbol,
                 'compile_time_ns': perf_counter_ns() - started_ns,
                 'compile_count': 1,
                 'generation': generation,
+                'tier': 'baseline' if tiered else 'optimized',
+                'opt_level': opt_level,
+                'target': state.target_fingerprint,
+                'fastmath': tuple(sorted(getattr(tree, 'fastmath', ()))),
+                'string_literals': literals,
+                'string_literal_bytes': literal_bytes,
                 'calls': 0,
             }
             compilation = state.compilation_states.pop(key)
@@ -306,6 +518,86 @@ def compile_specialization(tree, arg_types):
         raise
 
 
+def retain_module(state, binding_module, literals, literal_bytes):
+    """Keep a finalized module alive; its string literals are counted as long as it is retained."""
+    state.retained_modules.append(binding_module)
+    state.runtime_counters['string_literals'] += literals
+    state.runtime_counters['string_literal_bytes'] += literal_bytes
+
+
+def record_call(tree, key):
+    """Count one Python-level call and schedule a tier-up once a signature is hot."""
+    state = getattr(tree, 'runtime_state', default_runtime)
+    threshold = getattr(tree, 'tier_threshold', None)
+    with state.cache_lock:
+        metrics = state.specialization_metrics.get(key)
+        if metrics is None:
+            return
+        metrics['calls'] += 1
+        if (threshold is None or metrics['tier'] != 'baseline' or metrics['calls'] < threshold or
+                'tier_up_error' in metrics or key in state.tier_ups or state.closed):
+            return
+        if state.max_modules is not None and len(state.retained_modules) >= state.max_modules:
+            return
+        generation = state.specialization_generations.get(key, 0) + 1
+        state.specialization_generations[key] = generation
+        metrics['tier'] = 'tiering'
+        thread = threading.Thread(
+            target=tier_up_specialization, args=(tree, list(key[1]), key, metrics['generation'], generation),
+            name=f'pyjiting-tier-up-{tree.fname}', daemon=True)
+        state.tier_ups[key] = thread
+        thread.start()
+
+
+def tier_up_specialization(tree, arg_types, key, baseline_generation, generation):
+    """Rebuild one hot baseline specialization at full optimization and swap it in."""
+    state = getattr(tree, 'runtime_state', default_runtime)
+    started_ns = perf_counter_ns()
+    try:
+        _, module, llfunc = lower_specialization(tree, arg_types, generation, key[2])
+        with state.engine_lock:
+            binding_module = llvm_binding().parse_assembly(str(module)); binding_module.verify()
+            optimize_module(state, binding_module, OPTIMIZED_OPT_LEVEL)
+            state.engine.add_module(binding_module); state.engine.finalize_object()
+            wrapper = wrap_module(arg_types, llfunc, state.engine)
+        literals, literal_bytes = literal_footprint(module)
+        with state.cache_lock:
+            retain_module(state, binding_module, literals, literal_bytes)
+            metrics = state.specialization_metrics.get(key)
+            if metrics is not None and metrics['generation'] == baseline_generation:
+                state.function_cache[key] = wrapper
+                state.specialization_ir.pop(key, None)
+                metrics.update({
+                    'native_symbol': mangler(generation_symbol(tree, generation, key[2]), arg_types),
+                    'generation': generation,
+                    'tier': 'optimized',
+                    'opt_level': OPTIMIZED_OPT_LEVEL,
+                    'compile_count': metrics['compile_count'] + 1,
+                    'tier_up_time_ns': perf_counter_ns() - started_ns,
+                })
+                state.runtime_counters['tier_ups'] += 1
+    except Exception as error:
+        with state.cache_lock:
+            state.runtime_counters['tier_up_failures'] += 1
+            metrics = state.specialization_metrics.get(key)
+            if metrics is not None and metrics['generation'] == baseline_generation:
+                metrics['tier'] = 'baseline'
+                metrics['tier_up_error'] = type(error).__name__
+    finally:
+        with state.cache_lock:
+            state.tier_ups.pop(key, None)
+
+
+def wait_for_tier_ups(state):
+    while True:
+        with state.cache_lock:
+            threads = [thread for thread in state.tier_ups.values() if thread is not threading.current_thread()]
+        if not threads:
+            return
+        for thread in threads:
+            thread.join()
+
+
 def fallback_reason(error):
     if isinstance(error, CodegenError): return 'codegen'
     if isinstance(error, InferError): return 'inference'
@@ -325,10 +617,14 @@ def emit_fallback_warning(policy, warned, function, error, *, stacklevel):
 
 
 def _wrapper_for_tree(tree, fn=None, fallback=False, max_specializations=DEFAULT_MAX_SPECIALIZATIONS,
-                      fallback_warning='once'):
+                      fallback_warning='once', tier_threshold=None, fastmath=False, specialize_values=()):
     validate_specialization_limit(max_specializations)
     validate_fallback_warning(fallback_warning)
+    validate_tier_threshold(tier_threshold)
     tree.max_specializations = max_specializations
+    tree.tier_threshold = tier_threshold
+    tree.fastmath = normalize_fastmath(fastmath)
+    tree.value_indices = value_indices = value_parameter_indices(tree, specialize_values)
     ensure_compilation_unit(tree)
     warned = False
 
@@ -368,8 +664,10 @@ def _wrapper_for_tree(tree, fn=None, fallback=False, max_specializations=DEFAULT
         args = normalize_args(args, kwargs)
         if len(args) != len(tree.args):
             raise TypeError(f'{tree.fname}() takes {len(tree.args)} positional arguments but {len(args)} were given')
+        arg_types = [arg_pytype(arg) for arg in args]
+        values = specialized_values(tree, args, arg_types) if value_indices else ()
         try:
-            compiled = compile_specialization(tree, [arg_pytype(arg) for arg in args])
+            compiled = compile_specialization(tree, arg_types, values)
         except CompileError as error:
             if isinstance(error, SpecializationLimitError):
                 raise
@@ -378,10 +676,7 @@ def _wrapper_for_tree(tree, fn=None, fallback=False, max_specializations=DEFAULT
             warn_fallback(error)
             return fn(*args)
         result = compiled(*args)
-        key = specialization_key(tree, [arg_pytype(arg) for arg in args])
-        with state.cache_lock:
-            if key in state.specialization_metrics:
-                state.specialization_metrics[key]['calls'] += 1
+        record_call(tree, specialization_key(tree, arg_types, values))
         return result
 
     if fn is not None:
@@ -395,8 +690,9 @@ def _wrapper_for_tree(tree, fn=None, fallback=False, max_specializations=DEFAULT
         if len(normalized) != len(tree.args):
             raise TypeError(f'{tree.fname}() takes {len(tree.args)} positional arguments but {len(normalized)} were given')
         arg_types = [arg_pytype(arg) for arg in normalized]
-        compile_specialization(tree, arg_types)
-        key = specialization_key(tree, arg_types)
+        values = specialized_values(tree, normalized, arg_types)
+        compile_specialization(tree, arg_types, values)
+        key = specialization_key(tree, arg_types, values)
         state = getattr(tree, 'runtime_state', default_runtime)
         with state.cache_lock:
             return MappingProxyType(dict(state.specialization_metrics[key]))
@@ -408,14 +704,19 @@ def _wrapper_for_tree(tree, fn=None, fallback=False, max_specializations=DEFAULT
 
 def _jit_with_state(state, fn: Any = None, *, fallback: bool = False,
                     max_specializations: int | None = DEFAULT_MAX_SPECIALIZATIONS,
-                    fallback_warning: str = 'once') -> Any:
+                    fallback_warning: str = 'once', tier_threshold: int | None = None,
+                    fastmath: bool | AbstractSet[str] = False, specialize_values: Sequence[str] = ()) -> Any:
     state.ensure_open()
     validate_specialization_limit(max_specializations)
     validate_fallback_warning(fallback_warning)
+    validate_tier_threshold(tier_threshold)
+    normalize_fastmath(fastmath)
+    validate_specialize_values(specialize_values)
     if fn is None:
         return lambda decorated: _jit_with_state(
             state, decorated, fallback=fallback, max_specializations=max_specializations,
-            fallback_warning=fallback_warning)
+            fallback_warning=fallback_warning, tier_threshold=tier_threshold, fastmath=fastmath,
+            specialize_values=specialize_values)
     try:
         tree = ASTVisitor()(fn)
     except CompileError as error:
@@ -437,48 +738,63 @@ def _jit_with_state(state, fn: Any = None, *, fallback: bool = False,
     tree.symbol = 'jit_' + hashlib.sha256(identity).hexdigest()[:16]
     tree.namespace = fn.__globals__
     tree.runtime_state = state
-    return _wrapper_for_tree(tree, fn, fallback, max_specializations, fallback_warning)
+    tree.shareable = True
+    return _wrapper_for_tree(tree, fn, fallback, max_specializations, fallback_warning, tier_threshold,
+                             fastmath, specialize_values)
 
 
 @overload
 def jit(fn: Callable[P, R], *, fallback: bool = False,
         max_specializations: int | None = DEFAULT_MAX_SPECIALIZATIONS,
-        fallback_warning: str = 'once') -> Callable[P, R]: ...
+        fallback_warning: str = 'once', tier_threshold: int | None = None,
+        fastmath: bool | AbstractSet[str] = False, specialize_values: Sequence[str] = ()) -> Callable[P, R]: ...
 
 
 @overload
 def jit(fn: None = None, *, fallback: bool = False,
-        max_specializations: int | None = DEFAULT_MAX_SPECIALIZATIONS, fallback_warning: str = 'once'
-        ) -> Callable[[Callable[P, R]], Callable[P, R]]: ...
+        max_specializations: int | None = DEFAULT_MAX_SPECIALIZATIONS, fallback_warning: str = 'once',
+        tier_threshold: int | None = None, fastmath: bool | AbstractSet[str] = False,
+        specialize_values: Sequence[str] = ()) -> Callable[[Callable[P, R]], Callable[P, R]]: ...
 
 
 @overload
 def jit(fn: str, *, fallback: bool = False,
         max_specializations: int | None = DEFAULT_MAX_SPECIALIZATIONS,
-        fallback_warning: str = 'once') -> Any: ...
+        fallback_warning: str = 'once', tier_threshold: int | None = None,
+        fastmath: bool | AbstractSet[str] = False, specialize_values: Sequence[str] = ()) -> Any: ...
 
 
 def jit(fn: Any = None, *, fallback: bool = False,
         max_specializations: int | None = DEFAULT_MAX_SPECIALIZATIONS,
-        fallback_warning: str = 'once') -> Any:
+        fallback_warning: str = 'once', tier_threshold: int | None = None,
+        fastmath: bool | AbstractSet[str] = False, specialize_values: Sequence[str] = ()) -> Any:
     return _jit_with_state(default_runtime, fn, fallback=fallback,
-                           max_specializations=max_specializations, fallback_warning=fallback_warning)
+                           max_specializations=max_specializations, fallback_warning=fallback_warning,
+                           tier_threshold=tier_threshold, fastmath=fastmath,
+                           specialize_values=specialize_values)
 
 
 def _jit_from_source_with_state(state, source, *, namespace=None,
-                                max_specializations=DEFAULT_MAX_SPECIALIZATIONS):
+                                max_specializations=DEFAULT_MAX_SPECIALIZATIONS, tier_threshold=None,
+                                fastmath=False, specialize_values=()):
     state.ensure_open()
     validate_specialization_limit(max_specializations)
+    validate_tier_threshold(tier_threshold)
+    normalize_fastmath(fastmath)
+    validate_specialize_values(specialize_values)
     tree = ASTVisitor()(source)
     tree.symbol = f'jit_source_{hashlib.sha256(source.encode()).hexdigest()[:16]}'
     tree.namespace = namespace if namespace is not None else {}
     tree.runtime_state = state
-    return _wrapper_for_tree(tree, max_specializations=max_specializations)
+    return _wrapper_for_tree(tree, max_specializations=max_specializations, tier_threshold=tier_threshold,
+                             fastmath=fastmath, specialize_values=specialize_values)
 
 
-def jit_from_source(source, *, namespace=None, max_specializations=DEFAULT_MAX_SPECIALIZATIONS):
+def jit_from_source(source, *, namespace=None, max_specializations=DEFAULT_MAX_SPECIALIZATIONS,
+                    tier_threshold=None, fastmath=False, specialize_values=()):
     return _jit_from_source_with_state(
-        default_runtime, source, namespace=namespace, max_specializations=max_specializations)
+        default_runtime, source, namespace=namespace, max_specializations=max_specializations,
+        tier_threshold=tier_threshold, fastmath=fastmath, specialize_values=specialize_values)
 
 
 setattr(jit, 'from_source', jit_from_source)
@@ -514,9 +830,10 @@ def runtime_stats(function=None):
             'compilation_units': len(units),
             'retained_modules': len(state.retained_modules),
             'closed': state.closed,
+            'target_fingerprint': state.target_fingerprint,
             'registered_callbacks': callback_count(),
             'registered_callback_calls': registered_callback_stats(),
-            'string_literals': literal_count(),
+            'registered_callback_cache': registered_cache_stats(),
             'string_callbacks': callback_stats(),
             'recent_failures': tuple(
                 MappingProxyType(dict(details))
@@ -558,40 +875,67 @@ def inspect_specializations(function):
 
 
 def get_llvm_ir(function, *sample_args, optimized=False):
+    """Regenerate diagnostic IR on demand; only the most recent texts are retained."""
     tree = getattr(function, '__pyjiting_tree__', None)
     if tree is None:
         raise TypeError('get_llvm_ir expects a @jit function')
     arg_types = [arg_pytype(arg) for arg in sample_args]
-    compile_specialization(tree, arg_types)
-    key = specialization_key(tree, arg_types)
+    values = specialized_values(tree, sample_args, arg_types)
+    compile_specialization(tree, arg_types, values)
+    key = specialization_key(tree, arg_types, values)
     state = getattr(tree, 'runtime_state', default_runtime)
     with state.cache_lock:
-        return state.specialization_ir[key][1 if optimized else 0]
+        texts = state.specialization_ir.get(key)
+        if texts is not None and optimized in texts:
+            state.specialization_ir.move_to_end(key)
+            return texts[optimized]
+        metrics = state.specialization_metrics[key]
+        generation, opt_level = metrics['generation'], metrics['opt_level']
+    _, module, _ = lower_specialization(tree, arg_types, generation, values)
+    text = str(module)
+    if optimized:
+        with state.engine_lock:
+            binding_module = llvm_binding().parse_assembly(text)
+            optimize_module(state, binding_module, opt_level)
+            text = str(binding_module)
+    with state.cache_lock:
+        state.specialization_ir.setdefault(key, {})[optimized] = text
+        state.specialization_ir.move_to_end(key)
+        while len(state.specialization_ir) > IR_CACHE_SIZE:
+            state.specialization_ir.popitem(last=False)
+    return text
 
 
 class JITContext:
     """Own an isolated MCJIT engine and its specialization resources."""
 
-    def __init__(self, *, max_specializations=None, max_modules=None):
+    def __init__(self, *, max_specializations=None, max_modules=None, cpu=None, features=None):
         self._state = RuntimeState(
-            max_specializations=max_specializations, max_modules=max_modules)
+            max_specializations=max_specializations, max_modules=max_modules,
+            cpu=cpu, features=features)
 
     def jit(self, fn=None, *, fallback: bool = False,
             max_specializations: int | None = DEFAULT_MAX_SPECIALIZATIONS,
-            fallback_warning: str = 'once'):
+            fallback_warning: str = 'once', tier_threshold: int | None = None,
+            fastmath: bool | AbstractSet[str] = False, specialize_values: Sequence[str] = ()):
         return _jit_with_state(self._state, fn, fallback=fallback,
                                max_specializations=max_specializations,
-                               fallback_warning=fallback_warning)
+                               fallback_warning=fallback_warning, tier_threshold=tier_threshold,
+                               fastmath=fastmath, specialize_values=specialize_values)
 
     def from_source(self, source, *, namespace=None,
-                    max_specializations=DEFAULT_MAX_SPECIALIZATIONS):
+                    max_specializations=DEFAULT_MAX_SPECIALIZATIONS, tier_threshold=None,
+                    fastmath=False, specialize_values=()):
         return _jit_from_source_with_state(
             self._state, source, namespace=namespace,
-            max_specializations=max_specializations)
+            max_specializations=max_specializations, tier_threshold=tier_threshold,
+            fastmath=fastmath, specialize_values=specialize_values)
 
-    def reg(self, fn):
+    def reg(self, fn=None, *, pure=False, cache_size=None, batch=False):
+        if fn is None:
+            return functools.partial(self.reg, pure=pure, cache_size=cache_size, batch=batch)
         self._state.ensure_open()
-        registered = register(fn)
+        registered = register(fn, pure=pure, cache_size=cache_size, batch=batch)
         self._state.registered_functions.append(registered)
         return registered
 
@@ -601,10 +945,14 @@ class JITContext:
                 'specializations': len(self._state.function_cache),
                 'retained_modules': len(self._state.retained_modules),
                 'closed': self._state.closed,
+                'target_cpu': self._state.target_cpu,
+                'target_features': self._state.target_features,
+                'target_fingerprint': self._state.target_fingerprint,
                 **self._state.runtime_counters,
             }
 
     def close(self):
+        wait_for_tier_ups(self._state)
         with self._state.cache_lock:
             if self._state.compilation_states:
                 raise RuntimeError('cannot close a JIT context while compilation is active')
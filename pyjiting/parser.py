@@ -8,6 +8,7 @@ from textwrap import dedent
 from . import ast as core
 from .errors import CompileError
 from .intrinsics import MATH_CONSTANTS, MATH_FUNCTIONS, STRING_METHODS
+from .string_runtime import string_hash
 from .types import (TupleType, bool_t, double64_t, float32_t, int32_t, int64_t,
                     str_t, void_t)
 
@@ -284,7 +285,10 @@ class ASTVisitor(ast.NodeVisitor):
             return core.CallFunc(core.Var(f'str.{node.func.attr}', source=node.func),
                                  [self.visit(node.func.value), *[self.visit(arg) for arg in node.args]], node)
         if not isinstance(node.func, ast.Name): raise CompileError('only calls to named functions are supported', node)
-        return core.CallFunc(core.Var(node.func.id, source=node.func),
+        name = node.func.id
+        if name not in self._local_names and self._constants.get(name, string_hash if name == 'string_hash' else None) is string_hash:
+            name = 'pyjiting.string_hash'
+        return core.CallFunc(core.Var(name, source=node.func),
                              [self.visit(arg) for arg in node.args], node)
 
     def visit_Attribute(self, node):
@@ -2,7 +2,9 @@ import ctypes
 import inspect
 import itertools
 import typing
+from typing import NamedTuple
 
+from .ll_types import llvm_binding
 from .types import FuncType, bool_t, double64_t, float32_t, int32_t, int64_t, str_t, void_t
 
 
@@ -10,6 +12,9 @@ _registered = {}
 _registered_names = {}
 _callbacks = {}
 _callback_invocations = {}
+_native_targets = {}
+_result_caches = {}
+_batched = set()
 _registration_ids = itertools.count(1)
 
 
@@ -23,7 +28,60 @@ def annotation_type(annotation):
     return mapping.get(annotation)
 
 
-def register(fn):
+# Only exact-width signed integers and IEEE floats share a C ABI with pyjiting's scalars.
+NATIVE_TYPES = {ctypes.c_int64: int64_t, ctypes.c_longlong: int64_t, ctypes.c_int32: int32_t,
+                ctypes.c_float: float32_t, ctypes.c_double: double64_t}
+
+
+# A result cache entry is a run of int64 words: a version (0 = empty, odd = being
+# written), the argument hash, one word per scalar key or ``2 + CACHE_KEY_BYTES // 8``
+# words per string key (length, kind, inline code units), and the result word.
+CACHE_KEY_BYTES = 64
+CACHE_HEADER_WORDS = 2
+DEFAULT_CACHE_SIZE = 1024
+# Arguments a batched call site buffers on the native stack before handing them to Python.
+BATCH_SIZE = 512
+
+
+class ResultCache(NamedTuple):
+    buffer: ctypes.Array
+    size: int
+    entry_words: int
+
+    @property
+    def address(self):
+        return ctypes.addressof(self.buffer)
+
+    def counters(self):
+        return {'hits': self.buffer[0], 'misses': self.buffer[1], 'size': self.size}
+
+
+def cache_key_offsets(args):
+    """Return the word offset of each key within an entry, and the result word offset."""
+    offsets, offset = [], 2
+    for ty in args:
+        offsets.append(offset)
+        offset += 2 + CACHE_KEY_BYTES // 8 if ty == str_t else 1
+    return offsets, offset
+
+
+class NativeTarget(NamedTuple):
+    address: int
+    # Set when the process symbol table resolves the name to the same address, so the
+    # call can be emitted against a declaration LLVM recognizes (e.g. libm's ``erf``).
+    symbol: str | None
+
+
+def register(fn, *, pure=False, cache_size=None, batch=False):
+    if cache_size is not None and not pure: raise ValueError('cache_size requires pure=True')
+    if pure and batch: raise ValueError('pure and batch cannot be combined')
+    if pure:
+        if cache_size is None: cache_size = DEFAULT_CACHE_SIZE
+        if not isinstance(cache_size, int) or isinstance(cache_size, bool) or cache_size < 1:
+            raise ValueError('cache_size must be a positive integer')
+    if isinstance(fn, ctypes._CFuncPtr):
+        if pure or batch: raise ValueError('native functions are called directly and are not cached or batched')
+        return register_native(fn)
     hints, signature = typing.get_type_hints(fn), inspect.signature(fn)
     args = []
     for parameter in signature.parameters.values():
@@ -33,12 +91,48 @@ def register(fn):
         args.append(ty)
     return_ty = annotation_type(hints.get('return'))
     if return_ty is None: raise TypeError(f'@reg function {fn.__name__} needs a supported return annotation')
+    if pure and return_ty in (str_t, void_t):
+        raise TypeError(f'pure @reg function {fn.__name__} must return a scalar to be cached')
+    if batch and return_ty != void_t:
+        raise TypeError(f'batched @reg function {fn.__name__} must return None')
+    if batch and str_t in args:
+        raise TypeError(f'batched @reg function {fn.__name__} accepts only scalar arguments')
+    identifier = _record(fn, FuncType(args=args, return_type=return_ty))
+    if batch: _batched.add(identifier)
+    if pure:
+        # Direct-mapped slots are selected by masking the hash, so the size is a power of two.
+        size = 1 << (cache_size - 1).bit_length()
+        entry_words = cache_key_offsets(args)[1] + 1
+        buffer = (ctypes.c_int64 * (CACHE_HEADER_WORDS + size * entry_words))()
+        _result_caches[identifier] = ResultCache(buffer, size, entry_words)
+    return fn
+
+
+def register_native(fn):
+    """Register a ctypes foreign function that jitted code calls directly, without a Python bridge."""
+    # Pointers cast with ``CFUNCTYPE(...)(address)`` (e.g. from cffi) have no name and are called by address.
+    name = getattr(fn, '__name__', None); label = name or 'function pointer'
+    if fn.argtypes is None: raise TypeError(f'native {label} needs argtypes')
+    args = []
+    for index, argtype in enumerate(fn.argtypes):
+        ty = NATIVE_TYPES.get(argtype)
+        if ty is None: raise TypeError(f'native {label} has unsupported argument {index} type {argtype.__name__}')
+        args.append(ty)
+    return_ty = void_t if fn.restype is None else NATIVE_TYPES.get(fn.restype)
+    if return_ty is None: raise TypeError(f'native {label} has unsupported return type {fn.restype.__name__}')
+    address = ctypes.cast(fn, ctypes.c_void_p).value
+    symbol = name if name and llvm_binding().address_of_symbol(name) == address else None
+    _native_targets[_record(fn, FuncType(args=args, return_type=return_ty))] = NativeTarget(address, symbol)
+    return fn
+
+
+def _record(fn, signature):
     registration_id = next(_registration_ids)
-    registered = (fn, FuncType(args=args, return_type=return_ty))
-    _registered[registration_id] = registered
-    _registered_names.setdefault(fn.__name__, []).append(registration_id)
+    _registered[registration_id] = (fn, signature)
+    name = getattr(fn, '__name__', None)
+    if name is not None: _registered_names.setdefault(name, []).append(registration_id)
     fn.__pyjiting_registered_id__ = registration_id
-    return fn
+    return registration_id
 
 
 def unregister(fn):
@@ -48,13 +142,16 @@ def unregister(fn):
     registered = _registered.pop(identifier, None)
     if registered is None:
         return False
-    name = registered[0].__name__
+    name = getattr(registered[0], '__name__', None)
     ids = _registered_names.get(name, [])
     if identifier in ids:
         ids.remove(identifier)
     if not ids:
         _registered_names.pop(name, None)
     _callbacks.pop(identifier, None)
+    _native_targets.pop(identifier, None)
+    _result_caches.pop(identifier, None)
+    _batched.discard(identifier)
     _callback_invocations.pop(identifier, None)
     try:
         del fn.__pyjiting_registered_id__
@@ -79,6 +176,29 @@ def get(identifier):
     return _registered.get(ids[0]) if len(ids) == 1 else None
 
 
+def native_target(identifier):
+    """Return the ``NativeTarget`` of a native registration, or None for Python callbacks."""
+    if not isinstance(identifier, int):
+        ids = _registered_names.get(identifier, ())
+        identifier = ids[0] if len(ids) == 1 else None
+    return _native_targets.get(identifier)
+
+
+def result_cache(identifier):
+    """Return the ``ResultCache`` of a pure registration, or None when calls are not cached."""
+    if not isinstance(identifier, int):
+        ids = _registered_names.get(identifier, ())
+        identifier = ids[0] if len(ids) == 1 else None
+    return _result_caches.get(identifier)
+
+
+def is_batched(identifier):
+    if not isinstance(identifier, int):
+        ids = _registered_names.get(identifier, ())
+        identifier = ids[0] if len(ids) == 1 else None
+    return identifier in _batched
+
+
 def registration_id(fn):
     return getattr(fn, '__pyjiting_registered_id__', None)
 
@@ -101,3 +221,12 @@ def callback_stats():
         'total': sum(_callback_invocations.values()),
         'by_registration': dict(_callback_invocations),
     }
+
+
+def cache_stats():
+    by_registration = {identifier: cache.counters() for identifier, cache in _result_caches.items()}
+    return {
+        'hits': sum(counters['hits'] for counters in by_registration.values()),
+        'misses': sum(counters['misses'] for counters in by_registration.values()),
+        'by_registration': by_registration,
+    }
@@ -1,4 +1,6 @@
 import ctypes
+import re
+import sys
 import threading
 
 
@@ -6,19 +8,31 @@ class StringDescriptor(ctypes.Structure):
     pass
 
 
+# ``kind`` is the code unit width in bytes (1 = latin-1, 2 = UCS-2, 4 = UCS-4),
+# mirroring CPython's PEP 393 string kinds.
 StringDescriptor._fields_ = [
-    ('data', ctypes.POINTER(ctypes.c_uint32)),
+    ('data', ctypes.POINTER(ctypes.c_uint8)),
     ('length', ctypes.c_int64),
+    ('kind', ctypes.c_int64),
+    ('owner', ctypes.c_void_p),
 ]
 StringPointer = ctypes.POINTER(StringDescriptor)
+
+
+class StringListDescriptor(ctypes.Structure):
+    _fields_ = [('items', StringPointer), ('length', ctypes.c_int64)]
+
+
+StringListPointer = ctypes.POINTER(StringListDescriptor)
 ErrorPointer = ctypes.POINTER(ctypes.c_int32)
 ERROR_PYTHON_CALLBACK = 11
 
 _state = threading.local()
 _callbacks = {}
-_literals = {}
 _allocator = None
 _callback_counts = {}
+_codecs = {1: 'latin-1', 2: f'utf-16-{sys.byteorder[0]}e', 4: f'utf-32-{sys.byteorder[0]}e'}
+_surrogates = re.compile('[\ud800-\udfff]')
 
 
 def begin_call():
@@ -87,57 +101,80 @@ def allocation_address():
     return ctypes.cast(_allocator, ctypes.c_void_p).value
 
 
+def string_kind(value):
+    return encode_string(value)[0]
+
+
+def encode_string(value):
+    """Return ``(kind, code units)`` using C-level codecs rather than scanning characters."""
+    if value.isascii(): return 1, value.encode('latin-1')
+    try: return 1, value.encode('latin-1')
+    except UnicodeEncodeError: pass
+    # Lone surrogates cannot round-trip through UTF-16, so they force UCS-4.
+    if not _surrogates.search(value):
+        encoded = value.encode(_codecs[2])
+        if len(encoded) == 2 * len(value): return 2, encoded
+    return 4, value.encode(_codecs[4], 'surrogatepass')
+
+
+def _descriptor(value):
+    kind, encoded = encode_string(value)
+    buffer = ctypes.create_string_buffer(encoded, max(1, len(encoded)))
+    descriptor = StringDescriptor(ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8)), len(value), kind, None)
+    return buffer, descriptor, ctypes.pointer(descriptor)
+
+
 def make_string(value):
-    codepoints = [ord(char) for char in value]
-    buffer = (ctypes.c_uint32 * max(1, len(codepoints)))(*codepoints)
-    descriptor = StringDescriptor(ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint32)), len(codepoints))
-    pointer = ctypes.pointer(descriptor)
+    buffer, descriptor, pointer = _descriptor(value)
     _arena().append((buffer, descriptor, pointer))
     return pointer
 
 
-def literal_address(value):
-    cached = _literals.get(value)
-    if cached is None:
-        codepoints = [ord(char) for char in value]
-        buffer = (ctypes.c_uint32 * max(1, len(codepoints)))(*codepoints)
-        descriptor = StringDescriptor(ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint32)), len(codepoints))
-        pointer = ctypes.pointer(descriptor)
-        cached = _literals[value] = (buffer, descriptor, pointer)
-    return ctypes.cast(cached[2], ctypes.c_void_p).value
-
-
 def to_python(pointer):
     if not pointer:
         return ''
+    return _decode(pointer.contents)
+
+
+def list_to_python(pointer):
+    if not pointer:
+        return []
     value = pointer.contents
-    return ''.join(chr(value.data[index]) for index in range(value.length))
+    return [_decode(value.items[index]) for index in range(value.length)]
 
 
-def _binary_string(fn):
-    callback_type = ctypes.CFUNCTYPE(ctypes.c_void_p, StringPointer, StringPointer, ErrorPointer)
+def _decode(value):
+    if not value.length:
+        return ''
+    return ctypes.string_at(value.data, value.length * value.kind).decode(_codecs[value.kind], 'surrogatepass')
 
-    @callback_type
-    def callback(left, right, error):
-        try:
-            return ctypes.cast(make_string(fn(to_python(left), to_python(right))), ctypes.c_void_p).value
-        except BaseException as exception:
-            _callback_failed(error, exception)
-            return None
-    return callback
 
+# wyhash's secret constants; the hash mixes four code points per 64x64->128-bit multiply.
+HASH_SECRETS = (0xa0761d6478bd642f, 0xe7037ed1a0b428db, 0x8ebc6af09c88c6e3, 0x589965cc75374cc3)
+_MASK64 = (1 << 64) - 1
 
-def _query(fn):
-    callback_type = ctypes.CFUNCTYPE(ctypes.c_int64, StringPointer, StringPointer, ErrorPointer)
 
-    @callback_type
-    def callback(left, right, error):
-        try:
-            return int(fn(to_python(left), to_python(right)))
-        except BaseException as exception:
-            _callback_failed(error, exception)
-            return 0
-    return callback
+def _hash_mix(left, right):
+    product = left * right
+    return (product ^ (product >> 64)) & _MASK64
+
+
+def string_hash(value):
+    """Return the stable 64-bit hash that jitted code computes natively for ``value``.
+
+    Unlike ``hash(str)`` it is not randomized per process, and it depends only on the
+    code points, never on whether a string is stored as latin-1, UCS-2 or UCS-4.
+    """
+    if not isinstance(value, str):
+        raise TypeError(f'string_hash() expects a str, got {type(value).__name__}')
+    codepoints = [*map(ord, value), 0, 0, 0]
+    state = HASH_SECRETS[0] ^ (len(value) * HASH_SECRETS[1] & _MASK64)
+    for index in range(0, len(value), 4):
+        low = codepoints[index] | codepoints[index + 1] << 32
+        high = codepoints[index + 2] | codepoints[index + 3] << 32
+        state = _hash_mix(low ^ HASH_SECRETS[1], high ^ state)
+    result = _hash_mix(state ^ HASH_SECRETS[2], len(value) ^ HASH_SECRETS[3])
+    return result - (1 << 64) if result >> 63 else result
 
 
 def _unary_string(fn):
@@ -268,19 +305,44 @@ def _chr():
     return callback
 
 
+def _int64(value):
+    if not -2 ** 63 <= value < 2 ** 63:
+        raise OverflowError('int too large to convert to int64')
+    return value
+
+
+def _parse(fn, restype):
+    callback_type = ctypes.CFUNCTYPE(restype, StringPointer, ErrorPointer)
+
+    @callback_type
+    def callback(value, error):
+        try:
+            return fn(to_python(value))
+        except BaseException as exception:
+            _callback_failed(error, exception)
+            return 0
+    return callback
+
+
+def _float_to_int():
+    callback_type = ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_double, ErrorPointer)
+
+    @callback_type
+    def callback(value, error):
+        try:
+            return _int64(int(value))
+        except BaseException as exception:
+            _callback_failed(error, exception)
+            return 0
+    return callback
+
+
 def callback_address(name):
     if not _callbacks:
         _callbacks.update({
-            'concat': _binary_string(lambda left, right: left + right),
             'repeat': _repeat(),
             'index': _index(),
             'slice': _slice(),
-            'compare': _query(lambda left, right: (left > right) - (left < right)),
-            'startswith': _query(str.startswith),
-            'endswith': _query(str.endswith),
-            'find': _query(str.find),
-            'count': _query(str.count),
-            'contains': _query(lambda needle, value: needle in value),
             'upper': _unary_string(str.upper),
             'lower': _unary_string(str.lower),
             'strip': _unary_string(str.strip),
@@ -293,6 +355,9 @@ def callback_address(name):
             'isspace': _unary_query(str.isspace),
             'ord': _ord(),
             'chr': _chr(),
+            'int': _parse(lambda text: _int64(int(text)), ctypes.c_int64),
+            'float': _parse(float, ctypes.c_double),
+            'float_to_int': _float_to_int(),
         })
     callback = _callbacks[name]
     counted = _callbacks.get(f'counted:{name}')
@@ -307,9 +372,5 @@ def callback_address(name):
     return ctypes.cast(_callbacks[f'counted:{name}'], ctypes.c_void_p).value
 
 
-def literal_count():
-    return len(_literals)
-
-
 def callback_stats():
     return dict(_callback_counts)
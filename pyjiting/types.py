@@ -90,17 +90,20 @@ void_t = BaseType('Void')
 array_t = BaseType('Array')
 shape_t = BaseType('Shape')
 str_t = BaseType('String')
+list_t = BaseType('List')
 
 ptr_t = PointerType
 
 
 def make_array_type(t): return GenericType(array_t, t)
+def make_list_type(t): return GenericType(list_t, t)
 
 
 int32_array_t = make_array_type(int32_t)
 int64_array_t = make_array_type(int64_t)
 double64_array_t = make_array_type(double64_t)
 float32_array_t = make_array_type(float32_t)
+str_list_t = make_list_type(str_t)
 
 
 def ftv(x) -> set:
@@ -126,6 +129,10 @@ def is_tuple(ty):
     return isinstance(ty, TupleType)
 
 
+def is_list(ty):
+    return isinstance(ty, GenericType) and ty.a == list_t
+
+
 def contains_array(ty):
     """Return whether a type contains an ndarray at any structural depth."""
     return is_array(ty) or (is_tuple(ty) and any(contains_array(element) for element in ty.elements))
@@ -153,7 +160,7 @@ def is_string(ty):
 
 
 def is_truthy_type(ty):
-    return is_numeric(ty) or is_string(ty) or is_tuple(ty)
+    return is_numeric(ty) or is_string(ty) or is_tuple(ty) or is_list(ty)
 
 
 def promote_numeric(left, right):
@@ -0,0 +1,77 @@
+"""Two-level Unicode property tables for native case mapping and classification.
+
+The tables are generated on first use from the running interpreter's own ``str``
+methods, so generated code agrees with CPython's Unicode database version. Each code
+point maps to a record of ``(flags, upper delta, lower delta)``: ``stage1`` selects a
+128-entry block by ``codepoint >> SHIFT`` and ``stage2`` holds the record index of each
+code point in the deduplicated blocks.
+"""
+
+import functools
+from typing import NamedTuple
+
+import numpy as np
+
+SHIFT = 7
+MAX_CODEPOINT = 0x110000
+
+ALPHA = 1
+ALNUM = 2
+DIGIT = 4
+SPACE = 8
+# Set when the full case mapping is not a single code point ('ß'.upper() == 'SS') or
+# depends on context (final sigma), so the whole string is mapped by Python instead.
+SPECIAL = 16
+
+PREDICATE_FLAGS = {'isalpha': ALPHA, 'isalnum': ALNUM, 'isdigit': DIGIT, 'isspace': SPACE}
+CONTEXTUAL_LOWER = (0x3A3,)
+# Planes 4-13 hold no assigned characters, so only the rest of the code space is scanned.
+ASSIGNED_RANGES = ((0, 0x40000), (0xE0000, MAX_CODEPOINT))
+
+
+class UnicodeTables(NamedTuple):
+    stage1: bytes
+    stage2: bytes
+    latin1: bytes
+    flags: bytes
+    upper: tuple[int, ...]
+    lower: tuple[int, ...]
+
+
+@functools.cache
+def unicode_tables():
+    flags = np.zeros(MAX_CODEPOINT, np.int64)
+    deltas = {'upper': np.zeros(MAX_CODEPOINT, np.int64), 'lower': np.zeros(MAX_CODEPOINT, np.int64)}
+    size = 1 << SHIFT
+    for first, last in ASSIGNED_RANGES:
+        chars = ''.join(map(chr, range(first, last)))
+        for bit, method in ((ALPHA, str.isalpha), (ALNUM, str.isalnum), (DIGIT, str.isdigit), (SPACE, str.isspace)):
+            flags[first:last] |= np.frombuffer(bytes(map(method, chars)), np.uint8) * bit
+        for start in range(0, last - first, size):
+            block = chars[start:start + size]
+            for name, delta in deltas.items():
+                method = getattr(str, name)
+                if method(block) == block: continue
+                for offset, char in enumerate(block, first + start):
+                    mapped = method(char)
+                    if len(mapped) == 1: delta[offset] = ord(mapped) - offset
+                    else: flags[offset] |= SPECIAL
+    flags[list(CONTEXTUAL_LOWER)] |= SPECIAL
+    # Deltas lie within +-2**21 and flags within a byte, so one int64 identifies a record.
+    keys = (flags << 48) | ((deltas['upper'] & 0xFFFFFF) << 24) | (deltas['lower'] & 0xFFFFFF)
+    # Deduplicating blocks first leaves only a few thousand keys to sort into records.
+    seen = {}
+    stage1 = np.array([seen.setdefault(row.tobytes(), len(seen)) for row in keys.reshape(-1, size)])
+    blocks = np.frombuffer(b''.join(seen), np.int64)
+    unique, stage2 = np.unique(blocks, return_inverse=True)
+    stage2 = stage2.reshape(-1)
+    if len(unique) > 256 or len(seen) > 256:
+        raise RuntimeError('Unicode property tables no longer fit in byte-sized indices')
+    latin1 = stage2.reshape(len(seen), size)[stage1[:256 // size]]
+
+    def signed(values):
+        return tuple(int(value) - (1 << 24) if value & (1 << 23) else int(value) for value in values)
+    return UnicodeTables(
+        stage1=stage1.astype(np.uint8).tobytes(), stage2=stage2.astype(np.uint8).tobytes(),
+        latin1=latin1.astype(np.uint8).tobytes(), flags=(unique >> 48).astype(np.uint8).tobytes(),
+        upper=signed((unique >> 24) & 0xFFFFFF), lower=signed(unique & 0xFFFFFF))
@@ -1,7 +1,8 @@
 import numpy as np
 import pytest
 
-from pyjiting import jit
+from pyjiting import jit, runtime_stats
+from pyjiting.errors import InferError
 
 
 @jit
@@ -74,3 +75,34 @@ def test_byte_strides_and_unaligned_views_match_numpy():
     unaligned[:] = [123, 456]
     assert not unaligned.flags.aligned
     assert read_2d(unaligned.reshape(1, 2), 0, 1) == 456
+
+
+def test_unicode_arrays_are_viewed_in_place_without_string_callbacks():
+    @jit
+    def count_long(labels, width):
+        total = 0
+        for label in labels:
+            if len(label) >= width:
+                total += 1
+        return total
+
+    @jit
+    def pick(labels, row, col):
+        return labels[row, col]
+
+    @jit
+    def overwrite(labels, value):
+        labels[0] = value
+        return 0
+
+    labels = np.array(['apple', 'kiwi', '', 'ban\0ana', '你好🙂'])
+    grid = np.array([['ab', 'c'], ['d', 'efg']])
+    before = sum(runtime_stats()['string_callbacks'].values())
+    assert count_long(labels, 5) == 2
+    assert count_long(labels[::-2], 5) == 1
+    assert [pick(grid, row, col) for row in range(2) for col in range(2)] == ['ab', 'c', 'd', 'efg']
+    assert sum(runtime_stats()['string_callbacks'].values()) == before
+    with pytest.raises(InferError, match='read-only'):
+        overwrite(labels, 'pear')
+    with pytest.raises(TypeError):
+        count_long(labels.astype('>U8'), 1)
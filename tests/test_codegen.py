@@ -1,3 +1,4 @@
+from pyjiting.string_runtime import allocation_address
 from pyjiting.types import double64_t, int64_t, make_array_type, str_t
 from conftest import verified_module
 
@@ -30,7 +31,7 @@ def test_generated_array_module_verifies_for_strided_multidimensional_access():
     assert 'align 1' in ir_text
 
 
-def test_string_index_and_iteration_load_utf32_codepoints_in_native_ir():
+def test_string_index_and_iteration_address_code_units_by_string_kind():
     module = verified_module('''
         def first(value):
             for character in value:
@@ -39,5 +40,26 @@ def test_string_index_and_iteration_load_utf32_codepoints_in_native_ir():
     ''', [str_t])
 
     ir_text = str(module)
-    assert 'getelementptr i32, i32*' in ir_text
+    assert '%"pyjiting.string" = type {i8*, i64, i64, i8*}' in ir_text
+    assert 'getelementptr i8, i8*' in ir_text
     assert 'foreach_body' in ir_text
+
+
+def test_non_escaping_string_views_use_stack_descriptors():
+    borrowed = verified_module('''
+        def runs(value):
+            previous = ''
+            total = 0
+            for character in value:
+                if character == previous and value[1:] != '':
+                    total += 1
+                previous = character
+            return total
+    ''', [str_t])
+    escaping = verified_module('''
+        def tail(value):
+            return value[1:]
+    ''', [str_t])
+
+    assert str(allocation_address()) not in str(borrowed)
+    assert str(allocation_address()) in str(escaping)
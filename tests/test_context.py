@@ -1,3 +1,5 @@
+import llvmlite.binding as llvm
+import numpy as np
 import pytest
 
 from pyjiting import JITContext, runtime_stats
@@ -75,3 +77,35 @@ def test_context_unregisters_owned_callbacks_when_closed():
     context.close()
     assert get_registered(identifier) is None
     assert registration_id(callback) is None
+
+
+def test_context_target_cpu_selection_is_fingerprinted():
+    generic = JITContext(cpu='generic')
+    host = JITContext(cpu='host')
+    # An explicit CPU with one of its own features works on any host architecture.
+    feature = '+' + min(name for name, enabled in llvm.get_host_cpu_features().items() if enabled)
+    explicit = JITContext(cpu=llvm.get_host_cpu_name(), features=feature)
+
+    for context in (generic, host, explicit):
+        @context.jit
+        def scale(values):
+            total = 0.0
+            for value in values:
+                total += value * 2.0
+            return total
+
+        assert scale(np.arange(16, dtype=np.float64)) == 240.0
+        assert runtime_stats(scale)['signatures'][0]['target'] == context.stats()['target_fingerprint']
+    assert generic.stats()['target_cpu'] == 'generic'
+    assert explicit.stats()['target_features'] == feature
+    assert host.stats()['target_features']
+    fingerprints = {context.stats()['target_fingerprint'] for context in (generic, host, explicit)}
+    assert len(fingerprints) == 3
+    for context in (generic, host, explicit):
+        context.close()
+
+
+@pytest.mark.parametrize(('cpu', 'features'), [('', None), (3, None), ('host', ['+avx2'])])
+def test_context_target_options_are_validated(cpu, features):
+    with pytest.raises(ValueError):
+        JITContext(cpu=cpu, features=features)
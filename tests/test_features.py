@@ -6,9 +6,10 @@ import pytest
 from pyjiting import jit, reg
 from pyjiting.errors import CompileError, InferError
 from pyjiting.ll_types import mangler
-from pyjiting.main import arg_pytype
+from pyjiting.main import _dispatch_types, arg_pytype
 from pyjiting.parser import ASTVisitor
-from pyjiting.types import GenericType, int64_t
+from pyjiting.types import (GenericType, TupleType, bool_t, double64_t, float32_t, int32_t, int64_t,
+                            make_array_type)
 
 
 @jit
@@ -181,6 +182,30 @@ def test_annotations_callbacks_and_mangler():
     assert array_type.b == int64_t
 
 
+def test_argument_classification_is_memoized_by_python_type_and_dtype():
+    class Flag(int):
+        pass
+
+    values = (np.zeros(2, dtype=np.float32), np.float32(1), 2.5, True)
+    first = [arg_pytype(value) for value in values]
+    assert first == [make_array_type(float32_t), float32_t, double64_t, bool_t]
+    assert [arg_pytype(value) for value in values] == first
+    assert (np.ndarray, np.dtype(np.float32)) in _dispatch_types
+    assert _dispatch_types[float] == double64_t
+    assert arg_pytype(np.zeros(2, dtype=np.int32)).b == int32_t
+    assert arg_pytype((1, np.float32(2))) == TupleType([int64_t, float32_t])
+    assert arg_pytype(Flag(3)) == int64_t
+    assert Flag not in _dispatch_types and int not in _dispatch_types
+    mapped = np.zeros(2).view(np.memmap)
+    cached = arg_pytype(mapped)
+    assert _dispatch_types[(np.memmap, mapped.dtype)] is cached
+    assert arg_pytype(mapped) is cached
+    with pytest.raises(TypeError, match='Unsupported type: int'):
+        arg_pytype(1 << 70)
+    with pytest.raises(TypeError, match='Unsupported ndarray dtype'):
+        arg_pytype(np.zeros(2, dtype=np.complex128))
+
+
 def test_parser_reports_unsupported_constant_and_location():
     with pytest.raises(CompileError, match='line'):
         ASTVisitor()('def unsupported():\n    return [1]')
@@ -1,9 +1,11 @@
+import itertools
 import math
+import sys
 
 import numpy as np
 import pytest
 
-from pyjiting import jit
+from pyjiting import get_llvm_ir, jit, runtime_stats
 from pyjiting.errors import CompileError, InferError
 from tests.conftest import verified_module
 from pyjiting.types import double64_t
@@ -126,6 +128,75 @@ def test_math_errors_match_python_and_propagate_between_jit_functions():
         root_and_exp(1000.0)
 
 
+MATH_SAMPLES = (0.0, -0.0, 0.5, -0.5, 1.0, -1.0, 2.5, -2.5, 1e300, 710.0, float('inf'), float('-inf'), float('nan'))
+
+
+def math_outcome(function, *args):
+    try:
+        result = function(*args)
+    except (ValueError, OverflowError) as exception:
+        return type(exception)
+    return ('nan',) if isinstance(result, float) and math.isnan(result) else (type(result), pytest.approx(result, rel=1e-15))
+
+
+@pytest.mark.parametrize('name', ['tan', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh', 'asinh', 'acosh', 'atanh',
+                                  'cbrt', 'exp2', 'expm1', 'log1p', 'erf', 'erfc', 'fabs', 'floor', 'ceil', 'trunc',
+                                  'atan2', 'pow', 'hypot', 'copysign'])
+def test_expanded_math_library_matches_python_values_and_errors(name):
+    arity = 2 if name in ('atan2', 'pow', 'hypot', 'copysign') else 1
+    names = ', '.join('xy'[:arity])
+    compiled = jit.from_source(f'import math\ndef apply({names}):\n    return math.{name}({names})\n',
+                               namespace={'math': math})
+    for args in itertools.product(MATH_SAMPLES, repeat=arity):
+        if name in ('floor', 'ceil', 'trunc') and args == (1e300,):
+            continue  # integer results are limited to int64
+        assert math_outcome(compiled, *args) == math_outcome(getattr(math, name), *args), args
+    if name == 'floor':
+        assert compiled(2 ** 62 + 1) == 2 ** 62 + 1
+
+
+def test_total_math_functions_emit_no_error_guards():
+    @jit
+    def total(x, y):
+        return math.atan2(x, y) + math.copysign(math.fabs(x), y) + math.erf(x) + math.tanh(y)
+
+    assert total(2.0, -3.0) == pytest.approx(math.atan2(2.0, -3.0) - 2.0 + math.erf(2.0) + math.tanh(-3.0))
+    assert 'runtime_error' not in get_llvm_ir(total, 2.0, -3.0)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 13), reason='math.fma requires Python 3.13')
+def test_fma_matches_python_values_and_errors():
+    @jit
+    def blend(x, y, z):
+        return math.fma(x, y, z)  # pyright: ignore[reportAttributeAccessIssue]
+
+    assert blend(2.0, 3.0, -1.0) == 5.0
+    with pytest.raises(ValueError, match='math domain error'):
+        blend(float('inf'), 0.0, 1.0)
+    with pytest.raises(OverflowError, match='math range error'):
+        blend(1e300, 1e300, 0.0)
+
+
+def test_float32_math_stays_single_precision_and_keeps_domain_checks():
+    @jit
+    def transform(values, out):
+        for index in range(len(values)):
+            out[index] = math.sqrt(values[index]) * math.exp(values[index]) + math.cos(values[index])
+        return math.sin(values[0])
+
+    values = np.linspace(0, 4, 64, dtype=np.float32)
+    out = np.empty_like(values)
+    assert transform(values, out) == 0.0
+    np.testing.assert_allclose(out, np.sqrt(values) * np.exp(values) + np.cos(values), rtol=1e-6)
+    ir = get_llvm_ir(transform, values, out)
+    assert 'llvm.exp.f32' in ir and 'llvm.sqrt.f32' in ir and 'fpext' not in ir
+    with pytest.raises(ValueError, match='math domain error'):
+        transform(np.array([-1.0], np.float32), np.empty(1, np.float32))
+    # The range check applies to the float32 result: exp(100) does not fit in float32.
+    with pytest.raises(OverflowError, match='math range error'):
+        transform(np.array([100.0], np.float32), np.empty(1, np.float32))
+
+
 @pytest.mark.parametrize('dtype', [np.int32, np.int64, np.float32, np.float64])
 def test_array_sum_supports_dtypes_empty_arrays_and_negative_strides(dtype):
     values = np.arange(8, dtype=dtype)[::-2]
@@ -178,3 +249,41 @@ def test_math_intrinsics_verify_from_source_and_large_constants_are_rejected():
         @jit
         def too_large():
             return 1267650600228229401496703205376
+
+
+@jit(fastmath=True)
+def fast_accumulate(values):
+    total = 0.0
+    for value in values:
+        total += value * value
+    return total + sum(values)
+
+
+@jit(fastmath={'reassoc'})
+def fast_nan_check(left, right):
+    return math.isnan(left + right)
+
+
+def test_fastmath_reassociates_float_reductions_and_keeps_results_close():
+    values = np.linspace(-3.0, 7.0, 1001)
+    expected = float(np.sum(values * values) + np.sum(values))
+    assert fast_accumulate(values) == pytest.approx(expected)
+    assert fast_accumulate(values[::-4]) == pytest.approx(
+        float(np.sum(values[::-4] ** 2) + np.sum(values[::-4])))
+    optimized = get_llvm_ir(fast_accumulate, values, optimized=True)
+    assert 'fadd reassoc' in optimized
+    assert 'x double>' in optimized
+    assert 'reassoc' not in get_llvm_ir(array_sum_builtin, values)
+    assert runtime_stats(fast_accumulate)['signatures'][0]['fastmath'] == (
+        'afn', 'arcp', 'contract', 'nsz', 'reassoc')
+
+
+def test_fastmath_default_flags_preserve_nan_semantics():
+    assert fast_nan_check(float('nan'), 1.0) == 1
+    assert fast_nan_check(1.0, 2.0) == 0
+
+
+@pytest.mark.parametrize('flags', ['fast', {'turbo'}, 3])
+def test_fastmath_flags_are_validated(flags):
+    with pytest.raises(ValueError, match='fast-math'):
+        jit(lambda value: value, fastmath=flags)
@@ -7,6 +7,8 @@ import pytest
 from pyjiting import (clear_cache, get_llvm_ir, inspect_specializations, jit,
                        runtime_stats)
 from pyjiting.errors import CompileError
+from pyjiting.main import IR_CACHE_SIZE, default_runtime, specialization_key
+from pyjiting.types import int64_t
 
 
 def test_keyword_and_default_arguments_share_one_specialization():
@@ -75,3 +77,24 @@ def test_specialization_inspection_and_ir_query():
     assert 'define' in optimized
     assert len(entries) == 1
     assert entries[0]['native_symbol'] in unoptimized
+
+
+def test_llvm_ir_is_regenerated_on_demand_and_retained_in_a_bounded_cache():
+    @jit
+    def shift(value):
+        return value + 1
+
+    clear_cache(shift)
+    assert shift(1) == 2
+    key = specialization_key(shift.__pyjiting_tree__, [int64_t])
+    assert key not in default_runtime.specialization_ir
+    text = get_llvm_ir(shift, 1)
+    assert get_llvm_ir(shift, 1) is text
+    assert runtime_stats(shift)['specializations'] == 1
+
+    for offset in range(IR_CACHE_SIZE):
+        other = jit.from_source(f'def other(value):\n    return value + {offset}')
+        get_llvm_ir(other, 1, optimized=True)
+    assert key not in default_runtime.specialization_ir
+    assert len(default_runtime.specialization_ir) <= IR_CACHE_SIZE
+    assert get_llvm_ir(shift, 1) == text
@@ -1,9 +1,13 @@
+import ctypes
+import ctypes.util
 import gc
+import math
 
 import numpy as np
 import pytest
 
-from pyjiting import jit, reg, runtime_stats
+from pyjiting import get_llvm_ir, jit, reg, runtime_stats
+from pyjiting.registry import unregister
 
 
 @reg
@@ -73,3 +77,148 @@ def test_same_named_registered_callbacks_are_bound_by_identity():
 
     assert first(1) == 11
     assert second(1) == 21
+
+
+def test_native_registrations_are_called_directly_without_python_bridges():
+    erf = ctypes.CDLL(ctypes.util.find_library('m')).erf
+    erf.argtypes, erf.restype = [ctypes.c_double], ctypes.c_double
+    twice = ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_int64)(lambda value: value * 2)
+    reg(erf); reg(twice)
+
+    @jit
+    def total(count):
+        result = 0.0
+        for index in range(count):
+            result += erf(index * 0.25)
+        return result + twice(count)
+
+    before = runtime_stats()
+    try:
+        assert total(8) == pytest.approx(sum(math.erf(index * 0.25) for index in range(8)) + 16)
+        assert 'declare double @"erf"(double' in get_llvm_ir(total, 8)
+        after = runtime_stats()
+        assert after['registered_callbacks'] == before['registered_callbacks']
+        assert after['registered_callback_calls']['total'] == before['registered_callback_calls']['total']
+    finally:
+        unregister(erf); unregister(twice)
+
+    with pytest.raises(TypeError, match='unsupported return type c_char_p'):
+        strerror = ctypes.CDLL(None).strerror
+        strerror.argtypes, strerror.restype = [ctypes.c_int32], ctypes.c_char_p
+        reg(strerror)
+
+
+def test_pure_callbacks_are_memoized_by_a_native_result_cache():
+    weights = {'a': 1.5, 'bb': 2.0, 'dé': 4.0}
+    calls = []
+
+    @reg(pure=True, cache_size=1000)
+    def weight(category: str, scale: int) -> float:
+        calls.append(category)
+        if category == 'bad':
+            raise CallbackFailure(category)
+        return weights.get(category, 0.0) * scale
+
+    @jit
+    def total(text, count):
+        parts = text.split(',')
+        result = 0.0
+        for index in range(count):
+            result += weight(parts[index % len(parts)], index % 3)
+        return result
+
+    before = runtime_stats()['registered_callback_cache']
+    assert total('a,bb,dé,' + 'x' * 40 * 2, 480) == 40 * 3 * (1.5 + 2.0 + 4.0)
+    after = runtime_stats()['registered_callback_cache']
+    counters = after['by_registration'][weight.__pyjiting_registered_id__]
+    # Distinct keys are cached once; the 80-byte key never fits inline and always misses.
+    assert counters['size'] == 1024
+    assert counters['misses'] == len(calls) == 9 + 120
+    assert after['hits'] - before['hits'] == counters['hits'] == 351
+    with pytest.raises(CallbackFailure, match='bad'):
+        total('bad', 3)
+    assert calls.count('bad') == 1
+
+    with pytest.raises(ValueError, match='cache_size requires pure=True'):
+        reg(cache_size=8)(lambda value: value)
+    with pytest.raises(TypeError, match='must return a scalar'):
+        @reg(pure=True)
+        def describe(value: int) -> str:
+            return str(value)
+
+
+def test_batched_callbacks_receive_chunks_of_arguments_as_arrays():
+    chunks = []
+
+    @reg(batch=True)
+    def record(index: int, value: float, flag: bool) -> None:
+        chunks.append((index, value, flag))
+
+    @jit
+    def kernel(count, fail_at):
+        total = 0.0
+        for index in range(count):
+            total += index * 0.5
+            record(index, total, index % 3 == 0)
+            if index == fail_at:
+                return 1 // (fail_at - index)
+        return total
+
+    assert kernel(1200, -1) == 0.25 * 1199 * 1200
+    assert [len(index) for index, _, _ in chunks] == [512, 512, 176]
+    index, value, flag = map(np.concatenate, zip(*chunks))
+    assert index.dtype == np.int64 and value.dtype == np.float64 and flag.dtype == np.bool_
+    np.testing.assert_array_equal(index, np.arange(1200))
+    np.testing.assert_allclose(value, np.cumsum(np.arange(1200) * 0.5))
+    np.testing.assert_array_equal(flag, np.arange(1200) % 3 == 0)
+
+    chunks.clear()
+    with pytest.raises(ZeroDivisionError):
+        kernel(1200, 7)
+    assert [list(index) for index, _, _ in chunks] == [list(range(8))]
+
+    with pytest.raises(TypeError, match='must return None'):
+        @reg(batch=True)
+        def measure(value: int) -> int:
+            return value
+    with pytest.raises(ValueError, match='cannot be combined'):
+        reg(pure=True, batch=True)(record)
+
+
+batched_order = []
+
+
+@reg(batch=True)
+def record_order(value: int) -> None:
+    batched_order.extend(value.tolist())
+
+
+@jit
+def countdown_order(depth):
+    record_order(depth)
+    if depth == 0:
+        return 0
+    countdown_order(depth - 1)
+    record_order(-depth)
+    return depth
+
+
+def test_batched_calls_are_flushed_before_jit_to_jit_calls():
+    @jit
+    def inner(value):
+        record_order(value * 10)
+        return value
+
+    @jit
+    def outer():
+        record_order(1)
+        inner(5)
+        record_order(2)
+        return 0
+
+    batched_order.clear()
+    assert outer() == 0
+    assert batched_order == [1, 50, 2]
+    batched_order.clear()
+    assert countdown_order(2) == 2
+    assert batched_order == [2, 1, 0, -1, -2]
@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 import pytest
 
 from pyjiting import clear_cache, jit, runtime_stats
@@ -75,3 +78,15 @@ def test_deterministic_compilation_failures_are_cached_and_clearable():
     with pytest.raises(InferError, match='not registered'):
         invalid(3)
     assert runtime_stats()['compile_failures'] == before + 2
+
+
+def test_import_defers_llvm_and_engine_creation_until_first_compile():
+    code = (
+        'import sys, pyjiting; '
+        'from pyjiting.main import default_runtime; '
+        "print('llvmlite.binding' in sys.modules, 'engine' in vars(default_runtime)); "
+        'pyjiting.jit.from_source("def one():\\n    return 1")(); '
+        "print('llvmlite.binding' in sys.modules, 'engine' in vars(default_runtime))"
+    )
+    output = subprocess.check_output([sys.executable, '-c', code], text=True).split()
+    assert output == ['False', 'False', 'True', 'True']
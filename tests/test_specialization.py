@@ -2,7 +2,10 @@ import os
 import subprocess
 import sys
 
-from pyjiting import jit
+import pytest
+
+from pyjiting import get_llvm_ir, jit
+from pyjiting.errors import SpecializationLimitError
 from pyjiting.main import ensure_compilation_unit, function_cache
 from pyjiting.parser import ASTVisitor
 
@@ -61,6 +64,18 @@ def test_factory_closures_have_isolated_compilation_units_and_machine_code():
     assert first.__pyjiting_tree__.semantic_fingerprint != second.__pyjiting_tree__.semantic_fingerprint
 
 
+def test_equal_closures_and_redecorations_share_one_compilation_unit():
+    first, again = closure_factory(3), closure_factory(3)
+    before = len(function_cache)
+
+    assert first(10) == 13
+    assert again(20) == 23
+    assert len(function_cache) == before + 1
+    assert first.__pyjiting_tree__.compilation_unit_id == again.__pyjiting_tree__.compilation_unit_id
+    assert jit(FirstKernel.compute).__pyjiting_tree__.symbol == first_compute.__pyjiting_tree__.symbol
+    assert jit(FirstKernel.compute, fastmath=True).__pyjiting_tree__.symbol != first_compute.__pyjiting_tree__.symbol
+
+
 def test_mangler_is_stable_across_hash_seeds():
     code = (
         'from pyjiting.ll_types import mangler; '
@@ -90,3 +105,50 @@ def test_semantic_fingerprint_does_not_depend_on_cpython_ast_dump(monkeypatch):
     ensure_compilation_unit(tree)
 
     assert len(tree.semantic_fingerprint) == 64
+
+
+def test_specializations_do_not_annotate_the_shared_tree():
+    @jit
+    def doubled(value):
+        result = value * 2
+        return result
+
+    assert doubled(3) == 6
+    assert doubled(1.5) == 3.0
+    assignment = doubled.__pyjiting_tree__.body[0]
+    assert assignment.type is None
+    assert assignment.value.operand_type is None
+
+
+def test_value_specialization_folds_selected_arguments_within_the_budget():
+    @jit(specialize_values=('k',), max_specializations=2)
+    def power(x, k):
+        result = 1.0
+        for _ in range(k):
+            result = result * x
+        return result
+
+    assert power(2.0, 3) == 8.0
+    assert power(1.5, 3) == 3.375
+    assert power(2.0, 5) == 32.0
+    assert power.specialize(2.0, 5)['argument_values'] == {'k': 5}
+    optimized = get_llvm_ir(power, 2.0, 5, optimized=True)
+    assert 'br ' not in optimized.split('define', 2)[1].split('}')[0]
+    with pytest.raises(SpecializationLimitError):
+        power(2.0, 6)
+    with pytest.raises(TypeError, match='value-specialized'):
+        power(2.0, 1.5)
+
+
+@jit(specialize_values=('n',))
+def value_fib(n):
+    if n < 2:
+        return n
+    return value_fib(n - 1) + value_fib(n - 2)
+
+
+def test_value_specialized_recursion_calls_the_unfolded_body():
+    assert value_fib(20) == 6765
+    assert value_fib(-3) == -3
+    with pytest.raises(ValueError, match='unknown parameters'):
+        jit(specialize_values=('m',))(value_fib.__wrapped__)
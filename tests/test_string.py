@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 
 from pyjiting import jit
 from pyjiting.errors import InferError
+from pyjiting.string_runtime import begin_call, end_call, make_string, string_kind
 
 
 @jit
@@ -98,3 +100,101 @@ def test_string_slices_support_positive_negative_and_dynamic_steps():
     assert reverse_string(value) == value[::-1]
     with pytest.raises(ValueError, match='slice step cannot be zero'):
         stepped_slice(value, 0, 3, 0)
+
+
+def test_string_kinds_round_trip_and_compare_across_widths():
+    @jit
+    def order(left, right):
+        return (left == right) + (left < right) * 2 + (left > right) * 4
+
+    @jit
+    def rebuild(value):
+        result = ''
+        for character in value:
+            result = result + character
+        return result
+
+    values = ['', 'log', 'lóg', 'lĀg', 'l🙂g', chr(0xd800) + chr(0xdc00), 'a\0b']
+    assert [string_kind(value) for value in values] == [1, 1, 1, 2, 4, 4, 1]
+    begin_call()
+    try:
+        assert make_string('log').contents.kind == 1
+    finally:
+        end_call()
+    for left in values:
+        assert rebuild(left) == left
+        for right in values:
+            assert order(left, right) == (left == right) + (left < right) * 2 + (left > right) * 4
+
+
+def test_borrowed_string_views_keep_value_semantics():
+    @jit
+    def runs(value):
+        previous = ''
+        total = 0
+        for character in value:
+            if character == previous:
+                total += 1
+            previous = character
+        return total
+
+    @jit
+    def window(value, lower, upper):
+        return value[lower:upper]
+
+    @jit
+    def swap_halves(value):
+        head = value[:2]
+        saved = head
+        head = value[2:]
+        return head + saved
+
+    @jit
+    def parts(value):
+        return value[0], value[1:3]
+
+    assert runs('abcd') == 0
+    assert runs('aabbb') == 3
+    assert swap_halves('ab🙂cd') == '🙂cdab'
+    assert parts('héllo') == ('h', 'él')
+    value = 'a🙂cdé'
+    for lower in range(-7, 7):
+        for upper in range(-7, 7):
+            assert window(value, lower, upper) == value[lower:upper]
+
+
+def test_native_string_builder_appends_without_disturbing_shared_prefixes():
+    @jit
+    def build(piece, count):
+        result = ''
+        for _ in range(count):
+            result += piece
+        return result
+
+    @jit
+    def forked(value):
+        base = value + 'x'
+        first = base + '1'
+        second = base + '2'
+        return first + '|' + second + '|' + base
+
+    @jit
+    def widened(narrow, wide):
+        result = narrow
+        result += wide
+        result += narrow
+        return result
+
+    @jit
+    def joined(separator, items):
+        return separator.join(items)
+
+    assert build('ab', 5000) == 'ab' * 5000
+    assert forked('q') == 'qx1|qx2|qx'
+    assert widened('aé', '🙂') == 'aé🙂aé'
+    assert joined(', ', ('a', 'bé', '🙂')) == 'a, bé, 🙂'
+    assert joined('-', np.array(['x', 'yy', ''])) == 'x-yy-'
+    assert joined('é', 'abc') == 'aébéc'
+    assert joined('é', '') == ''
+    with pytest.raises(InferError, match='join expects'):
+        joined(',', (1, 2))
@@ -1,4 +1,4 @@
-from pyjiting import jit, runtime_stats
+from pyjiting import JITContext, get_llvm_ir, jit, runtime_stats
 
 
 def test_string_runtime_callbacks_are_observable_by_operation():
@@ -8,6 +8,8 @@ def test_string_runtime_callbacks_are_observable_by_operation():
 
     before = runtime_stats()['string_callbacks'].get('upper', 0)
     assert transform('Abc') == 'ABC'
+    # Only multi-code-point mappings such as 'ß' -> 'SS' are delegated to Python.
+    assert transform('Straße') == 'STRASSE'
     after = runtime_stats()['string_callbacks'].get('upper', 0)
     assert after == before + 1
 
@@ -24,3 +26,16 @@ def test_unicode_comparison_is_native_and_does_not_enter_python_runtime():
         assert compare(left, right) == expected
     after = runtime_stats()['string_callbacks'].get('compare', 0)
     assert after == before
+
+
+def test_string_literals_are_module_constants_counted_per_retained_module():
+    with JITContext() as context:
+        kernels = [context.from_source(f'def tag(value):\n    return value + {label!r} + {label!r}\n')
+                   for label in ('α', 'beta')]
+        assert [kernel('x') for kernel in kernels] == ['xαα', 'xbetabeta']
+        stats = context.stats()
+        assert stats['string_literals'] == 2
+        # 'α' is stored as one UCS-2 code unit and 'beta' as four latin-1 units.
+        assert stats['string_literal_bytes'] == 2 + 4
+        assert runtime_stats(kernels[1])['signatures'][0]['string_literal_bytes'] == len('beta')
+        assert 'internal unnamed_addr constant [4 x i8] c"beta"' in get_llvm_ir(kernels[1], 'x')
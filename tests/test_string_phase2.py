@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 
-from pyjiting import jit
+from pyjiting import jit, runtime_stats, string_hash
 from pyjiting.errors import InferError
 
 
@@ -113,3 +114,147 @@ def test_new_string_intrinsics_reject_invalid_static_types_and_arities():
         invalid_membership('x')
     with pytest.raises(InferError, match='replace expects two string arguments'):
         invalid_replace('x')
+
+
+@jit
+def search_bounds(value: str, needle: str, start: int, end: int) -> int:
+    return (value.find(needle, start, end) + 1 + value.count(needle, start, end) * 100 +
+            value.startswith(needle, start, end) * 10000 + value.endswith(needle, start, end) * 100000)
+
+
+@pytest.mark.parametrize('value', ['', 'abcabcab', 'aaaa', 'héllo wörld', 'x🙂y🙂🙂z', 'ab' * 40 + 'abc'])
+@pytest.mark.parametrize('needle', ['', 'a', 'aa', 'abc', 'ö', '🙂🙂', 'abababc', 'zz'])
+def test_native_search_matches_python_bounds_and_kinds(value, needle):
+    before = sum(runtime_stats()['string_callbacks'].values())
+    for start in range(-12, 14, 5):
+        for end in range(-12, 14, 5):
+            expected = (value.find(needle, start, end) + 1 + value.count(needle, start, end) * 100 +
+                        value.startswith(needle, start, end) * 10000 + value.endswith(needle, start, end) * 100000)
+            assert search_bounds(value, needle, start, end) == expected
+    assert sum(runtime_stats()['string_callbacks'].values()) == before
+
+
+def test_search_methods_reject_non_integer_bounds():
+    @jit
+    def bad(value):
+        return value.find('a', 'b')
+
+    with pytest.raises(InferError, match='optional integer start and end'):
+        bad('abc')
+
+
+@jit
+def parse_int(value: str) -> int:
+    return int(value)
+
+
+@jit
+def parse_float(value: str) -> float:
+    return float(value)
+
+
+@jit
+def format_number(value):
+    return str(value)
+
+
+def test_native_numeric_parsing_and_formatting_match_python():
+    @jit
+    def total(fields):
+        result = 0.0
+        for field in fields:
+            result += float(field) + int(field[:1])
+        return str(result) + '|' + str(int(result)) + '|' + str(result > 1)
+
+    fields = np.array(['1.5', '2.25e1 ', '3'])
+    expected = sum(float(field) + int(field[:1]) for field in ['1.5', '2.25e1 ', '3'])
+    before = sum(runtime_stats()['string_callbacks'].values())
+    assert total(fields) == f'{expected}|{int(expected)}|True'
+    for value in ['0', ' -42\n', '+7', '007', str(2 ** 63 - 1), str(-2 ** 63)]:
+        assert parse_int(value) == int(value)
+    for value in ['1', '-2.5e-3', '.5', '1.', '1e500', '-0.0']:
+        assert repr(parse_float(value)) == repr(float(value))
+    for value in [0, -7, 2 ** 63 - 1, -2 ** 63, 0.0, -0.0, 0.1, 1 / 3, 1e16, 1e15, 1e-4, 1e-5, 5e-324,
+                  1.7976931348623157e308, float('inf'), float('-inf'), float('nan')]:
+        assert format_number(value) == str(value)
+    assert sum(runtime_stats()['string_callbacks'].values()) == before
+
+
+def test_numeric_parsing_slow_paths_raise_python_errors():
+    assert parse_int('1_000') == 1000
+    assert parse_float(' -Infinity ') == float('-inf')
+    with pytest.raises(ValueError, match="invalid literal for int"):
+        parse_int('1.5')
+    with pytest.raises(OverflowError):
+        parse_int(str(2 ** 63))
+    with pytest.raises(ValueError, match='could not convert string to float'):
+        parse_float('0x1p3')
+
+
+@jit
+def split_on(value, separator):
+    return value.split(separator)
+
+
+@jit
+def field_lengths(value):
+    total = 0
+    for line in value.splitlines():
+        for word in line.split():
+            total += len(word)
+    return total
+
+
+def test_native_split_and_partition_match_python():
+    @jit
+    def shape(value):
+        fields = value.split(',')
+        return (len(fields), fields[-1], '-'.join(value.split()), value.partition('='))
+
+    before = sum(runtime_stats()['string_callbacks'].values())
+    for value in ['', 'a,b,,c', ',', 'k=v, é', ' x　y\x85z ', 'a\U0001f600=b']:
+        for separator in [',', ',,', '\U0001f600']:
+            assert split_on(value, separator) == value.split(separator)
+        assert shape(value) == (len(value.split(',')), value.split(',')[-1], '-'.join(value.split()),
+                                value.partition('='))
+    for value in ['a\nb\r\nc\rd', 'a b\n\n c d\x0b', 'tail\r', '']:
+        assert field_lengths(value) == sum(len(word) for line in value.splitlines() for word in line.split())
+    assert sum(runtime_stats()['string_callbacks'].values()) == before
+    with pytest.raises(ValueError, match='empty separator'):
+        split_on('abc', '')
+
+
+@jit
+def case_and_class(value):
+    return (value.upper(), value.lower(), value.isalpha() + value.isalnum() * 2 + value.isdigit() * 4 +
+            value.isspace() * 8)
+
+
+def test_native_case_mapping_and_classification_match_python():
+    def expected(value):
+        return (value.upper(), value.lower(), value.isalpha() + value.isalnum() * 2 + value.isdigit() * 4 +
+                value.isspace() * 8)
+
+    simple = ['', 'Hello, World 42', 'ÿµÀé', 'ıi', 'x€Ǆ', 'a\U0001f600𝔸b', '\ud800x', '١٢٣', '²', ' \t　', 'ǅ']
+    before = sum(runtime_stats()['string_callbacks'].values())
+    for value in simple:
+        assert case_and_class(value) == expected(value)
+    assert sum(runtime_stats()['string_callbacks'].values()) == before
+    for value in ['straße', 'ΣΑΣ ΟΔΟΣ', 'İstanbul', 'ﬀ']:
+        assert case_and_class(value) == expected(value)
+
+
+def test_native_string_hash_and_equality_ignore_storage_kind():
+    @jit
+    def keyed(value, left, right):
+        return (string_hash(value[:3]), value[:3] == left, value[:3] != right, left < right)
+
+    before = sum(runtime_stats()['string_callbacks'].values())
+    for value, left, right in [('abc€', 'abc', 'abd'), ('héllo', 'hél', 'hé'), ('a\U0001f600bc', 'a\U0001f600b', ''),
+                               ('', '', 'a\0')]:
+        prefix = value[:3]
+        assert keyed(value, left, right) == (string_hash(prefix), prefix == left, prefix != right, left < right)
+    assert sum(runtime_stats()['string_callbacks'].values()) == before
+    assert string_hash('abc') == string_hash('abc€'[:3]) != string_hash('abd')
+    with pytest.raises(TypeError):
+        string_hash(b'abc')
@@ -0,0 +1,56 @@
+import pytest
+
+from pyjiting import JITContext, get_llvm_ir, jit, runtime_stats
+from pyjiting.main import wait_for_tier_ups
+
+
+def test_hot_signature_tiers_up_in_the_background_and_swaps_generation():
+    context = JITContext()
+
+    @context.jit(tier_threshold=3)
+    def accumulate(limit):
+        total = 0
+        for value in range(limit):
+            total += value
+        return total
+
+    assert accumulate(10) == 45
+    baseline = runtime_stats(accumulate)['signatures'][0]
+    assert (baseline['tier'], baseline['opt_level']) == ('baseline', 1)
+
+    for _ in range(2):
+        assert accumulate(10) == 45
+    wait_for_tier_ups(context._state)
+
+    optimized = runtime_stats(accumulate)['signatures'][0]
+    assert (optimized['tier'], optimized['opt_level']) == ('optimized', 3)
+    assert optimized['generation'] == baseline['generation'] + 1
+    assert optimized['native_symbol'] != baseline['native_symbol']
+    assert optimized['compile_count'] == 2
+    assert optimized['tier_up_time_ns'] > 0
+    assert context.stats()['tier_ups'] == 1
+    assert optimized['native_symbol'] in get_llvm_ir(accumulate, 10, optimized=True)
+
+    @context.jit
+    def caller(limit):
+        return accumulate(limit) + 1
+
+    assert caller(100) == 4951
+    assert accumulate(100) == 4950
+    context.close()
+
+
+def test_untiered_functions_compile_at_full_optimization():
+    @jit
+    def identity(value):
+        return value
+
+    assert identity(3) == 3
+    metrics = runtime_stats(identity)['signatures'][0]
+    assert (metrics['tier'], metrics['opt_level']) == ('optimized', 3)
+
+
+@pytest.mark.parametrize('threshold', [0, -1, True, 1.5])
+def test_tier_threshold_is_validated(threshold):
+    with pytest.raises(ValueError, match='tier_threshold must be a positive integer or None'):
+        jit(lambda value: value, tier_threshold=threshold)
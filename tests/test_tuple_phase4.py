@@ -1,7 +1,7 @@
 import numpy as np
 import pytest
 
-from pyjiting import jit
+from pyjiting import get_llvm_ir, jit
 from pyjiting.errors import CompileError, InferError
 from pyjiting.ll_types import mangler
 from pyjiting.main import arg_pytype
@@ -114,3 +114,65 @@ def test_tuple_generated_module_verifies():
             left, right = result
             return (left, right, len(result))
     ''', [int64_t])
+
+
+def test_non_escaping_tuples_are_stack_allocated_and_keep_value_semantics():
+    @jit
+    def fibonacci(count):
+        previous, current = 0, 1
+        for _ in range(count):
+            previous, current = current, previous + current
+        return previous
+
+    @jit
+    def rotate(value):
+        pair = (value[0], value[-1])
+        for _ in range(3):
+            pair = (pair[1], pair[0])
+        first, second = pair
+        return first + second
+
+    @jit
+    def keep_third(count):
+        kept = (0, 0)
+        for index in range(count):
+            current = (index, index * 2)
+            if index == 3:
+                kept = current
+        return kept
+
+    assert fibonacci(90) == 2880067194370816120
+    assert 'inttoptr' not in get_llvm_ir(fibonacci, 90, optimized=True)
+    assert rotate('xyz') == 'zx'
+    assert keep_third(10) == (3, 6)
+
+
+def test_jit_calls_exchange_tuples_by_value():
+    @jit
+    def divmod_pair(value, divisor):
+        return value // divisor, value % divisor
+
+    @jit
+    def digit_sum(count):
+        total = 0
+        for index in range(count):
+            value = index
+            while value:
+                value, digit = divmod_pair(value, 10)
+                total += digit
+        return total
+
+    @jit
+    def swap(value: tuple[int, str]) -> tuple[str, int]:
+        return value[1] + '!', value[0]
+
+    @jit
+    def label(count):
+        name, number = swap((count, str(count)))
+        return name * number
+
+    assert digit_sum(1000) == sum(int(digit) for index in range(1000) for digit in str(index))
+    assert divmod_pair(17, 5) == (3, 2)
+    assert swap((2, 'é')) == ('é!', 2)
+    assert label(3) == '3!3!3!'
+    assert 'inttoptr' not in get_llvm_ir(digit_sum, 1000, optimized=True)